@@ -0,0 +1,52 @@
+# 음성 파일 링크 색인
+# audio_links.csv를 한 번만 읽어 (환자번호, "YYYY-MM-DD") → 링크 dict로 들고 있고,
+# 파일 수정 시각(mtime)이 바뀐 경우에만 다시 읽는다.
+import os
+import threading
+
+import pandas as pd
+
+from completion_store import normalize_date, normalize_dates
+
+
+class AudioLinkIndex:
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._mtime = None
+        self._links = {}        # (환자번호, 날짜) → 링크
+        self._by_patient = {}   # 환자번호 → {날짜: 링크}
+
+    def _refresh(self):
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            mtime = None
+        if mtime == self._mtime:
+            return
+        with self._lock:
+            links, by_patient = {}, {}
+            if mtime is not None:
+                # 엑셀에서 저장한 파일은 BOM이 붙어 있어 utf-8-sig로 읽는다
+                df = pd.read_csv(self.path, dtype=str, encoding="utf-8-sig")
+                dates = normalize_dates(df["검사 날짜"])
+                valid = dates.notna() & df["파일 링크"].notna()
+                # 같은 날 링크가 여러 개면 파일의 첫 번째 링크를 쓴다
+                for pid, day, link in zip(df["환자번호"][valid][::-1], dates[valid][::-1], df["파일 링크"][valid][::-1]):
+                    links[(pid, day)] = link
+                    by_patient.setdefault(pid, {})[day] = link
+            self._links, self._by_patient, self._mtime = links, by_patient, mtime
+
+    def get(self, 환자번호, 날짜):
+        self._refresh()
+        return self._links.get((str(환자번호), normalize_date(날짜)))
+
+    def rows(self):
+        # (환자번호, 날짜, 링크) 전체 (SQLite 표를 다시 채울 때)
+        self._refresh()
+        return [(pid, day, link) for (pid, day), link in self._links.items()]
+
+    def links_for(self, 환자번호):
+        # 환자 한 명의 {날짜: 링크} 전체
+        self._refresh()
+        return dict(sorted(self._by_patient.get(str(환자번호), {}).items()))
@@ -0,0 +1,2 @@
+# 성능 측정 도구 (브라우저 없이 핵심 함수만 실행)
+#   python -m benchmarks.run --sizes 10 1000 10000 50000
@@ -0,0 +1,88 @@
+# 가상 환자군 생성기
+# 실제 운영 데이터와 비슷한 비율(음성_주기, 증상_주기, 착용 여부, 외래 여러 번)로
+# patients.csv / completed.csv / audio_links.csv 를 만든다. seed가 같으면 항상 같은 데이터가 나온다.
+import os
+
+import numpy as np
+import pandas as pd
+
+from schedule_engine import HORIZON_DAYS, compile_rules, evaluate, 항목_목록
+
+STAFF = ["김은선", "최민지"]
+COHORT_START = np.datetime64("2025-01-01")
+ENROLL_DAYS = 365           # 이 기간 동안 고르게 등록
+TODAY = COHORT_START + 240  # 측정 기준일 (고정해야 실행마다 결과가 같다)
+
+
+def _days_str(days):
+    return np.datetime_as_string(days, unit="D")
+
+
+def make_patients(n, seed=0):
+    rng = np.random.default_rng(seed)
+    baseline = COHORT_START + rng.integers(0, ENROLL_DAYS, n).astype("timedelta64[D]")
+    start = baseline + rng.integers(0, 14, n).astype("timedelta64[D]")
+
+    # 외래: 3개월마다 1~4회, ±7일
+    n_visits = rng.integers(1, 5, n)
+    visits = []
+    for b, k in zip(baseline, n_visits):
+        offsets = 90 * np.arange(1, k + 1) + rng.integers(-7, 8, k)
+        visits.append("|".join(_days_str(b + offsets.astype("timedelta64[D]"))))
+
+    df = pd.DataFrame({
+        "환자번호": [f"S{i:05d}" for i in range(1, n + 1)],
+        "Baseline": _days_str(baseline),
+        "Start_date": _days_str(start),
+        "음성_주기": rng.choice(["1w", "2w", "1m"], n, p=[0.5, 0.3, 0.2]),
+        "증상_주기": rng.choice(["daily", "weekly"], n, p=[0.4, 0.6]),
+        "환경_사용": rng.choice(["착용", "비착용"], n, p=[0.7, 0.3]),
+        "웨어러블_사용": rng.choice(["착용", "비착용"], n, p=[0.7, 0.3]),
+        "외래일": visits,
+    })
+    for 항목 in 항목_목록:
+        df[f"{항목}_담당자"] = rng.choice(STAFF, n)
+    return df
+
+
+def make_completions(patient_db, rate=0.7, today=TODAY, seed=0):
+    # 기준일 이전에 예정된 검사 중 rate 비율만큼 완료 처리
+    rng = np.random.default_rng(seed + 1)
+    rules = compile_rules(patient_db)
+    elapsed = np.clip((today - rules["baseline"]).astype(np.int64) + 1, 0, HORIZON_DAYS)
+    pidx = np.repeat(np.arange(len(elapsed)), elapsed)
+    days = rules["baseline"][pidx] + (np.arange(len(pidx)) - np.repeat(np.cumsum(elapsed) - elapsed, elapsed)).astype("timedelta64[D]")
+
+    frames = []
+    for 항목, mask in evaluate(rules, pidx, days).items():
+        keep = mask & (rng.random(len(mask)) < rate)
+        frames.append(pd.DataFrame({"환자번호": rules["환자번호"][pidx[keep]], "날짜": _days_str(days[keep]), "항목": 항목}))
+    return pd.concat(frames, ignore_index=True)
+
+
+def make_audio_links(completions, seed=0):
+    # 완료된 음성 검사마다 링크 하나 (원본 파일처럼 "2025.3.5" 형식 날짜)
+    rng = np.random.default_rng(seed + 2)
+    voice = completions[completions["항목"] == "음성"]
+    dates = pd.to_datetime(voice["날짜"])
+    return pd.DataFrame({
+        "환자번호": voice["환자번호"].to_numpy(),
+        "검사 날짜": (dates.dt.year.astype(str) + "." + dates.dt.month.astype(str) + "." + dates.dt.day.astype(str)).to_numpy(),
+        "파일 링크": [f"https://drive.google.com/file/d/{token:016x}/view" for token in rng.integers(0, 2**63, len(voice))],
+    })
+
+
+def write_cohort(directory, n, seed=0):
+    # directory에 세 파일을 쓰고 각 경로를 돌려준다
+    os.makedirs(directory, exist_ok=True)
+    patients = make_patients(n, seed)
+    completions = make_completions(patients, seed=seed)
+    paths = {
+        "patients": os.path.join(directory, "patients.csv"),
+        "completed": os.path.join(directory, "completed.csv"),
+        "audio_links": os.path.join(directory, "audio_links.csv"),
+    }
+    patients.to_csv(paths["patients"], index=False)
+    completions.to_csv(paths["completed"], index=False)
+    make_audio_links(completions, seed).to_csv(paths["audio_links"], index=False, encoding="utf-8-sig")
+    return paths
@@ -0,0 +1,168 @@
+# 핵심 경로 성능 측정
+#   python -m benchmarks.run                       # 10 / 1k / 10k / 50k 명
+#   python -m benchmarks.run --sizes 10 1000       # 일부 크기만
+#   python -m benchmarks.run --save-baseline       # 현재 결과를 기준값으로 저장
+# 결과는 results.json 에 쓰고, baseline.json 이 있으면 기준보다 느려진 단계를 표시하고 종료 코드 1을 돌려준다.
+# baseline.json 은 저장소에 함께 둔다 (기록된 python/pandas/numpy 버전과 기계에서 잰 값).
+# CI에서는 같은 러너에서 `python -m benchmarks.run` 을 돌려 종료 코드로 회귀를 잡는다.
+# 러너나 라이브러리 버전이 바뀌면 그 러너에서 --save-baseline 으로 다시 만들어 커밋한다.
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from audio_links import AudioLinkIndex
+from benchmarks.cohort import TODAY, write_cohort
+from calendar_events import build_events, month_range
+from completion_store import CompletionStore
+from grid import grid_long, pivot_grid
+from schedule_engine import build_schedules, 항목_목록
+from schedule_store import ScheduleStore
+from stats import progress_stats, rollup
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SIZES = [10, 1_000, 10_000, 50_000]
+RESULTS_PATH = os.path.join(HERE, "results.json")
+BASELINE_PATH = os.path.join(HERE, "baseline.json")
+TOLERANCE = 0.25        # 기준보다 25% 넘게 느려지면 회귀
+MIN_DELTA = 0.005       # 초: 이보다 작은 차이는 측정 오차로 본다
+GRID_PATIENTS = 50      # 점오표 한 페이지
+GRID_DAYS = 28
+AUDIO_LOOKUPS = 1_000
+
+
+def timed(fn, repeat):
+    # repeat번 실행해서 가장 빠른 시간과 마지막 결과
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def grid_pivot(store, ids, start, end, completions):
+    # 대시보드 / 내보내기의 점오표와 같은 함수 (grid.py)
+    return pivot_grid(grid_long(store, completions, ids, start, end))
+
+
+def bench_size(n, repeat, workdir):
+    paths = write_cohort(os.path.join(workdir, str(n)), n)
+    patients = pd.read_csv(paths["patients"], dtype=str, keep_default_na=False)
+    today = TODAY.astype(object)
+    tomorrow = (TODAY + 1).astype(object)
+    stages = {}
+
+    stages["completions_load"], completions = timed(
+        lambda: CompletionStore.from_csv(paths["completed"]), repeat)
+    stages["schedule_build"], _ = timed(lambda: build_schedules(patients), repeat)
+
+    def sync():
+        store = ScheduleStore()
+        store.sync(patients)
+        return store
+    stages["schedule_store_sync"], store = timed(sync, repeat)
+    table, rules = store.sync(patients), store.rules
+
+    completed = completions.to_frame()
+    stages["progress_stats"], _ = timed(
+        lambda: progress_stats(table, rules, completed, patients, today), repeat)
+
+    ids = sorted(patients["환자번호"])[:GRID_PATIENTS]
+    grid_start = TODAY - 7
+    stages["grid_pivot"], _ = timed(
+        lambda: grid_pivot(store, ids, grid_start, grid_start + GRID_DAYS - 1, completions), repeat)
+
+    stages["due_today"], _ = timed(lambda: completions.mark(store.due_on(today)), repeat)
+    stages["due_tomorrow"], _ = timed(lambda: store.due_on(tomorrow), repeat)
+
+    start, end = month_range(today)
+    stages["calendar_events"], _ = timed(lambda: build_events(rules, 항목_목록, start, end), repeat)
+    stages["calendar_events_patient"], _ = timed(
+        lambda: build_events(rules, 항목_목록, start, end, patient=ids[0]), repeat)
+
+    stages["monthly_stats"], _ = timed(lambda: rollup(store.cube, "M", "항목"), repeat)
+
+    audio = AudioLinkIndex(paths["audio_links"])
+    stages["audio_index_load"], _ = timed(lambda: AudioLinkIndex(paths["audio_links"]).get(ids[0], today), repeat)
+    voice = completed[completed["항목"] == "음성"].head(AUDIO_LOOKUPS)
+    audio.get(ids[0], today)
+    stages["audio_link_lookup"], _ = timed(
+        lambda: [audio.get(pid, day) for pid, day in zip(voice["환자번호"], voice["날짜"])], repeat)
+
+    counts = {"patients": n, "schedule_rows": len(table), "completions": len(completions)}
+    return {"counts": counts, "seconds": stages}
+
+
+def compare(results, baseline, tolerance=TOLERANCE):
+    # [(크기, 단계, 기준, 현재)] 기준보다 느려진 단계 목록
+    regressions = []
+    for size, result in results["sizes"].items():
+        base = baseline.get("sizes", {}).get(size)
+        if base is None:
+            continue
+        for stage, seconds in result["seconds"].items():
+            before = base["seconds"].get(stage)
+            if before is None:
+                continue
+            if seconds > before * (1 + tolerance) and seconds - before > MIN_DELTA:
+                regressions.append((size, stage, before, seconds))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="일정/대시보드 핵심 경로 성능 측정")
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", default=RESULTS_PATH)
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE)
+    parser.add_argument("--save-baseline", action="store_true", help="결과를 기준값 파일로도 저장")
+    args = parser.parse_args(argv)
+
+    results = {
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "sizes": {},
+    }
+    with tempfile.TemporaryDirectory(prefix="bench_") as workdir:
+        for n in args.sizes:
+            result = bench_size(n, args.repeat, workdir)
+            results["sizes"][str(n)] = result
+            print(f"\n== {n:,}명 (일정 {result['counts']['schedule_rows']:,}행, 완료 {result['counts']['completions']:,}건)")
+            for stage, seconds in result["seconds"].items():
+                print(f"  {stage:<26}{seconds * 1000:10.1f} ms")
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+    print(f"\n결과 저장: {args.output}")
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"기준값 저장: {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print("기준값 파일이 없어 비교하지 않습니다 (--save-baseline 으로 만들 수 있음).")
+        return 0
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    regressions = compare(results, baseline, args.tolerance)
+    for size, stage, before, after in regressions:
+        print(f"⚠️ 회귀: {int(size):,}명 {stage} {before * 1000:.1f} ms → {after * 1000:.1f} ms")
+    if not regressions:
+        print("기준값 대비 회귀 없음")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,126 @@
+# 환자 일괄 등록
+# CSV 파일이나 구글 시트 범위를 조각(chunk) 단위로 읽으면서 검증하고, 통과한 행만 모아
+# 저장소에 한 번에(SQLite는 한 트랜잭션) 저장한 뒤 일정은 한 번의 벡터 계산으로 만든다.
+# 잘못된 행은 중단하지 않고 (행 번호, 환자번호, 오류) 목록으로 돌려준다.
+# 조각의 index는 원본의 행 번호(헤더가 1행)로 맞춰 둔다 → 오류 위치를 파일/시트에서 바로 찾을 수 있다.
+import time
+
+import pandas as pd
+
+from schedule_engine import PROTOCOL, compile_rules, 담당자_컬럼
+from sheet_queue import column_letter
+from storage import PATIENT_COLUMNS
+
+CHUNK_ROWS = 1000
+# 허용 값과 날짜 컬럼은 불러온 프로토콜에서 온다 (프로토콜이 바뀌면 검증도 같이 바뀐다)
+CHOICES = PROTOCOL.choices
+DATE_COLUMNS = PROTOCOL.date_columns
+# 프로토콜이 읽지만 값이 정해지지 않은 컬럼 (조건 컬럼 등): 비어 있으면 오류
+REQUIRED_COLUMNS = [col for col in PROTOCOL.columns if col not in CHOICES and col not in DATE_COLUMNS]
+
+
+def iter_csv_chunks(file, chunk_rows=CHUNK_ROWS):
+    # 경로 또는 파일 객체(st.file_uploader 결과). 엑셀 저장 파일의 BOM도 처리
+    for chunk in pd.read_csv(file, dtype=str, keep_default_na=False, chunksize=chunk_rows, encoding="utf-8-sig"):
+        chunk.index = chunk.index + 2
+        yield chunk
+
+
+def iter_sheet_chunks(worksheet, start_row=2, end_row=None, chunk_rows=CHUNK_ROWS):
+    # 시트의 start_row~end_row 범위를 chunk_rows 행씩 요청 (첫 행은 헤더)
+    header = worksheet.row_values(1)
+    last_col = column_letter(len(header))
+    row = start_row
+    while end_row is None or row <= end_row:
+        stop = row + chunk_rows - 1 if end_row is None else min(row + chunk_rows - 1, end_row)
+        values = worksheet.get(f"A{row}:{last_col}{stop}")
+        if not values:
+            break
+        values = [list(v) + [""] * (len(header) - len(v)) for v in values]
+        yield pd.DataFrame(values, columns=header, index=pd.RangeIndex(row, row + len(values)))
+        if len(values) < stop - row + 1:
+            break
+        row = stop + 1
+
+
+def validate(chunk, staff, existing, seen):
+    # (통과한 행 DataFrame, 오류 목록). existing: 이미 등록된 환자번호, seen: 앞 조각에서 통과한 환자번호 (갱신됨)
+    chunk = chunk.reindex(columns=PATIENT_COLUMNS, fill_value="").astype(str).apply(lambda s: s.str.strip())
+    problems = pd.Series([[] for _ in range(len(chunk))], index=chunk.index)
+
+    def flag(mask, message):
+        for i in chunk.index[mask.to_numpy()]:
+            problems[i].append(message)
+
+    ids = chunk["환자번호"]
+    flag(ids == "", "환자번호 없음")
+    flag((ids.duplicated(keep="first") | ids.isin(seen)) & (ids != ""), "파일 안에서 중복된 환자번호")
+    flag(ids.isin(existing) & (ids != ""), "이미 등록된 환자번호")
+    for col in DATE_COLUMNS:
+        flag(pd.to_datetime(chunk[col], format="%Y-%m-%d", errors="coerce").isna(), f"{col} 날짜 형식 오류")
+    for col, options in CHOICES.items():
+        flag(~chunk[col].isin(options), f"{col} 값 오류 (허용: {', '.join(options)})")
+    for col in REQUIRED_COLUMNS:
+        flag(chunk[col] == "", f"{col} 없음")
+    for col in 담당자_컬럼:
+        flag(~chunk[col].isin(staff), f"{col} 미등록 담당자")
+    visits = chunk["외래일"].str.split("|").explode().str.strip()
+    visits = visits[visits != ""]
+    bad_visit = pd.to_datetime(visits, format="%Y-%m-%d", errors="coerce").isna()
+    flag(pd.Series(chunk.index.isin(visits.index[bad_visit.to_numpy()]), index=chunk.index), "외래일 날짜 형식 오류")
+
+    ok = problems.map(len) == 0
+    for i, message in rule_errors(chunk[ok.to_numpy()]):
+        problems[i].append(message)
+        ok[i] = False
+    errors = [
+        {"행": int(chunk.index[pos]), "환자번호": ids.iloc[pos], "오류": "; ".join(problems.iloc[pos])}
+        for pos in (~ok).to_numpy().nonzero()[0]
+    ]
+    accepted = chunk[ok.to_numpy()]
+    seen.update(accepted["환자번호"])
+    return accepted, errors
+
+
+def rule_errors(rows):
+    # 검증을 통과했는데도 일정 규칙을 만들 수 없는 행 → [(행 번호, 오류)]. 대부분은 조각 전체가 한 번에 통과한다
+    try:
+        compile_rules(rows)
+        return []
+    except (ValueError, KeyError):
+        pass
+    found = []
+    for i in rows.index:
+        try:
+            compile_rules(rows.loc[[i]])
+        except (ValueError, KeyError) as e:
+            found.append((i, f"일정 규칙 오류: {e}"))
+    return found
+
+
+def import_patients(chunks, storage, staff, existing_ids=(), schedule_store=None):
+    # 조각을 차례로 검증하고 통과한 행을 한 번에 저장. 결과 요약(dict)을 돌려준다
+    started = time.perf_counter()
+    existing, seen = set(map(str, existing_ids)), set()
+    accepted, errors, total = [], [], 0
+    for chunk in chunks:
+        rows, chunk_errors = validate(chunk, staff, existing, seen)
+        accepted.append(rows)
+        errors.extend(chunk_errors)
+        total += len(chunk)
+
+    accepted = pd.concat(accepted, ignore_index=True) if accepted else pd.DataFrame(columns=PATIENT_COLUMNS)
+    if not accepted.empty:
+        storage.insert_patients(accepted.to_dict("records"))
+        if schedule_store is not None:
+            # 새 환자 일정은 한 번의 벡터 계산으로 만든다
+            schedule_store.sync(storage.patients())
+
+    elapsed = time.perf_counter() - started
+    return {
+        "rows": total,
+        "accepted": len(accepted),
+        "errors": errors,
+        "seconds": elapsed,
+        "rows_per_second": total / elapsed if elapsed else 0.0,
+    }
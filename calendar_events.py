@@ -0,0 +1,95 @@
+# 달력 뷰어용 이벤트 생성
+# 화면에 보이는 기간(월/주)만 계산하고,
+# - 환자 한 명: 연속된 날의 같은 검사를 하나의 기간 이벤트(start~end)로 묶는다
+# - 전체 보기: 날짜·항목별로 "N명 - 증상" 같은 건수 이벤트 하나로 합친다
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+
+from schedule_engine import HORIZON_DAYS, ITEM_BITS, window_schedule
+
+COLOR_MAP = {
+    "음성": "#FF6B6B",      # coral
+    "증상": "#4D96FF",      # blue
+    "환경": "#1DD1A1",      # mint
+    "웨어러블": "#FDCB6E"   # yellow
+}
+
+
+def _day_str(days):
+    return np.datetime_as_string(days, unit="D").tolist()
+
+
+def range_events(schedule, items):
+    # 환자·항목별로 연속된 날짜를 묶어 기간 이벤트로 만든다 (FullCalendar의 종일 end는 다음 날)
+    events = []
+    codes = schedule["환자번호"].cat.codes.to_numpy()
+    categories = schedule["환자번호"].cat.categories
+    days = schedule["날짜"].to_numpy().astype("datetime64[D]")
+    bits = schedule["검사"].to_numpy()
+    for 항목 in items:
+        hit = (bits & ITEM_BITS[항목]) != 0
+        c, d = codes[hit], days[hit]
+        order = np.lexsort((d, c))
+        c, d = c[order], d[order]
+        if len(d) == 0:
+            continue
+        # 환자가 바뀌거나 날짜가 하루 이상 끊기면 새 구간
+        new_run = np.ones(len(d), dtype=bool)
+        new_run[1:] = (c[1:] != c[:-1]) | ((d[1:] - d[:-1]).astype(np.int64) != 1)
+        starts = np.flatnonzero(new_run)
+        ends = np.append(starts[1:], len(d)) - 1
+        for pid, start, end in zip(categories[c[starts]], _day_str(d[starts]), _day_str(d[ends] + 1)):
+            events.append({
+                "title": f"{pid} - {항목}",
+                "start": start,
+                "end": end,
+                "allDay": True,
+                "color": COLOR_MAP.get(항목, "gray")
+            })
+    return events
+
+
+def count_events(schedule, items):
+    # 날짜·항목별 환자 수 이벤트
+    events = []
+    days = schedule["날짜"].to_numpy().astype("datetime64[D]")
+    bits = schedule["검사"].to_numpy()
+    for 항목 in items:
+        hit = (bits & ITEM_BITS[항목]) != 0
+        uniq, counts = np.unique(days[hit], return_counts=True)
+        for day, n in zip(_day_str(uniq), counts):
+            events.append({
+                "title": f"{n}명 - {항목}",
+                "start": day,
+                "end": day,
+                "allDay": True,
+                "color": COLOR_MAP.get(항목, "gray")
+            })
+    return events
+
+
+def build_events(rules, items, start, end, patient=None, horizon=HORIZON_DAYS):
+    # start~end(포함) 구간의 달력 이벤트. patient가 없으면 날짜별 건수로 합친다
+    if rules is None or not items:
+        return []
+    ids = pd.Index(rules["환자번호"])
+    if patient is None:
+        pidx = np.arange(len(ids))
+    else:
+        pidx = ids.get_indexer([str(patient)])
+        pidx = pidx[pidx >= 0]
+    schedule = window_schedule(rules, pidx, start, end, horizon)
+    if schedule.empty:
+        return []
+    if patient is None:
+        return count_events(schedule, items)
+    return range_events(schedule, items)
+
+
+def month_range(day):
+    # 월 달력에 보이는 대략의 범위 (앞뒤 주 포함)
+    first = day.replace(day=1)
+    next_month = (first + timedelta(days=32)).replace(day=1)
+    return first - timedelta(days=7), next_month + timedelta(days=7)
@@ -0,0 +1,286 @@
+# 검사 완료 기록 저장소
+# (환자번호, 날짜, 항목) 키를 dict로 들고 있어서 완료 여부를 행마다 completed_db 전체를 훑지 않고 바로 찾는다.
+# 날짜는 항상 "YYYY-MM-DD" 문자열로 맞춰 저장한다 (str/date/Timestamp가 섞여 매칭이 빠지는 문제 방지).
+#
+# 디스크 저장: completed.csv(스냅샷) + completed.log(추가 전용 이벤트 로그)
+# 완료/취소 버튼은 로그에 한 줄만 덧붙이고, 로그가 일정 길이를 넘으면 스냅샷으로 합친다(compact).
+import csv
+import os
+import tempfile
+import threading
+
+import numpy as np
+import pandas as pd
+
+COLUMNS = ["환자번호", "날짜", "항목"]
+LOG_COLUMNS = ["op", "환자번호", "날짜", "항목", "결과"]
+COMPACT_EVERY = 1000    # 로그 이벤트가 이만큼 쌓이면 스냅샷으로 합친다
+DIRECT_LOOKUP_ROWS = 5000   # mark(): 이보다 작은 표는 dict에서 바로 찾는다 (전체 키 색인을 만들지 않음)
+
+
+def normalize_date(value):
+    return pd.Timestamp(value).strftime("%Y-%m-%d")
+
+
+def normalize_dates(values):
+    values = np.asarray(values)
+    if np.issubdtype(values.dtype, np.datetime64):
+        # 이미 날짜 배열이면 문자열로 풀지 않고 바로 변환 (누락 추적처럼 행이 많을 때)
+        days = values.astype("datetime64[D]")
+        return pd.Series(np.where(np.isnat(days), None, np.datetime_as_string(days)), dtype=object)
+    parsed = pd.to_datetime(pd.Series(values, dtype=object), format="mixed", errors="coerce")
+    return parsed.dt.strftime("%Y-%m-%d")
+
+
+def make_key(환자번호, 날짜, 항목):
+    return (str(환자번호), normalize_date(날짜), str(항목))
+
+
+def _fsync_dir(path):
+    # 파일 이름 변경(os.replace)까지 디스크에 남도록 디렉터리도 fsync (윈도우는 지원 안 함)
+    try:
+        fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def truncate_torn_tail(path):
+    # 추가 전용 파일의 마지막 줄이 쓰다 끊겼으면(줄바꿈으로 끝나지 않으면) 그 조각을 잘라 낸다.
+    # 그대로 두면 다음에 덧붙이는 줄이 조각과 한 줄로 합쳐져서 재생할 때 둘 다 버려진다.
+    if not os.path.exists(path):
+        return
+    with open(path, "rb+") as f:
+        size = f.seek(0, os.SEEK_END)
+        if size == 0:
+            return
+        f.seek(size - 1)
+        if f.read(1) == b"\n":
+            return
+        end, pos = 0, size
+        while pos > 0:
+            step = min(4096, pos)
+            pos -= step
+            f.seek(pos)
+            newline = f.read(step).rfind(b"\n")
+            if newline >= 0:
+                end = pos + newline + 1
+                break
+        f.truncate(end)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def atomic_write_csv(frame, path):
+    # 임시 파일에 쓰고 fsync 후 교체 → 중간에 죽어도 이전 파일이나 새 파일 중 하나만 남는다
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix=".tmp_", suffix=".csv", dir=directory)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8", newline="") as f:
+            frame.to_csv(f, index=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    _fsync_dir(path)
+
+
+class CompletionStore:
+    def __init__(self, frame=None):
+        self._lock = threading.RLock()  # _compact가 lock 안에서 to_frame을 부른다
+        self._done = {}         # (환자번호, 날짜, 항목) → 결과 ("" 이면 결과 없음)
+        self._index = None      # 벡터 조회용 MultiIndex (변경 시 다시 만든다)
+        self._frame = None      # to_frame() 결과 (변경 시 다시 만든다, 모든 세션이 같은 표를 읽는다)
+        self._by_patient = {}   # 환자번호 → 키 집합 (query가 해당 환자 키만 보도록)
+        self._by_date = {}      # 날짜 → 키 집합 (query가 기간 안의 날짜 키만 보도록)
+        self.snapshot_path = None
+        self.log_path = None
+        self.compact_every = COMPACT_EVERY
+        self._log_events = 0
+        self.listeners = []     # 완료/취소 이벤트를 받을 함수 (op, keys) - 누락 추적(overdue.py) 등
+        if frame is not None and not frame.empty:
+            self._load_frame(frame)
+
+    @classmethod
+    def from_csv(cls, path):
+        if not os.path.exists(path):
+            return cls()
+        return cls(pd.read_csv(path, dtype=str))
+
+    @classmethod
+    def open(cls, snapshot_path, log_path, compact_every=COMPACT_EVERY):
+        # 스냅샷을 읽고 로그를 순서대로 재생. 이후 add/remove는 로그에 덧붙여 저장된다.
+        store = cls.from_csv(snapshot_path)
+        store.snapshot_path = snapshot_path
+        store.log_path = log_path
+        store.compact_every = compact_every
+        truncate_torn_tail(log_path)
+        store._replay_log()
+        return store
+
+    def _load_frame(self, frame):
+        dates = normalize_dates(frame["날짜"])
+        results = frame["결과"].fillna("") if "결과" in frame.columns else pd.Series("", index=frame.index)
+        valid = dates.notna().to_numpy()
+        keys = list(zip(frame["환자번호"].astype(str)[valid], dates[valid], frame["항목"].astype(str)[valid]))
+        self._done.update(zip(keys, results[valid]))
+        for key in keys:
+            self._track(key)
+
+    def _replay_log(self):
+        if not os.path.exists(self.log_path):
+            return
+        with open(self.log_path, encoding="utf-8", newline="") as f:
+            for row in csv.reader(f):
+                # 마지막 줄이 쓰다 끊긴 경우 등 형식이 맞지 않는 줄은 건너뛴다
+                if len(row) != len(LOG_COLUMNS) or row[0] not in ("add", "cancel"):
+                    continue
+                op, 환자번호, 날짜, 항목, 결과 = row
+                try:
+                    key = make_key(환자번호, 날짜, 항목)
+                except ValueError:
+                    continue
+                if op == "add":
+                    self._done[key] = 결과
+                    self._track(key)
+                else:
+                    self._done.pop(key, None)
+                    self._untrack(key)
+                self._log_events += 1
+
+    def _append_log(self, events):
+        if self.log_path is None:
+            return
+        with open(self.log_path, "a", encoding="utf-8", newline="") as f:
+            csv.writer(f).writerows(events)
+            f.flush()
+            os.fsync(f.fileno())
+        self._log_events += len(events)
+        if self._log_events >= self.compact_every:
+            self._compact()
+
+    def _compact(self):
+        # 현재 상태를 스냅샷으로 원자적으로 쓰고 로그를 비운다 (lock 안에서 호출)
+        atomic_write_csv(self.to_frame(), self.snapshot_path)
+        with open(self.log_path, "w", encoding="utf-8") as f:
+            f.flush()
+            os.fsync(f.fileno())
+        self._log_events = 0
+
+    def compact(self):
+        if self.log_path is None:
+            return
+        with self._lock:
+            self._compact()
+
+    def __len__(self):
+        return len(self._done)
+
+    def is_done(self, 환자번호, 날짜, 항목):
+        return make_key(환자번호, 날짜, 항목) in self._done
+
+    def add(self, 환자번호, 날짜, 항목, 결과=""):
+        self.add_many([(환자번호, 날짜, 항목)], 결과)
+
+    def add_many(self, rows, 결과=""):
+        # 여러 건을 한 번의 로그 쓰기로 완료 처리
+        keys = [make_key(*row) for row in rows]
+        with self._lock:
+            for key in keys:
+                self._done[key] = 결과
+                self._track(key)
+            self._index = self._frame = None
+            self._append_log([("add", *key, 결과) for key in keys])
+        self._notify("add", keys)
+
+    def remove(self, 환자번호, 날짜, 항목):
+        key = make_key(환자번호, 날짜, 항목)
+        with self._lock:
+            self._done.pop(key, None)
+            self._untrack(key)
+            self._index = self._frame = None
+            self._append_log([("cancel", *key, "")])
+        self._notify("cancel", [key])
+
+    def _track(self, key):
+        self._by_patient.setdefault(key[0], set()).add(key)
+        self._by_date.setdefault(key[1], set()).add(key)
+
+    def _untrack(self, key):
+        for index, part in ((self._by_patient, key[0]), (self._by_date, key[1])):
+            keys = index.get(part)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del index[part]
+
+    def _notify(self, op, keys):
+        for listener in list(self.listeners):  # 듣는 쪽이 도중에 빠져도 되도록 사본을 돈다
+            listener(op, keys)
+
+    def _keys_index(self):
+        index = self._index
+        if index is None:
+            with self._lock:
+                index = pd.MultiIndex.from_tuples(list(self._done), names=COLUMNS) if self._done \
+                    else pd.MultiIndex.from_arrays([[], [], []], names=COLUMNS)
+                self._index = index
+        return index
+
+    def mark(self, frame):
+        # frame의 (환자번호, 날짜, 항목) 행마다 완료 여부 (bool 배열)
+        if frame.empty or not self._done:
+            return np.zeros(len(frame), dtype=bool)
+        ids = frame["환자번호"].astype(str).to_numpy()
+        dates = normalize_dates(frame["날짜"].to_numpy()).to_numpy()
+        items = frame["항목"].astype(str).to_numpy()
+        if len(frame) < DIRECT_LOOKUP_ROWS:
+            # 화면 하나 분량: 완료 표 전체의 색인을 만들지 않고 키마다 바로 찾는다
+            done = self._done
+            return np.fromiter((key in done for key in zip(ids, dates, items)), dtype=bool, count=len(frame))
+        # 큰 표: 전체 키 색인(변경 전까지 캐시)과 한 번에 비교
+        return pd.MultiIndex.from_arrays([ids, dates, items]).isin(self._keys_index())
+
+    def query(self, 환자번호=None, start=None, end=None, 항목=None):
+        # 조건에 맞는 완료 기록 (환자번호, 날짜, 항목, 결과). 날짜는 start~end 포함
+        start = normalize_date(start) if start is not None else None
+        end = normalize_date(end) if end is not None else None
+        with self._lock:
+            if 환자번호 is not None:
+                # 그 환자의 키만
+                keys = [key for key in self._by_patient.get(str(환자번호), ())
+                        if (start is None or key[1] >= start) and (end is None or key[1] <= end)]
+            else:
+                # 기간 안의 날짜 키만 (날짜 수는 기록 수보다 훨씬 적다)
+                days = [day for day in self._by_date
+                        if (start is None or day >= start) and (end is None or day <= end)]
+                keys = [key for day in days for key in self._by_date[day]]
+            rows = sorted((*key, self._done[key]) for key in keys if 항목 is None or key[2] == 항목)
+        return pd.DataFrame(rows, columns=COLUMNS + ["결과"])
+
+    def to_frame(self):
+        # 읽기 전용으로 사용 (수정이 필요하면 copy)
+        # 만드는 동안 add/remove가 캐시를 비우면 예전 표를 다시 캐시하게 되므로 lock 안에서 만든다
+        frame = self._frame
+        if frame is None:
+            with self._lock:
+                frame = self._frame
+                if frame is None:
+                    items = list(self._done.items())
+                    frame = pd.DataFrame([key for key, _ in items], columns=COLUMNS)
+                    results = [결과 for _, 결과 in items]
+                    if any(results):
+                        frame["결과"] = results
+                    self._frame = frame
+        return frame
+
+    def save(self, path):
+        atomic_write_csv(self.to_frame(), path)
@@ -0,0 +1,304 @@
+# 보고서 내보내기 (점오표 / 담당자별 업무 목록 / 월별 통계 → CSV, XLSX, Parquet)
+# 요청은 대기열에 넣고 바로 돌아오며, 백그라운드 작업자 하나가 차례로 파일을 만든다 → 화면은 멈추지 않는다.
+# 표 전체를 메모리에 만들지 않고 환자 묶음(점오표) / 하루(업무 목록) 단위 조각으로 계산해서 바로 파일에 덧붙인다.
+# 일정은 화면과 같은 ScheduleStore, 완료 여부는 같은 완료 저장소를 읽는다 (다시 계산하지 않음).
+# openpyxl / pyarrow 가 설치되어 있을 때만 XLSX / Parquet 을 고를 수 있다.
+import importlib.util
+import itertools
+import logging
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from grid import grid_long, pivot_grid
+from schedule_engine import 담당자_컬럼
+from stats import filter_by_user
+
+EXPORT_DIR = "exports"
+CHUNK_PATIENTS = 500      # 점오표 한 조각의 환자 수
+KEEP_JOBS = 20            # 이보다 오래된 작업은 파일과 함께 지운다
+XLSX_MAX_ROWS = 1_048_575  # 엑셀 시트 한 장의 행 한도 (헤더 제외). 넘으면 다음 시트로 이어 쓴다
+
+REPORTS = {"grid": "점오표", "worklist": "담당자별 업무 목록", "stats": "월별 통계"}
+WORKLIST_COLUMNS = ["담당자", "날짜", "환자번호", "항목", "완료"]
+STATS_COLUMNS = {"월": "string", "담당자": "string", "항목": "string", "건수": "int64", "환자수": "int64"}
+
+logger = logging.getLogger(__name__)
+
+
+# ---- 조각 단위 파일 쓰기 ----
+class CsvWriter:
+    extension = "csv"
+
+    def __init__(self, path, sheet, empty):
+        # 엑셀에서 바로 열 수 있도록 BOM을 붙인다
+        self._file = open(path, "w", encoding="utf-8-sig", newline="")
+        self._empty = empty
+        self._header = True
+
+    def write(self, frame):
+        frame.to_csv(self._file, index=False, header=self._header)
+        self._header = False
+
+    def close(self):
+        if self._header:
+            self.write(self._empty)
+        self._file.close()
+
+
+class XlsxWriter:
+    extension = "xlsx"
+
+    def __init__(self, path, sheet, empty):
+        from openpyxl import Workbook
+
+        # write_only: 행을 바로 임시 파일로 흘려보내서 시트 전체를 메모리에 두지 않는다
+        self._book = Workbook(write_only=True)
+        self._path = path
+        self._name = sheet
+        self._empty = empty
+        self._sheet = None
+        self._rows = 0
+        self._sheets = 0
+
+    def _next_sheet(self, columns):
+        self._sheets += 1
+        name = self._name if self._sheets == 1 else f"{self._name}_{self._sheets}"
+        self._sheet = self._book.create_sheet(name[:31])
+        self._sheet.append([str(col) for col in columns])
+        self._rows = 0
+
+    def write(self, frame):
+        for row in frame.astype(object).itertuples(index=False, name=None):
+            if self._sheet is None or self._rows >= XLSX_MAX_ROWS:
+                self._next_sheet(frame.columns)
+            self._sheet.append(row)
+            self._rows += 1
+
+    def close(self):
+        if self._sheet is None:
+            self._next_sheet(self._empty.columns)
+        self._book.save(self._path)
+
+
+class ParquetWriter:
+    extension = "parquet"
+
+    def __init__(self, path, sheet, empty):
+        import pyarrow.parquet
+
+        self._path = path
+        self._empty = empty
+        self._pq = pyarrow.parquet
+        self._writer = None
+
+    def write(self, frame):
+        import pyarrow as pa
+
+        table = pa.Table.from_pandas(frame, preserve_index=False)
+        if self._writer is None:
+            self._writer = self._pq.ParquetWriter(self._path, table.schema)
+        else:
+            table = table.cast(self._writer.schema)
+        self._writer.write_table(table)
+
+    def close(self):
+        if self._writer is None:
+            # 행이 하나도 없어도 열 이름과 형식은 있는 파일을 남긴다
+            self.write(self._empty)
+        self._writer.close()
+
+
+WRITERS = {"csv": CsvWriter, "xlsx": XlsxWriter, "parquet": ParquetWriter}
+REQUIRES = {"xlsx": "openpyxl", "parquet": "pyarrow"}
+
+
+def available_formats():
+    return [fmt for fmt in WRITERS if fmt not in REQUIRES or importlib.util.find_spec(REQUIRES[fmt]) is not None]
+
+
+# ---- 보고서별 조각 만들기 ----
+def empty_report(report, start, end):
+    # 내보낼 행이 없을 때 쓰는 빈 표 (조각과 같은 열)
+    if report == "grid":
+        columns = ["환자번호", "항목"] + [day.isoformat() for day in pd.date_range(start, end).date]
+    elif report == "worklist":
+        columns = WORKLIST_COLUMNS
+    else:
+        return pd.DataFrame({col: pd.Series(dtype=dtype) for col, dtype in STATS_COLUMNS.items()})
+    return pd.DataFrame({col: pd.Series(dtype="string") for col in columns})
+
+
+def staff_patients(patient_db, user):
+    # user가 한 항목이라도 담당하는 환자번호 ("전체 관리자"/None은 전체)
+    ids = patient_db["환자번호"].astype(str)
+    if user is None or user == "전체 관리자":
+        return sorted(ids.unique())
+    mine = patient_db[담당자_컬럼].eq(user).any(axis=1).to_numpy()
+    return sorted(ids[mine].unique())
+
+
+def grid_chunks(store, completions, patient_db, start, end, user=None, chunk_patients=CHUNK_PATIENTS):
+    # 환자 chunk_patients 명씩 점오표 행을 만든다. 열(날짜)은 모든 조각이 같다
+    ids = staff_patients(patient_db, user)
+    dates = list(pd.date_range(start, end).date)
+    completed = completions.query(start=start, end=end)
+    for lo in range(0, len(ids), chunk_patients):
+        long = grid_long(store, completions, ids[lo:lo + chunk_patients], start, end, completed)
+        if long.empty:
+            continue
+        grid = pivot_grid(long, dates)
+        grid.columns = [day.isoformat() for day in dates]
+        yield grid.reset_index()
+
+
+def worklist_chunks(store, completions, start, end, user=None):
+    # 하루씩: 그 날 해야 하는 검사와 완료 여부 (담당자 순). 담당자 한 명이면 담당자 색인으로 맡은 환자만 계산
+    for day in pd.date_range(start, end).date:
+        if user is None or user == "전체 관리자":
+            due = store.due_on(day)
+        else:
+            due = store.worklist(user, day)
+        if due.empty:
+            continue
+        due = due.assign(완료=np.where(completions.mark(due), "완료", "미완료"))
+        yield due.sort_values(["담당자", "환자번호", "항목"])[WORKLIST_COLUMNS]
+
+
+def stats_chunks(store, start, end, user=None):
+    # (월, 담당자, 항목) → 검사 건수, 환자 수. 월별 큐브에서 바로 묶으므로 작은 표 하나
+    cube = filter_by_user(store.cube, user)
+    cube = cube[(cube["월"] >= pd.Timestamp(start).strftime("%Y-%m")) & (cube["월"] <= pd.Timestamp(end).strftime("%Y-%m"))]
+    yield cube.groupby(["월", "담당자", "항목"], dropna=False).agg(
+        건수=("건수", "sum"), 환자수=("환자번호", "nunique")
+    ).reset_index()
+
+
+# ---- 작업 대기열 ----
+class ExportJob:
+    def __init__(self, job_id, report, fmt, start, end, user):
+        self.id = job_id
+        self.report = report
+        self.format = fmt
+        self.start = start
+        self.end = end
+        self.user = user
+        self.status = "대기"        # 대기 → 진행 중 → 완료 / 실패
+        self.rows = 0
+        self.path = None
+        self.error = None
+        self.created = datetime.now()
+        self.seconds = None
+
+    @property
+    def filename(self):
+        return f"{REPORTS[self.report]}_{self.start}_{self.end}_{self.id}.{WRITERS[self.format].extension}"
+
+    def to_record(self):
+        return {
+            "번호": self.id,
+            "보고서": REPORTS[self.report],
+            "형식": self.format,
+            "기간": f"{self.start} ~ {self.end}",
+            "요청자": self.user,
+            "상태": self.status,
+            "행 수": self.rows,
+            "소요(초)": round(self.seconds, 1) if self.seconds is not None else None,
+            "오류": self.error or "",
+        }
+
+
+class ExportQueue:
+    def __init__(self, schedule_store, storage, directory=EXPORT_DIR, keep=KEEP_JOBS):
+        self.schedule_store = schedule_store
+        self.storage = storage
+        self.directory = directory
+        self.keep = keep
+        self._lock = threading.Lock()
+        self._jobs = {}
+        self._ids = itertools.count(1)
+        self._queue = queue.Queue()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            os.makedirs(self.directory, exist_ok=True)
+            self._thread = threading.Thread(target=self._run, name="exports", daemon=True)
+            self._thread.start()
+        return self
+
+    def submit(self, report, fmt, start, end, user=None):
+        if report not in REPORTS:
+            raise ValueError(f"알 수 없는 보고서: {report}")
+        if fmt not in available_formats():
+            raise ValueError(f"사용할 수 없는 형식: {fmt}")
+        with self._lock:
+            job = ExportJob(next(self._ids), report, fmt, start, end, user)
+            self._jobs[job.id] = job
+            self._trim()
+        self._queue.put(job)
+        return job
+
+    def jobs(self, user=None):
+        # 최근 작업부터. user를 주면 그 사용자가 요청한 작업만
+        with self._lock:
+            jobs = list(self._jobs.values())
+        return [job for job in reversed(jobs) if user is None or job.user == user]
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def _trim(self):
+        # lock 안에서 호출. 끝난 작업 중 오래된 것부터 파일과 함께 지운다
+        finished = [job for job in self._jobs.values() if job.status in ("완료", "실패")]
+        for job in finished[:max(0, len(self._jobs) - self.keep)]:
+            del self._jobs[job.id]
+            if job.path and os.path.exists(job.path):
+                os.remove(job.path)
+
+    def _chunks(self, job):
+        patient_db = self.storage.patients()
+        self.schedule_store.sync(patient_db)
+        completions = self.storage.completions
+        if job.report == "grid":
+            return grid_chunks(self.schedule_store, completions, patient_db, job.start, job.end, job.user)
+        if job.report == "worklist":
+            return worklist_chunks(self.schedule_store, completions, job.start, job.end, job.user)
+        return stats_chunks(self.schedule_store, job.start, job.end, job.user)
+
+    def run(self, job):
+        # 임시 파일에 조각을 이어 쓰고, 다 쓰면 이름을 바꾼다 (다운로드 중 덜 쓴 파일을 보지 않도록)
+        job.status = "진행 중"
+        started = time.perf_counter()
+        path = os.path.join(self.directory, job.filename)
+        part = path + ".part"
+        try:
+            writer = WRITERS[job.format](part, REPORTS[job.report], empty_report(job.report, job.start, job.end))
+            try:
+                for chunk in self._chunks(job):
+                    writer.write(chunk)
+                    job.rows += len(chunk)
+                    time.sleep(0)  # 조각마다 다른 세션의 스레드에 차례를 넘긴다
+            finally:
+                writer.close()
+            os.replace(part, path)
+            job.path = path
+            job.status = "완료"
+        except Exception as e:
+            job.error = f"{type(e).__name__}: {e}"
+            job.status = "실패"
+            logger.exception("내보내기 작업 %s 실패", job.id)
+            if os.path.exists(part):
+                os.remove(part)
+        job.seconds = time.perf_counter() - started
+        return job
+
+    def _run(self):
+        while True:
+            self.run(self._queue.get())
@@ -0,0 +1,46 @@
+# 점오표 (환자 × 항목 행, 날짜 열)
+# 대시보드 화면과 내보내기(exports.py)가 같은 계산을 쓴다.
+import numpy as np
+import pandas as pd
+
+from schedule_engine import to_markers, 항목_목록
+
+
+def grid_long(store, completions, ids, start, end, completed=None):
+    # (환자번호, 날짜, 항목, 검사, 표시) 긴 형태. 완료 결과가 있으면 결과를, 없으면 ● 표시
+    # completed: 미리 조회한 completions.query(start=start, end=end) (여러 페이지를 이어서 만들 때 한 번만 조회)
+    window = store.window(ids, start, end)
+    melted = to_markers(window).melt(
+        id_vars=["환자번호", "날짜"],
+        value_vars=항목_목록,
+        var_name="항목",
+        value_name="검사"
+    )
+    melted["환자번호"] = melted["환자번호"].astype(str)
+    melted["날짜"] = melted["날짜"].dt.date
+
+    if completed is None:
+        completed = completions.query(start=start, end=end)
+    completed = completed[(completed["결과"] != "") & completed["환자번호"].isin([str(i) for i in ids])]
+    if completed.empty:
+        melted["표시"] = melted["검사"]
+        return melted
+    completed = completed.assign(날짜=pd.to_datetime(completed["날짜"]).dt.date)
+    merged = pd.merge(melted, completed, on=["환자번호", "항목", "날짜"], how="left")
+    결과 = merged["결과"].to_numpy()
+    merged["표시"] = np.where(pd.notna(결과) & (결과 != ""), 결과, merged["검사"].to_numpy())
+    return merged.drop(columns="결과")
+
+
+def pivot_grid(long, dates=None):
+    # dates를 주면 그 날짜들을 모두 열로 둔다 (조각별로 나눠 쓸 때 열을 맞추기 위해)
+    grid = long.pivot_table(
+        index=["환자번호", "항목"],
+        columns="날짜",
+        values="표시",
+        aggfunc="first",
+        fill_value=""
+    )
+    if dates is not None:
+        grid = grid.reindex(columns=dates, fill_value="")
+    return grid
@@ -0,0 +1,55 @@
+# 외래 일정 색인
+# patient_db의 "외래일" 문자열("2025-07-23|2025-10-01")을 (환자번호, 외래일) 행으로 펼쳐 날짜순으로 정렬해 둔다.
+# 하루/기간 조회는 정렬된 배열에서 이분 탐색(searchsorted)으로 찾는다 (문자열 포함 검색 X).
+import threading
+
+import numpy as np
+import pandas as pd
+
+
+def parse_visits(patient_db):
+    # (환자번호, 외래일) 표. 형식이 잘못된 날짜는 버린다
+    if patient_db.empty or "외래일" not in patient_db.columns:
+        return pd.DataFrame({"환자번호": pd.Series([], dtype=object), "외래일": pd.Series([], dtype="datetime64[ns]")})
+    exploded = patient_db[["환자번호", "외래일"]].astype(str).assign(
+        외래일=lambda df: df["외래일"].str.split("|")
+    ).explode("외래일")
+    exploded["외래일"] = pd.to_datetime(exploded["외래일"].str.strip(), format="%Y-%m-%d", errors="coerce")
+    exploded = exploded.dropna(subset=["외래일"]).drop_duplicates()
+    return exploded.sort_values(["외래일", "환자번호"], ignore_index=True)
+
+
+class VisitIndex:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._hash = None
+        self._visits = parse_visits(pd.DataFrame())
+        self._days = np.array([], dtype="datetime64[D]")
+
+    def sync(self, patient_db):
+        # 외래일 컬럼이 바뀐 경우에만 다시 만든다
+        if patient_db.empty:
+            new_hash = 0
+        else:
+            new_hash = int(pd.util.hash_pandas_object(patient_db[["환자번호", "외래일"]].astype(str), index=False).sum())
+        with self._lock:
+            if new_hash != self._hash:
+                self._visits = parse_visits(patient_db)
+                self._days = self._visits["외래일"].to_numpy().astype("datetime64[D]")
+                self._hash = new_hash
+        return self
+
+    def between(self, start, end):
+        # start~end(포함) 사이의 외래 방문 (날짜순)
+        lo = np.searchsorted(self._days, np.datetime64(start, "D"), side="left")
+        hi = np.searchsorted(self._days, np.datetime64(end, "D"), side="right")
+        visits = self._visits.iloc[lo:hi].copy()
+        visits["외래일"] = visits["외래일"].dt.date
+        return visits.reset_index(drop=True)
+
+    def on(self, day):
+        return self.between(day, day)
+
+    def for_patient(self, 환자번호):
+        visits = self._visits
+        return visits.loc[visits["환자번호"] == str(환자번호), "외래일"].dt.date.tolist()
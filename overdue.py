@@ -0,0 +1,195 @@
+# 누락(미완료) 검사 추적
+# 예정일 D + 유예 기간(grace)이 지났는데 완료 기록이 없는 검사를 (환자번호, 항목) → 누락 날짜 배열로 들고 있다.
+# - 처음 한 번 전체 일정을 훑어 채우고, 이후에는 날짜가 바뀔 때 새로 지난 날만 더한다 (하루 한 번)
+# - 환자 규칙이 바뀐 환자만 다시 계산한다 (ScheduleStore의 fingerprint 비교)
+# - 완료/취소는 완료 저장소의 이벤트(listeners)로 받아 해당 키만 빼거나 다시 넣는다
+# → 화면에서는 전체 일정을 다시 훑지 않고 읽기만 한다 (환자별 목록, 환자×항목별 건수).
+import threading
+import weakref
+
+import numpy as np
+import pandas as pd
+
+from schedule_engine import evaluate, has, 항목_목록
+
+GRACE_DAYS = {항목: 0 for 항목 in 항목_목록}   # 항목별 유예 일수: 예정일 + 유예 일수가 지나야 누락
+SCAN_PATIENTS = 500                             # 처음 계산할 때 한 번에 훑는 환자 수
+MISSED_COLUMNS = ["환자번호", "날짜", "항목"]
+EMPTY_DAYS = np.array([], dtype="datetime64[D]")
+
+
+def _weak_listener(tracker, listeners):
+    def listener(op, keys):
+        target = ref()
+        if target is not None:
+            target._on_event(op, keys)
+
+    def unregister(_):
+        if listener in listeners:
+            listeners.remove(listener)
+
+    ref = weakref.ref(tracker, unregister)
+    return listener
+
+
+class OverdueTracker:
+    def __init__(self, schedule_store, completions, grace=None):
+        self.store = schedule_store
+        self.completions = completions
+        self.grace = {**GRACE_DAYS, **(grace or {})}
+        self._lock = threading.RLock()
+        self._missed = {}       # (환자번호, 항목) → 정렬된 datetime64[D] 배열
+        self._counts = None     # counts() 결과 (변경 시 다시 만든다)
+        self._today = None      # 마지막으로 계산한 기준일
+        self._fingerprints = pd.Series(dtype="uint64")
+        # 완료 저장소가 추적기를 붙잡지 않도록 약한 참조로 등록한다. 추적기가 버려지면(캐시 비움 등) 저절로 빠진다
+        self._listener = _weak_listener(self, completions.listeners)
+        completions.listeners.append(self._listener)
+
+    def close(self):
+        # 완료 저장소 이벤트 구독을 끊는다 (여러 번 불러도 된다)
+        if self._listener in self.completions.listeners:
+            self.completions.listeners.remove(self._listener)
+
+    def cutoff(self, 항목, today=None):
+        # 이 날짜까지의 예정 검사는 완료 기록이 없으면 누락
+        today = self._today if today is None else np.datetime64(today, "D")
+        return today - np.timedelta64(1 + int(self.grace[항목]), "D")
+
+    # ---- 갱신 ----
+    def refresh(self, today):
+        # 일정 저장소(sync 이후)와 맞춘다. 날짜가 그대로이고 바뀐 환자가 없으면 아무 일도 하지 않는다
+        today = np.datetime64(today, "D")
+        with self._lock:
+            fp = self.store.fingerprints
+            changed = fp.index[fp.ne(self._fingerprints.reindex(fp.index))]
+            removed = self._fingerprints.index.difference(fp.index)
+            if self._today == today and len(changed) == 0 and len(removed) == 0:
+                return False
+            if self.store.rules is None:
+                return False
+
+            for 환자번호 in changed.union(removed):
+                for 항목 in 항목_목록:
+                    self._missed.pop((환자번호, 항목), None)
+            found = [self._scan(changed, None, today)]
+            if self._today is not None and today > self._today:
+                # 날짜가 바뀜: 나머지 환자는 지난번 기준일 이후로 새로 지난 날만
+                found.append(self._scan(fp.index.difference(changed), self._today, today))
+            self._add(pd.concat(found, ignore_index=True))
+            self._fingerprints = fp
+            self._today = today
+            self._counts = None
+            return True
+
+    def _scan(self, ids, since, today):
+        # ids 환자의 (since 기준 cutoff, today 기준 cutoff] 구간에서 완료되지 않은 예정 검사
+        ids = list(ids)
+        if not ids:
+            return pd.DataFrame(columns=MISSED_COLUMNS)
+        rules = self.store.rules
+        ends = {항목: self.cutoff(항목, today) for 항목 in 항목_목록}
+        starts = {항목: None if since is None else self.cutoff(항목, since) + np.timedelta64(1, "D") for 항목 in 항목_목록}
+        end = max(ends.values())
+        if since is None:
+            pidx = pd.Index(rules["환자번호"]).get_indexer(ids)
+            start = rules["baseline"][pidx[pidx >= 0]].min() if (pidx >= 0).any() else end
+        else:
+            start = min(starts.values())
+        if start > end:
+            return pd.DataFrame(columns=MISSED_COLUMNS)
+
+        frames = []
+        for lo in range(0, len(ids), SCAN_PATIENTS):
+            window = self.store.window(ids[lo:lo + SCAN_PATIENTS], start, end)
+            days = window["날짜"].to_numpy().astype("datetime64[D]")
+            for 항목 in 항목_목록:
+                hit = has(window, 항목) & (days <= ends[항목])
+                if starts[항목] is not None:
+                    hit &= days >= starts[항목]
+                frames.append(pd.DataFrame({
+                    "환자번호": window["환자번호"].to_numpy()[hit].astype(str),
+                    "날짜": days[hit],
+                    "항목": 항목,
+                }))
+        due = pd.concat(frames, ignore_index=True)
+        return due[~self.completions.mark(due)]
+
+    def _add(self, found):
+        if found.empty:
+            return
+        days = found["날짜"].to_numpy().astype("datetime64[D]")
+        for key, pos in found.groupby(["환자번호", "항목"], sort=False).indices.items():
+            merged = np.concatenate([self._missed.get(key, EMPTY_DAYS), days[pos]])
+            self._missed[key] = np.unique(merged)
+
+    def _on_event(self, op, keys):
+        # 완료 저장소 이벤트: op "add" → 누락에서 뺀다, "cancel" → 이미 지난 예정 검사면 다시 누락
+        with self._lock:
+            if self._today is None:
+                return
+            for 환자번호, 날짜, 항목 in keys:
+                if 항목 not in self.grace:
+                    continue
+                key = (환자번호, 항목)
+                day = np.datetime64(날짜, "D")
+                days = self._missed.get(key, EMPTY_DAYS)
+                if op == "add":
+                    if day in days:
+                        self._missed[key] = days[days != day]
+                elif day <= self.cutoff(항목) and self._scheduled(환자번호, day, 항목):
+                    self._missed[key] = np.union1d(days, [day])
+            self._counts = None
+
+    def _scheduled(self, 환자번호, day, 항목):
+        rules = self.store.rules
+        if rules is None:
+            return False
+        pidx = np.flatnonzero(rules["환자번호"] == 환자번호)
+        if len(pidx) == 0:
+            return False
+        offset = (day - rules["baseline"][pidx[-1:]]).astype(np.int64)
+        if offset[0] < 0 or offset[0] >= self.store.horizon:
+            return False
+        return bool(evaluate(rules, pidx[-1:], np.array([day]), [항목])[항목][0])
+
+    # ---- 조회 ----
+    def missed(self, 환자번호=None, 항목=None):
+        # 누락 검사 (환자번호, 날짜, 항목). 환자번호를 주면 그 환자 것만 바로 찾는다
+        items = [항목] if 항목 is not None else 항목_목록
+        if 환자번호 is not None:
+            return self.missed_for([(str(환자번호), i) for i in items])
+        with self._lock:
+            pairs = [(key, days) for key, days in self._missed.items() if key[1] in items]
+        return self._frame(pairs)
+
+    def missed_for(self, keys):
+        # 주어진 (환자번호, 항목) 들의 누락 검사만 (담당자 업무 목록 등)
+        with self._lock:
+            pairs = [(key, self._missed[key]) for key in keys if key in self._missed]
+        return self._frame(pairs)
+
+    def _frame(self, pairs):
+        pairs = [(key, days) for key, days in pairs if len(days)]
+        if not pairs:
+            return pd.DataFrame(columns=MISSED_COLUMNS)
+        return pd.DataFrame({
+            "환자번호": np.repeat([key[0] for key, _ in pairs], [len(days) for _, days in pairs]),
+            "날짜": np.concatenate([days for _, days in pairs]).astype(object),
+            "항목": np.repeat([key[1] for key, _ in pairs], [len(days) for _, days in pairs]),
+        }).sort_values(["환자번호", "날짜", "항목"], ignore_index=True)
+
+    def counts(self):
+        # (환자번호, 항목) → 누락 건수. progress_stats의 Drop률에 쓴다
+        counts = self._counts
+        if counts is None:
+            with self._lock:
+                index = pd.MultiIndex.from_tuples(list(self._missed), names=["환자번호", "항목"]) if self._missed \
+                    else pd.MultiIndex.from_arrays([[], []], names=["환자번호", "항목"])
+                counts = pd.Series([len(days) for days in self._missed.values()], index=index, dtype=np.int64,
+                                   name="누락건수")
+                self._counts = counts
+        return counts
+
+    def total(self):
+        return int(self.counts().sum())
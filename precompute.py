@@ -0,0 +1,107 @@
+# 전체 환자 일정 일괄 계산 (여러 프로세스)
+#   python precompute.py                          # patients.csv → schedule_snapshot/
+#   python precompute.py cohort.csv --workers 8 --out schedule_snapshot
+# 환자를 조각(shard)으로 나눠 ProcessPoolExecutor로 동시에 계산하고, 각 프로세스가 미리 잡아 둔
+# 컬럼 파일(schedule_snapshot.py)의 자기 구간에 바로 쓴다 → 큰 결과를 프로세스 사이로 주고받지 않는다.
+# 앱은 시작할 때 이 스냅샷을 읽고, 이후에는 바뀐 환자만 다시 계산한다 (ScheduleStore.load_snapshot).
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+import schedule_snapshot
+from schedule_engine import HORIZON_DAYS, build_schedules, compile_rules
+from schedule_store import fingerprint
+from stats import empty_cube, monthly_counts
+
+SHARDS_PER_WORKER = 4   # 조각을 작업자 수보다 잘게 나눠 느린 조각 하나가 전체를 붙잡지 않게 한다
+
+
+def _build_shard(directory, shard, start_row, horizon):
+    table = build_schedules(shard, horizon)
+    rows = schedule_snapshot.write_rows(directory, start_row, table)
+    return rows, monthly_counts(table, shard)
+
+
+def write_parquet(snapshot, path):
+    # pyarrow가 설치되어 있을 때만 (없으면 .npy 스냅샷만 쓴다)
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        return False
+    table = snapshot.table()
+    pq.write_table(pa.Table.from_pandas(table, preserve_index=False), path)
+    return True
+
+
+def precompute(patient_db, directory=schedule_snapshot.SNAPSHOT_DIR, workers=None, horizon=HORIZON_DAYS, parquet=False):
+    # 스냅샷을 만들고 {환자 수, 행 수, 걸린 시간, 처리량} 을 돌려준다
+    started = time.perf_counter()
+    patient_db = patient_db.drop_duplicates("환자번호", keep="last").reset_index(drop=True)
+    compile_rules(patient_db)  # 잘못된 규칙은 작업자를 띄우기 전에 한 번에 알린다
+    workers = workers or os.cpu_count() or 1
+    shard_size = max(1, -(-len(patient_db) // (workers * SHARDS_PER_WORKER)))
+
+    fingerprints = fingerprint(patient_db)
+    staging = schedule_snapshot.staging_dir(directory)
+    try:
+        rows = schedule_snapshot.allocate(staging, patient_db["환자번호"].astype(str).to_numpy(), fingerprints.to_numpy(), horizon)
+
+        cubes = []
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                pool.submit(_build_shard, staging, patient_db.iloc[lo:lo + shard_size], lo * horizon, horizon)
+                for lo in range(0, len(patient_db), shard_size)
+            ]
+            written = 0
+            for future in futures:
+                shard_rows, cube = future.result()
+                written += shard_rows
+                cubes.append(cube)
+        if written != rows:
+            raise RuntimeError(f"일정 행 수가 맞지 않습니다: {written} / {rows}")
+
+        cube = pd.concat(cubes, ignore_index=True) if cubes else empty_cube()
+        schedule_snapshot.finish(staging, directory, cube, horizon)
+    except BaseException:
+        schedule_snapshot.discard(staging)
+        raise
+    if parquet:
+        parquet = write_parquet(schedule_snapshot.read_snapshot(directory), os.path.join(directory, "schedule.parquet"))
+
+    elapsed = time.perf_counter() - started
+    return {
+        "patients": len(patient_db),
+        "rows": rows,
+        "workers": workers,
+        "seconds": elapsed,
+        "patients_per_second": len(patient_db) / elapsed if elapsed else 0.0,
+        "rows_per_second": rows / elapsed if elapsed else 0.0,
+        "parquet": parquet,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="전체 환자 일정을 여러 프로세스로 미리 계산")
+    parser.add_argument("patients", nargs="?", default="patients.csv")
+    parser.add_argument("--out", default=schedule_snapshot.SNAPSHOT_DIR)
+    parser.add_argument("--workers", type=int, default=None, help="기본값: CPU 코어 수")
+    parser.add_argument("--parquet", action="store_true", help="schedule.parquet도 함께 저장 (pyarrow 필요)")
+    args = parser.parse_args(argv)
+
+    patient_db = pd.read_csv(args.patients, dtype=str, keep_default_na=False)
+    report = precompute(patient_db, args.out, args.workers, parquet=args.parquet)
+    print(f"환자 {report['patients']:,}명 / 일정 {report['rows']:,}행 → {args.out}")
+    print(f"작업자 {report['workers']}개, {report['seconds']:.2f}초 "
+          f"({report['patients_per_second']:,.0f}명/초, {report['rows_per_second']:,.0f}행/초)")
+    if args.parquet and not report["parquet"]:
+        print("pyarrow가 없어 Parquet 파일은 만들지 않았습니다.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,102 @@
+# 화면 갱신(rerun)별 단계 시간 측정
+# 켜져 있을 때만 기록한다 (PROFILE=1 환경 변수 또는 주소 뒤 ?debug=1). 꺼져 있으면 stage()는 시간만 재지 않고 그대로 통과한다.
+# Streamlit은 세션마다 다른 스레드에서 스크립트를 돌리므로 현재 측정 중인 기록은 스레드별로 둔다.
+# 한 번의 rerun이 끝나면 profile_trace.jsonl 에 한 줄(JSON)로 덧붙인다.
+import json
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+TRACE_PATH = "profile_trace.jsonl"
+
+_current = threading.local()
+
+
+class Stage:
+    def __init__(self, name):
+        self.name = name
+        self.seconds = 0.0
+        self.rows = None
+        self.cells = None
+
+    def count(self, frame=None, rows=None, cells=None):
+        # 처리한 표 크기 기록 (DataFrame을 넘기면 행/셀 수를 알아서 센다)
+        if frame is not None:
+            rows, cells = len(frame), frame.size
+        self.rows = rows
+        self.cells = cells if cells is not None else self.cells
+
+
+class _NoStage:
+    def count(self, frame=None, rows=None, cells=None):
+        pass
+
+
+_NO_STAGE = _NoStage()
+
+
+class RerunProfile:
+    def __init__(self, page):
+        self.page = page
+        self.started = time.perf_counter()
+        self.timestamp = datetime.now().isoformat(timespec="seconds")
+        self.stages = []
+        self.total = None
+
+    def table(self):
+        # 사이드바 표시용 (pandas 없이 st.dataframe에 바로 넘길 수 있는 형태)
+        return [
+            {"단계": s.name, "ms": round(s.seconds * 1000, 1), "행": s.rows, "셀": s.cells}
+            for s in self.stages
+        ]
+
+    def to_record(self):
+        return {
+            "time": self.timestamp,
+            "page": self.page,
+            "total_ms": round((self.total or 0) * 1000, 1),
+            "stages": [
+                {"name": s.name, "ms": round(s.seconds * 1000, 1), "rows": s.rows, "cells": s.cells}
+                for s in self.stages
+            ],
+        }
+
+
+def start(page, enabled):
+    # rerun 시작 시 호출. enabled가 아니면 이번 rerun은 기록하지 않는다
+    _current.profile = RerunProfile(page) if enabled else None
+    return _current.profile
+
+
+def current():
+    return getattr(_current, "profile", None)
+
+
+@contextmanager
+def stage(name):
+    # with stage("일정 계산") as s: ... ; s.count(df)
+    profile = current()
+    if profile is None:
+        yield _NO_STAGE
+        return
+    record = Stage(name)
+    began = time.perf_counter()
+    try:
+        yield record
+    finally:
+        record.seconds = time.perf_counter() - began
+        profile.stages.append(record)
+
+
+def finish(trace_path=TRACE_PATH):
+    # rerun 끝에 호출 → 전체 시간을 채우고 trace 파일에 한 줄 덧붙인 뒤 기록을 돌려준다
+    profile = current()
+    if profile is None:
+        return None
+    _current.profile = None
+    profile.total = time.perf_counter() - profile.started
+    if trace_path:
+        with open(trace_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(profile.to_record(), ensure_ascii=False) + "\n")
+    return profile
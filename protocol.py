@@ -0,0 +1,340 @@
+# 검사 일정 프로토콜
+# 검사별 규칙(주기, 기준일, 구간, horizon)을 코드 대신 dict/JSON으로 선언하고,
+# 한 번 컴파일해서 numpy 벡터 평가기로 만든다. 같은 정의는 버전(내용 해시)별로 한 번만 컴파일한다.
+#
+# 검사 규칙 종류 (검사마다 하나):
+#   every_days  기준일(from)부터 N일마다. N은 고정 정수 또는 {"column": 환자 컬럼, "values": {값: 일수}}
+#               also_on: 추가로 검사하는 날짜 컬럼 목록
+#   weekdays    매주 지정 요일 (0=월 ... 6=일). daily_when 조건을 만족하는 환자는 매일
+#   windows     기준일(from)에서 n개월째 날을 기준으로 days일 구간
+#               start_at_months: 그 날부터 시작하는 구간, end_at_months: 그 날에 끝나는 구간
+#               end_every_months: horizon 안에서 k개월마다 끝나는 구간 (여러 해짜리 프로토콜용)
+# 공통 옵션: when(이 조건을 만족하는 환자만), horizon_days(기준일부터 이 기간만, 프로토콜 horizon 이하)
+# 조건: {"column": 컬럼, "equals" | "not_equals" | "in" | "not_in": 값}
+#
+# 환경 변수 SCHEDULE_PROTOCOL에 JSON 파일 경로를 주면 기본 프로토콜 대신 그 파일을 쓴다.
+#
+# 환자 표 컬럼: 프로토콜이 읽는 규칙 컬럼과 검사마다 "{검사}_담당자" 컬럼이 필요하다.
+# 저장소(storage.PATIENT_COLUMNS, SQLite 표)는 이 컬럼들을 프로토콜에서 만들어 덧붙이고,
+# 등록/수정 화면은 담당자와 기본 밖의 규칙 컬럼(글자 입력)을 프로토콜에서 만든다.
+# 단, 기본 규칙 입력(음성_주기 선택지, 착용 여부 등)은 기본 프로토콜에 맞춘 고정 위젯이고
+# 입력값이 프로토콜의 values 에 있는지는 compile_rules 에서야 검사한다.
+import hashlib
+import json
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_PROTOCOL = {
+    "name": "기본 프로토콜",
+    "anchor": "Baseline",       # horizon의 시작일 컬럼
+    "horizon_days": 365,        # baseline부터 1년
+    "tests": {
+        "음성": {
+            "every_days": {"column": "음성_주기", "values": {"1w": 7, "2w": 14, "1m": 30}},
+            "from": "Start_date",
+            "also_on": ["Baseline"],
+        },
+        "증상": {
+            "weekdays": [0, 2, 4, 5],   # weekly 증상: 월, 수, 금, 토
+            "daily_when": {"column": "증상_주기", "equals": "daily"},
+        },
+        "환경": {
+            # 0일부터 4주, 이후 3,6,9,12개월의 앞단 4주
+            "windows": {"days": 28, "from": "Baseline", "start_at_months": [0], "end_at_months": [3, 6, 9, 12]},
+            "when": {"column": "환경_사용", "not_equals": "비착용"},
+        },
+        "웨어러블": {
+            # 0일부터 2주, 이후 3,6,9,12개월의 앞단 2주
+            "windows": {"days": 14, "from": "Baseline", "start_at_months": [0], "end_at_months": [3, 6, 9, 12]},
+            "when": {"column": "웨어러블_사용", "not_equals": "비착용"},
+        },
+    },
+}
+MAX_TESTS = 8   # 일정 표의 검사 비트마스크가 uint8
+
+
+def to_days(values):
+    # "YYYY-MM-DD" 문자열 / date / Timestamp / datetime64 → datetime64[D] 배열 (completion_store.normalize_dates와 같은 규칙)
+    values = pd.Series(values)
+    if not pd.api.types.is_datetime64_any_dtype(values):
+        values = values.map(lambda v: v.strip() if isinstance(v, str) else v)
+    parsed = pd.to_datetime(values, format="mixed").dt.normalize()
+    return parsed.to_numpy().astype("datetime64[D]")
+
+
+def add_months(days, months):
+    # relativedelta(months=+m)와 같은 규칙: 해당 월에 같은 날이 없으면 말일로 맞춘다
+    month_start = days.astype("datetime64[M]")
+    day_offset = days - month_start.astype("datetime64[D]")
+    target = month_start + months
+    month_len = (target + 1).astype("datetime64[D]") - target.astype("datetime64[D]")
+    return target.astype("datetime64[D]") + np.minimum(day_offset, month_len - np.timedelta64(1, "D"))
+
+
+def weekday(days):
+    return (days.astype(np.int64) + 3) % 7  # 1970-01-01은 목요일
+
+
+# ---- 조건 ----
+CONDITIONS = {
+    "equals": lambda values, arg: values == arg,
+    "not_equals": lambda values, arg: values != arg,
+    "in": lambda values, arg: values.isin(arg),
+    "not_in": lambda values, arg: ~values.isin(arg),
+}
+
+
+def _check_keys(name, spec, allowed):
+    unknown = set(spec) - set(allowed)
+    if unknown:
+        raise ValueError(f"{name}: 알 수 없는 설정 {sorted(unknown)}")
+
+
+def compile_condition(name, spec):
+    # 조건 → (환자 표 → bool 배열) 함수. 조건이 없으면 None
+    if spec is None:
+        return None
+    ops = [op for op in CONDITIONS if op in spec]
+    _check_keys(name, spec, ["column"] + list(CONDITIONS))
+    if "column" not in spec or len(ops) != 1:
+        raise ValueError(f"{name}: 조건은 column과 {'/'.join(CONDITIONS)} 중 하나가 필요합니다")
+    column, op = spec["column"], ops[0]
+    return lambda patient_db: CONDITIONS[op](patient_db[column], spec[op]).to_numpy()
+
+
+# ---- 검사 규칙 ----
+class Test:
+    # 검사 하나의 규칙. compile()은 환자 표 → 환자별 배열, mask()는 (환자, 날짜) 쌍 → bool 배열
+    common_keys = ["when", "horizon_days"]
+    keys = []
+
+    def __init__(self, name, spec, protocol_horizon):
+        _check_keys(name, spec, self.common_keys + self.keys)
+        self.name = name
+        self.spec = spec
+        self.when = compile_condition(name, spec.get("when"))
+        self.horizon = int(spec.get("horizon_days", protocol_horizon))
+        if not 0 < self.horizon <= protocol_horizon:
+            raise ValueError(f"{name}: horizon_days는 1~{protocol_horizon} 사이여야 합니다")
+        self.limited = self.horizon < protocol_horizon
+        self.columns = [spec["when"]["column"]] if self.when else []
+        self.date_columns = []      # 날짜("YYYY-MM-DD")여야 하는 컬럼
+        self.choices = {}           # 컬럼 → 허용 값 목록 (값마다 규칙이 정해진 컬럼)
+
+    def compile(self, patient_db, baseline):
+        params = self.compile_params(patient_db, baseline)
+        if self.when is not None:
+            params["enabled"] = self.when(patient_db)
+        return params
+
+    def evaluate(self, params, baseline, pidx, days):
+        mask = self.mask(params, pidx, days)
+        if "enabled" in params:
+            mask &= params["enabled"][pidx]
+        if self.limited:
+            mask &= (days - baseline[pidx]).astype(np.int64) < self.horizon
+        return mask
+
+
+class EveryDays(Test):
+    keys = ["every_days", "from", "also_on"]
+
+    def __init__(self, name, spec, protocol_horizon):
+        super().__init__(name, spec, protocol_horizon)
+        self.every = spec["every_days"]
+        self.anchor = spec.get("from", "Baseline")
+        self.also_on = list(spec.get("also_on", []))
+        if isinstance(self.every, dict):
+            _check_keys(name, self.every, ["column", "values"])
+            self.columns.append(self.every["column"])
+            self.choices[self.every["column"]] = list(self.every["values"])
+        elif int(self.every) <= 0:
+            raise ValueError(f"{name}: every_days는 1 이상이어야 합니다")
+        self.columns += [self.anchor] + self.also_on
+        self.date_columns = [self.anchor] + self.also_on
+
+    def compile_params(self, patient_db, baseline):
+        if isinstance(self.every, dict):
+            column = self.every["column"]
+            gap = patient_db[column].map(self.every["values"])
+            if gap.isna().any():
+                잘못된 = patient_db.loc[gap.isna(), "환자번호"].tolist()
+                raise ValueError(f"알 수 없는 {column}: {잘못된}")
+            gap = gap.to_numpy().astype(np.int64)
+        else:
+            gap = np.full(len(patient_db), int(self.every), dtype=np.int64)
+        return {
+            "gap": gap,
+            "from": to_days(patient_db[self.anchor]),
+            "also_on": [to_days(patient_db[col]) for col in self.also_on],
+        }
+
+    def mask(self, params, pidx, days):
+        since = (days - params["from"][pidx]).astype(np.int64)
+        mask = (since >= 0) & (since % params["gap"][pidx] == 0)
+        for extra in params["also_on"]:
+            mask |= days == extra[pidx]
+        return mask
+
+
+class Weekdays(Test):
+    keys = ["weekdays", "daily_when"]
+
+    def __init__(self, name, spec, protocol_horizon):
+        super().__init__(name, spec, protocol_horizon)
+        if not all(isinstance(day, int) and 0 <= day <= 6 for day in spec["weekdays"]):
+            raise ValueError(f"{name}: weekdays는 0(월)~6(일) 정수 목록이어야 합니다")
+        self.table = np.zeros(7, dtype=bool)    # 요일 → 검사 여부 (isin 대신 표 조회)
+        self.table[list(spec["weekdays"])] = True
+        self.daily = compile_condition(name, spec.get("daily_when"))
+        if self.daily:
+            self.columns.append(spec["daily_when"]["column"])
+
+    def compile_params(self, patient_db, baseline):
+        daily = self.daily(patient_db) if self.daily else np.zeros(len(patient_db), dtype=bool)
+        return {"daily": daily}
+
+    def mask(self, params, pidx, days):
+        return params["daily"][pidx] | self.table[weekday(days)]
+
+
+class Windows(Test):
+    keys = ["windows"]
+
+    def __init__(self, name, spec, protocol_horizon):
+        super().__init__(name, spec, protocol_horizon)
+        windows = spec["windows"]
+        _check_keys(name, windows, ["days", "from", "start_at_months", "end_at_months", "end_every_months"])
+        self.length = int(windows["days"])
+        self.anchor = windows.get("from", "Baseline")
+        self.start_months = list(windows.get("start_at_months", []))
+        self.end_months = list(windows.get("end_at_months", []))
+        if "end_every_months" in windows:
+            # horizon 안에서 k개월마다 (개월 수는 넉넉히 잡는다. horizon 밖의 구간은 일정에 들어가지 않는다)
+            step = int(windows["end_every_months"])
+            self.end_months += list(range(step, self.horizon // 28 + 1, step))
+        if self.length <= 0 or not (self.start_months or self.end_months):
+            raise ValueError(f"{name}: windows에는 days와 구간 기준(개월)이 필요합니다")
+        self.columns.append(self.anchor)
+        self.date_columns = [self.anchor]
+
+    def compile_params(self, patient_db, baseline):
+        # (환자수, 구간수) 시작일/종료일 배열
+        anchor = to_days(patient_db[self.anchor])
+        span = np.timedelta64(self.length - 1, "D")
+        starts, ends = [], []
+        for m in self.start_months:
+            day = add_months(anchor, m)
+            starts.append(day)
+            ends.append(day + span)
+        for m in sorted(set(self.end_months)):
+            day = add_months(anchor, m)
+            starts.append(day - span)
+            ends.append(day)
+        return {"starts": np.stack(starts, axis=1), "ends": np.stack(ends, axis=1)}
+
+    def mask(self, params, pidx, days):
+        d = days[:, None]
+        return ((params["starts"][pidx] <= d) & (d <= params["ends"][pidx])).any(axis=1)
+
+
+RULE_TYPES = {"every_days": EveryDays, "weekdays": Weekdays, "windows": Windows}
+
+
+def compile_test(name, spec, protocol_horizon):
+    kinds = [key for key in RULE_TYPES if key in spec]
+    if len(kinds) != 1:
+        raise ValueError(f"{name}: 규칙은 {'/'.join(RULE_TYPES)} 중 하나만 지정해야 합니다")
+    return RULE_TYPES[kinds[0]](name, spec, protocol_horizon)
+
+
+# ---- 프로토콜 ----
+class Protocol:
+    def __init__(self, definition):
+        _check_keys("프로토콜", definition, ["name", "anchor", "horizon_days", "tests"])
+        self.definition = definition
+        self.name = definition.get("name", "")
+        self.version = protocol_version(definition)
+        self.anchor = definition.get("anchor", "Baseline")
+        self.horizon = int(definition["horizon_days"])
+        self.tests = [compile_test(name, spec, self.horizon) for name, spec in definition["tests"].items()]
+        if not 0 < len(self.tests) <= MAX_TESTS:
+            raise ValueError(f"검사 항목은 1~{MAX_TESTS}개여야 합니다")
+        self.items = [test.name for test in self.tests]
+        self.bits = {test.name: np.uint8(1 << i) for i, test in enumerate(self.tests)}
+        self.staff_columns = [f"{항목}_담당자" for 항목 in self.items]
+
+    @property
+    def columns(self):
+        # 일정 계산에 쓰이는 환자 컬럼 (이 컬럼이 바뀐 환자만 다시 계산)
+        columns = [self.anchor]
+        for test in self.tests:
+            columns += [col for col in test.columns if col not in columns]
+        return columns
+
+    @property
+    def date_columns(self):
+        # 날짜여야 하는 환자 컬럼 (일괄 등록 검증용)
+        columns = [self.anchor]
+        for test in self.tests:
+            columns += [col for col in test.date_columns if col not in columns]
+        return columns
+
+    @property
+    def choices(self):
+        # 값이 정해진 환자 컬럼 → 허용 값 목록 (every_days의 values 등, 일괄 등록 검증용)
+        choices = {}
+        for test in self.tests:
+            for col, values in test.choices.items():
+                choices.setdefault(col, [])
+                choices[col] += [value for value in values if value not in choices[col]]
+        return choices
+
+    def compile_rules(self, patient_db):
+        # 환자 표 → 일정 계산용 배열 묶음 (환자당 한 번만 파싱)
+        baseline = to_days(patient_db[self.anchor])
+        return {
+            "환자번호": patient_db["환자번호"].astype(str).to_numpy(),
+            "baseline": baseline,
+            "tests": {test.name: test.compile(patient_db, baseline) for test in self.tests},
+            "staff": {col: patient_db[col].to_numpy() for col in self.staff_columns},
+            "protocol": self,
+        }
+
+    def evaluate(self, rules, pidx, days, items=None):
+        # (환자 인덱스, 날짜) 쌍마다 항목별 검사 여부 → {항목: bool 배열}
+        return {
+            test.name: test.evaluate(rules["tests"][test.name], rules["baseline"], pidx, days)
+            for test in self.tests if items is None or test.name in items
+        }
+
+
+def protocol_version(definition):
+    # 정의 내용의 해시. 검사 순서가 비트 순서이므로 키 순서도 내용에 포함된다
+    text = json.dumps(definition, ensure_ascii=False)
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()[:12]
+
+
+_compiled = {}  # 버전 → Protocol
+_compile_lock = threading.Lock()
+
+
+def compile_protocol(definition):
+    # 같은 정의는 한 번만 컴파일 (프로세스 안에서 버전별 캐시)
+    version = protocol_version(definition)
+    with _compile_lock:
+        protocol = _compiled.get(version)
+        if protocol is None:
+            protocol = _compiled[version] = Protocol(definition)
+    return protocol
+
+
+def load_protocol(path=None):
+    path = path or os.environ.get("SCHEDULE_PROTOCOL")
+    if not path:
+        return compile_protocol(DEFAULT_PROTOCOL)
+    with open(path, encoding="utf-8") as f:
+        return compile_protocol(json.load(f))
@@ -0,0 +1,151 @@
+# 여러 화면이 함께 쓰는 자원 (인증, 저장소, 일정 저장소)
+# st.cache_resource로 프로세스당 한 번만 만들고 모든 세션이 공유한다.
+# 무거운 모듈(pandas, gspread, google.oauth2 등)은 처음 필요할 때 함수 안에서 불러온다 → 첫 화면이 빨리 뜬다.
+import os
+
+import streamlit as st
+
+from profiling import stage
+
+DATA_PATH = "patients.csv"
+DONE_PATH = "completed.csv"
+DONE_LOG_PATH = "completed.log"
+AUDIO_LINKS_PATH = "audio_links.csv"
+SQLITE_PATH = "schedule.db"
+
+# 사용자 목록 정의 (예시)
+user_list = ["전체 관리자", "김은선", "최민지"]  # 예시 사용자 목록, 실제 데이터로 교체해야 합니다.
+
+
+# 구글 시트 인증 (프로세스당 한 번, 세션 간 공유)
+def get_service_account():
+    try:
+        return st.secrets["gcp_service_account"]
+    except (KeyError, FileNotFoundError):
+        return None
+
+@st.cache_resource
+def get_worksheet():
+    from sheets import FakeWorksheet, open_worksheet
+
+    service_account = get_service_account()
+    if service_account is None:
+        # 인증 정보가 없으면 patients.csv로 만든 로컬 시트로 동작 (오프라인)
+        return FakeWorksheet.from_csv(DATA_PATH)
+    return open_worksheet(service_account)
+
+@st.cache_resource
+def get_sheet_source():
+    from sheets import SheetSource
+
+    return SheetSource(get_worksheet())
+
+# 시트 쓰기는 대기열에 넣고 바로 돌아온다 (백그라운드에서 묶어서 반영)
+@st.cache_resource
+def get_sheet_queue():
+    from sheet_queue import SheetWriteQueue
+
+    return SheetWriteQueue(get_worksheet(), on_flush=get_sheet_source().invalidate).start()
+
+# 저장소 선택: 환경 변수 STORAGE_BACKEND 또는 secrets의 storage_backend ("sheets" | "csv" | "sqlite")
+def get_storage_backend():
+    backend = os.environ.get("STORAGE_BACKEND")
+    if backend:
+        return backend
+    try:
+        return st.secrets["storage_backend"]
+    except (KeyError, FileNotFoundError):
+        return "sheets"
+
+@st.cache_resource
+def get_storage():
+    from storage import CsvStorage, SheetsStorage, SqliteStorage
+
+    backend = get_storage_backend()
+    if backend == "sqlite":
+        storage = SqliteStorage(SQLITE_PATH, AUDIO_LINKS_PATH)
+        # 처음 한 번 기존 CSV 데이터를 옮겨 온다 (DB에 기록되므로 다시 옮기지 않음)
+        storage.migrate_csv(DATA_PATH, DONE_PATH, DONE_LOG_PATH, AUDIO_LINKS_PATH)
+        return storage
+    if backend == "csv":
+        return CsvStorage(DATA_PATH, DONE_PATH, DONE_LOG_PATH, AUDIO_LINKS_PATH)
+    return SheetsStorage(get_sheet_source(), get_sheet_queue(), DATA_PATH, DONE_PATH, DONE_LOG_PATH, AUDIO_LINKS_PATH)
+
+def load_data():
+    # 시트: TTL 동안은 캐시, 이후에는 시트 수정 시각이 바뀐 경우에만 다시 내려받고
+    # 아직 시트에 반영되지 않은 변경은 대기열에서 덮어쓴다
+    with stage("데이터 로드") as s:
+        df = get_storage().patients()
+        s.count(df)
+    if df.empty:
+        st.error("환자 데이터를 불러올 수 없습니다.")
+    # st.write(df)  # 데이터 확인
+    return df
+
+
+# 일정 저장소는 세션 간에 공유하고, 바뀐 환자만 다시 계산
+@st.cache_resource
+def get_schedule_store():
+    from schedule_snapshot import SNAPSHOT_DIR, read_snapshot
+    from schedule_store import ScheduleStore
+
+    # 스냅샷(precompute.py 또는 이전 실행이 쓴 것)을 mmap으로 열어 모든 세션이 같은 파일을 읽는다
+    store = ScheduleStore(snapshot_dir=SNAPSHOT_DIR)
+    store.load_snapshot(read_snapshot(SNAPSHOT_DIR, mmap_mode="r"))
+    return store
+
+def load_schedules(patient_db):
+    with stage("일정 계산") as s:
+        table = get_schedule_store().sync(patient_db)
+        s.count(table)
+    return table
+
+def due_on(patient_db, day, items=None):
+    # 특정 날짜에 해야 하는 (환자번호, 날짜, 항목, 담당자) 목록
+    load_schedules(patient_db)
+    with stage("일정 조회") as s:
+        df = get_schedule_store().due_on(day, items)
+        s.count(df)
+    return df
+
+def staff_worklist(staff, start, end=None, items=None):
+    # 담당자 한 명의 (환자번호, 날짜, 항목, 담당자) 목록 - 담당자 색인으로 맡은 환자만 계산
+    # 화면 맨 위에서 load_schedules로 한 번 맞춘 일정 저장소를 읽는다 (여기서 다시 sync하지 않음)
+    with stage("담당자 업무 조회") as s:
+        df = get_schedule_store().worklist(staff, start, end, items)
+        s.count(df)
+    return df
+
+# 누락 검사 추적 (프로세스당 하나). 항목별 유예 일수는 secrets의 [grace_days]로 바꿀 수 있다
+@st.cache_resource
+def get_overdue_tracker():
+    from overdue import OverdueTracker
+
+    try:
+        grace = dict(st.secrets["grace_days"])
+    except (KeyError, FileNotFoundError):
+        grace = None
+    return OverdueTracker(get_schedule_store(), get_storage().completions, grace)
+
+def load_overdue(today):
+    # 날짜가 바뀌었거나 환자 규칙이 바뀐 경우에만 새로 계산하고, 나머지는 그대로 읽는다
+    # (load_schedules 이후에 부른다)
+    tracker = get_overdue_tracker()
+    with stage("누락 검사 갱신"):
+        tracker.refresh(today)
+    return tracker
+
+# Google Drive 음성 파일 링크
+def get_audio_file_link(patient_id, date, df=None):
+    try:
+        return get_storage().audio.get(patient_id, date)
+    except Exception as e:
+        st.error(f"음성 파일 로딩 오류: {e}")
+    return None
+
+# 보고서 내보내기 작업자 (프로세스당 하나, 모든 세션이 같은 대기열을 쓴다)
+@st.cache_resource
+def get_export_queue():
+    from exports import ExportQueue
+
+    return ExportQueue(get_schedule_store(), get_storage()).start()
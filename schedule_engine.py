@@ -0,0 +1,132 @@
+# 검사 일정 계산 엔진
+# 환자마다 날짜를 하나씩 돌며 계산하던 generate_schedule 대신,
+# 전체 환자의 규칙을 배열로 한 번 정리(compile_rules)한 뒤 numpy datetime64 연산으로 한꺼번에 계산한다.
+# 검사별 규칙(주기, 요일, 구간, horizon)은 protocol.py의 선언형 프로토콜에서 온다.
+import numpy as np
+import pandas as pd
+
+from protocol import load_protocol
+
+PROTOCOL = load_protocol()
+
+항목_목록 = PROTOCOL.items
+담당자_컬럼 = PROTOCOL.staff_columns
+
+# 일정 표는 환자-날짜 한 행에 uint8 비트마스크("검사") 하나로 저장한다. "●" 문자열은 화면에 보일 때만 만든다.
+ITEM_BITS = PROTOCOL.bits
+
+HORIZON_DAYS = PROTOCOL.horizon
+
+
+def compile_rules(patient_db, protocol=None):
+    # 환자 표를 일정 계산용 배열 묶음으로 변환 (환자당 한 번만 파싱)
+    return (protocol or PROTOCOL).compile_rules(patient_db)
+
+
+def evaluate(rules, pidx, days, items=None):
+    # (환자 인덱스, 날짜) 쌍마다 항목별 검사 여부를 계산 → {항목: bool 배열}
+    return rules["protocol"].evaluate(rules, pidx, days, items)
+
+
+def due_on(rules, day, horizon=HORIZON_DAYS, items=항목_목록):
+    # 특정 날짜에 해야 하는 (환자, 항목) 목록. 1년치를 펼치지 않고 환자당 그 날 하루만 계산한다.
+    day = np.datetime64(day, "D")
+    offset = (day - rules["baseline"]).astype(np.int64)
+    pidx = np.flatnonzero((offset >= 0) & (offset < horizon))
+    masks = evaluate(rules, pidx, np.full(len(pidx), day), items)
+
+    frames = []
+    for 항목 in items:
+        hit = pidx[masks[항목]]
+        frames.append(pd.DataFrame({
+            "환자번호": rules["환자번호"][hit],
+            "항목": 항목,
+            "담당자": rules["staff"][f"{항목}_담당자"][hit],
+        }))
+    df = pd.concat(frames, ignore_index=True)
+    df.insert(1, "날짜", day.astype(object))
+    return df
+
+
+def to_bits(masks):
+    bits = np.zeros(len(next(iter(masks.values()))), dtype=np.uint8)
+    for 항목, mask in masks.items():
+        bits |= np.where(mask, ITEM_BITS[항목], np.uint8(0))
+    return bits
+
+
+def empty_schedule():
+    return pd.DataFrame({
+        "환자번호": pd.Categorical([]),
+        "날짜": pd.Series([], dtype="datetime64[ns]"),
+        "검사": pd.Series([], dtype=np.uint8),
+    })
+
+
+def build_schedules(patient_db, horizon=HORIZON_DAYS):
+    # 전체 환자 일정을 하나의 컬럼형 표로 생성 (환자번호, 날짜 순 정렬)
+    # 컬럼: 환자번호(category), 날짜(datetime64), 검사(uint8 비트마스크)
+    if patient_db.empty:
+        return empty_schedule()
+
+    rules = compile_rules(patient_db)
+    n = len(rules["환자번호"])
+    pidx = np.repeat(np.arange(n), horizon)
+    days = rules["baseline"][pidx] + np.tile(np.arange(horizon), n).astype("timedelta64[D]")
+    return _schedule_frame(rules, pidx, days)
+
+
+def window_schedule(rules, pidx, start, end, horizon=HORIZON_DAYS):
+    # 지정한 환자들(pidx)의 start~end 구간만 계산 (점오표처럼 화면에 보이는 부분만 필요할 때)
+    start = np.datetime64(start, "D")
+    n_days = int((np.datetime64(end, "D") - start).astype(np.int64)) + 1
+    if n_days <= 0 or len(pidx) == 0:
+        return empty_schedule()
+    p = np.repeat(np.asarray(pidx), n_days)
+    days = start + np.tile(np.arange(n_days), len(pidx)).astype("timedelta64[D]")
+    offset = (days - rules["baseline"][p]).astype(np.int64)
+    keep = (offset >= 0) & (offset < horizon)
+    return _schedule_frame(rules, p[keep], days[keep])
+
+
+def _schedule_frame(rules, pidx, days):
+    ids = pd.Index(rules["환자번호"])
+    # 환자번호가 중복되지 않으면 인덱스 배열을 그대로 카테고리 코드로 쓴다
+    환자번호 = pd.Categorical.from_codes(pidx, ids) if ids.is_unique else pd.Categorical(ids[pidx])
+
+    return pd.DataFrame({
+        "환자번호": 환자번호,
+        "날짜": days.astype("datetime64[ns]"),
+        "검사": to_bits(evaluate(rules, pidx, days)),
+    })
+
+
+def generate_schedule(patient):
+    # 환자 한 명(행)의 일정
+    return build_schedules(patient.to_frame().T.reset_index(drop=True))
+
+
+def has(schedule, 항목):
+    # 항목별 검사 여부 (bool 배열)
+    return (schedule["검사"].to_numpy() & ITEM_BITS[항목]) != 0
+
+
+def to_markers(schedule, items=항목_목록):
+    # 화면 표시용: 항목별 "●" / "" 컬럼을 붙인 표
+    df = schedule[["환자번호", "날짜"]].copy()
+    for 항목 in items:
+        df[항목] = np.where(has(schedule, 항목), "●", "")
+    return df
+
+
+def to_long(schedule, items=항목_목록):
+    # 검사가 있는 (환자번호, 날짜, 항목) 행만 모은 긴 형태 표
+    frames = []
+    for 항목 in items:
+        hit = schedule[has(schedule, 항목)]
+        frames.append(pd.DataFrame({"환자번호": hit["환자번호"], "날짜": hit["날짜"], "항목": 항목}))
+    if not frames:
+        return pd.DataFrame(columns=["환자번호", "날짜", "항목"])
+    df = pd.concat(frames, ignore_index=True)
+    df["항목"] = pd.Categorical(df["항목"], categories=항목_목록)
+    return df
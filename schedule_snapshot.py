@@ -0,0 +1,189 @@
+# 일정 스냅샷 (컬럼별 .npy 파일)
+# 전체 환자 일정을 컬럼마다 하나의 numpy 파일로 저장한다. 파일 크기를 먼저 정해 두고(allocate)
+# 여러 프로세스가 자기 구간만 채워 넣을 수 있다 (precompute.py).
+#
+#   ids.npy           환자번호 (환자 순서 = 환자코드)
+#   fingerprints.npy  환자별 일정 규칙 해시 (schedule_store.fingerprint)
+#   codes.npy         행마다 환자코드 (환자 수에 맞춰 int8/int16/int32)
+#   days.npy          행마다 날짜 (datetime64[ns])
+#   bits.npy          행마다 검사 비트마스크 (uint8)
+#   cube.npz          월별 건수 큐브 (stats.monthly_counts)
+#   meta.json         horizon, 프로토콜 버전, 행 수, 생성 시각
+# 완성된 디렉터리는 임시 이름으로 만든 뒤 한 번에 바꿔 끼우므로, 읽는 쪽은 쓰다 만 스냅샷을 보지 않는다.
+# 임시 디렉터리는 쓰는 쪽마다 따로 만들고, 바꿔 끼우는 동안에는 <디렉터리>.lock 파일을 잠근다
+# → 앱 세션과 precompute.py 가 동시에 써도 서로의 파일을 지우거나 덮어쓰지 않는다.
+# mmap_mode="r"로 읽으면 일정 표가 파일을 그대로 가리키므로(복사 없음) 여러 세션/프로세스가 같은 페이지 캐시를 공유한다.
+import contextlib
+import json
+import os
+import shutil
+import tempfile
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from schedule_engine import PROTOCOL
+from stats import CUBE_COLUMNS, empty_cube
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+SNAPSHOT_DIR = "schedule_snapshot"
+COLUMN_FILES = ["codes", "days", "bits"]
+CUBE_KEYS = dict(zip(CUBE_COLUMNS, ["month", "item", "staff", "patient", "count"]))
+
+
+def staging_dir(directory):
+    # directory 옆에 이 쓰는 쪽만의 임시 디렉터리를 새로 만든다 (finish가 바꿔 끼우거나 discard가 지운다)
+    directory = os.path.abspath(directory.rstrip("/\\"))
+    os.makedirs(os.path.dirname(directory), exist_ok=True)
+    return tempfile.mkdtemp(prefix=os.path.basename(directory) + ".tmp_", dir=os.path.dirname(directory))
+
+
+def discard(staging):
+    shutil.rmtree(staging, ignore_errors=True)
+
+
+@contextlib.contextmanager
+def swap_lock(directory):
+    # 스냅샷을 바꿔 끼우거나 여는 동안 잡는 프로세스 간 잠금 (프로세스가 죽으면 OS가 푼다)
+    with open(directory.rstrip("/\\") + ".lock", "a+b") as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def code_dtype(n_categories):
+    # pandas Categorical이 코드에 쓰는 dtype과 같아야 읽을 때 복사 없이 감쌀 수 있다
+    for dtype in (np.int8, np.int16, np.int32):
+        if n_categories < np.iinfo(dtype).max:
+            return dtype
+    return np.int64
+
+
+def _allocate(directory, ids, fingerprints, codes):
+    # directory: staging_dir()로 만든 빈 임시 디렉터리
+    os.makedirs(directory, exist_ok=True)
+    rows = len(codes)
+    np.save(os.path.join(directory, "ids.npy"), np.asarray(ids, dtype=str))
+    np.save(os.path.join(directory, "fingerprints.npy"), np.asarray(fingerprints, dtype=np.uint64))
+    np.save(os.path.join(directory, "codes.npy"), np.asarray(codes, dtype=code_dtype(len(ids))))
+    for name, dtype in (("days", "datetime64[ns]"), ("bits", np.uint8)):
+        column = np.lib.format.open_memmap(os.path.join(directory, f"{name}.npy"), mode="w+", dtype=dtype, shape=(rows,))
+        column.flush()
+        del column
+    return rows
+
+
+def allocate(directory, ids, fingerprints, horizon):
+    # 새 스냅샷 디렉터리를 만들고 컬럼 파일을 최종 크기(환자 수 × horizon)로 미리 잡아 둔다
+    return _allocate(directory, ids, fingerprints, np.repeat(np.arange(len(ids)), horizon))
+
+
+def write_rows(directory, start, table):
+    # 일정 표(schedule_engine.build_schedules 결과)를 start 행부터 채운다 (환자코드는 allocate가 채움)
+    stop = start + len(table)
+    for name, values in (("days", table["날짜"].to_numpy()), ("bits", table["검사"].to_numpy())):
+        column = np.load(os.path.join(directory, f"{name}.npy"), mmap_mode="r+")
+        column[start:stop] = values
+        column.flush()
+        del column
+    return stop - start
+
+
+def finish(directory, target, cube, horizon):
+    # 큐브와 메타 정보를 쓰고 target 디렉터리와 바꿔 끼운다
+    np.savez(os.path.join(directory, "cube.npz"),
+             **{key: cube[col].to_numpy(dtype=np.int64 if col == "건수" else str) for col, key in CUBE_KEYS.items()})
+    ids = np.load(os.path.join(directory, "ids.npy"))
+    codes = np.load(os.path.join(directory, "codes.npy"), mmap_mode="r")
+    meta = {
+        "horizon": horizon,
+        "protocol": PROTOCOL.version,
+        "patients": len(ids),
+        "rows": len(codes),
+        "created": datetime.now().isoformat(timespec="seconds"),
+    }
+    with open(os.path.join(directory, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False, indent=2)
+    with swap_lock(target):
+        old = target.rstrip("/\\") + ".old"
+        shutil.rmtree(old, ignore_errors=True)
+        if os.path.exists(target):
+            os.replace(target, old)
+        os.replace(directory, target)
+        shutil.rmtree(old, ignore_errors=True)
+    return meta
+
+
+def write_table(directory, table, fingerprints, cube, horizon):
+    # 메모리에 있는 일정 표 전체를 스냅샷으로 저장 (ScheduleStore가 환자 변경 후 다시 쓸 때)
+    staging = staging_dir(directory)
+    ids = table["환자번호"].cat.categories.astype(str)
+    try:
+        _allocate(staging, ids, fingerprints.reindex(ids).fillna(0).to_numpy(), table["환자번호"].cat.codes.to_numpy())
+        write_rows(staging, 0, table)
+        return finish(staging, directory, cube, horizon)
+    except BaseException:
+        discard(staging)
+        raise
+
+
+class Snapshot:
+    def __init__(self, directory, mmap_mode=None):
+        self.directory = directory
+        with open(os.path.join(directory, "meta.json"), encoding="utf-8") as f:
+            self.meta = json.load(f)
+        self.ids = np.load(os.path.join(directory, "ids.npy"))
+        self.fingerprints = pd.Series(np.load(os.path.join(directory, "fingerprints.npy")), index=self.ids)
+        self.columns = {name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode=mmap_mode) for name in COLUMN_FILES}
+
+    @property
+    def horizon(self):
+        return self.meta["horizon"]
+
+    @property
+    def protocol(self):
+        return self.meta.get("protocol")
+
+    def table(self):
+        # schedule_engine.empty_schedule()과 같은 컬럼의 일정 표 (mmap으로 열었으면 파일을 그대로 가리킨다)
+        환자번호 = pd.Categorical.from_codes(self.columns["codes"], pd.Index(self.ids.astype(object)))
+        return pd.DataFrame({
+            "환자번호": pd.Series(환자번호, copy=False),
+            "날짜": self.columns["days"],
+            "검사": self.columns["bits"],
+        }, copy=False)
+
+    def cube(self):
+        path = os.path.join(self.directory, "cube.npz")
+        if not os.path.exists(path):
+            return empty_cube()
+        with np.load(path) as data:
+            return pd.DataFrame({col: data[key] if col == "건수" else data[key].astype(object)
+                                 for col, key in CUBE_KEYS.items()})
+
+
+def read_snapshot(directory=SNAPSHOT_DIR, mmap_mode=None):
+    # 스냅샷이 없으면 None. 바꿔 끼우는 중에 열지 않도록 잠금을 잡고 연다
+    # (mmap으로 연 파일은 이후 디렉터리가 바뀌어도 그대로 읽힌다)
+    if not os.path.exists(os.path.join(directory, "meta.json")):
+        return None
+    with swap_lock(directory):
+        if not os.path.exists(os.path.join(directory, "meta.json")):
+            return None
+        return Snapshot(directory, mmap_mode)
@@ -0,0 +1,182 @@
+# 환자별 일정 저장소
+# Streamlit은 버튼 클릭마다 스크립트를 다시 실행하므로, 전체 일정을 매번 새로 만들지 않고
+# 환자 행이 바뀐(등록/수정/삭제) 환자만 다시 계산해서 표를 갱신한다.
+# snapshot_dir를 주면 변경이 잠잠해진 뒤 전체 표를 스냅샷 파일로 다시 쓰고 mmap으로 다시 연다
+# → 평소에는 일정 표가 메모리에 따로 올라가지 않고 모든 세션이 같은 파일을 읽는다.
+import threading
+
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+import schedule_snapshot
+from schedule_engine import (
+    HORIZON_DAYS, PROTOCOL, build_schedules, compile_rules, due_on, empty_schedule, window_schedule, 담당자_컬럼, 항목_목록,
+)
+from stats import empty_cube, monthly_counts
+from worklist import StaffIndex, empty_worklist
+
+# 일정 계산에 쓰이는 컬럼 (프로토콜이 읽는 컬럼 + 담당자. 외래일은 일정에 영향이 없으므로 제외)
+RULE_COLUMNS = PROTOCOL.columns + 담당자_컬럼
+PERSIST_DELAY = 30  # 초: 마지막 변경 후 이만큼 조용하면 스냅샷을 다시 쓴다
+
+
+def fingerprint(patient_db):
+    # 환자번호 → 일정 관련 컬럼의 해시값
+    if patient_db.empty:
+        return pd.Series(dtype="uint64")
+    hashed = pd.util.hash_pandas_object(patient_db[RULE_COLUMNS].astype(str), index=False)
+    hashed.index = patient_db["환자번호"].astype(str).to_numpy()
+    return hashed
+
+
+class ScheduleStore:
+    def __init__(self, horizon=HORIZON_DAYS, snapshot_dir=None, persist_delay=PERSIST_DELAY):
+        self.horizon = horizon
+        self.snapshot_dir = snapshot_dir
+        self.persist_delay = persist_delay
+        self.last_error = None
+        self._lock = threading.Lock()
+        self._fingerprints = pd.Series(dtype="uint64")
+        self._table = empty_schedule()
+        self._rules = None
+        self._cube = empty_cube()
+        self._staff_index = None
+        self._version = 0
+        self._timer = None
+
+    def sync(self, patient_db):
+        # patient_db와 비교해서 바뀐 환자만 다시 계산하고 전체 일정 표를 돌려준다 (읽기 전용으로 사용)
+        patient_db = patient_db.drop_duplicates("환자번호", keep="last")
+        new_fp = fingerprint(patient_db)
+
+        with self._lock:
+            old_fp = self._fingerprints
+            changed = new_fp.index[new_fp.ne(old_fp.reindex(new_fp.index))]
+            removed = old_fp.index.difference(new_fp.index)
+            if len(changed) == 0 and len(removed) == 0:
+                if self._rules is None and not patient_db.empty:
+                    self._rules = compile_rules(patient_db)  # 스냅샷을 들여온 직후
+                return self._table
+
+            stale = changed.union(removed)
+            keep = self._table[~self._table["환자번호"].isin(stale)]
+            fresh = build_schedules(patient_db[patient_db["환자번호"].astype(str).isin(changed)], self.horizon)
+            self._table = self._merge(keep, fresh)
+            # 월별 건수도 바뀐 환자 몫만 빼고 다시 더한다
+            cube = self._cube[~self._cube["환자번호"].isin(stale)]
+            self._cube = pd.concat([cube, monthly_counts(fresh, patient_db)], ignore_index=True)
+            self._fingerprints = new_fp
+            self._rules = compile_rules(patient_db) if not patient_db.empty else None
+            self._version += 1
+            self._schedule_persist()
+            return self._table
+
+    def load_snapshot(self, snapshot):
+        # 미리 계산해 둔 일정(precompute.py)을 들여온다. 다음 sync()는 스냅샷 이후 바뀐 환자만 다시 계산한다
+        # 다른 프로토콜로 계산한 스냅샷은 쓰지 않는다
+        if snapshot is None or snapshot.horizon != self.horizon or snapshot.protocol != PROTOCOL.version:
+            return False
+        with self._lock:
+            self._table = snapshot.table()
+            self._cube = snapshot.cube()
+            self._fingerprints = snapshot.fingerprints
+            self._rules = None
+        return True
+
+    def _schedule_persist(self):
+        # lock 안에서 호출. 연속된 변경은 마지막 변경 후 한 번만 쓴다
+        if self.snapshot_dir is None:
+            return
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = threading.Timer(self.persist_delay, self.persist)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def persist(self):
+        # 현재 표를 스냅샷으로 쓰고, 그 사이 변경이 없었으면 mmap 표로 바꿔 끼운다
+        with self._lock:
+            table, cube, fingerprints, version = self._table, self._cube, self._fingerprints, self._version
+        try:
+            schedule_snapshot.write_table(self.snapshot_dir, table, fingerprints, cube, self.horizon)
+            snapshot = schedule_snapshot.read_snapshot(self.snapshot_dir, mmap_mode="r")
+        except Exception as e:  # 디스크 공간 부족 등 → 메모리 표를 계속 쓴다
+            self.last_error = e
+            return False
+        with self._lock:
+            if self._version != version:
+                return False
+            self._table = snapshot.table()
+        self.last_error = None
+        return True
+
+    @staticmethod
+    def _merge(keep, fresh):
+        # 환자번호 카테고리를 합쳐서 이어 붙인다 (문자열로 풀지 않고 코드만 다시 매긴다)
+        if keep.empty:
+            return fresh
+        환자번호 = union_categoricals([keep["환자번호"].array, fresh["환자번호"].array]).remove_unused_categories()
+        table = pd.concat([keep.drop(columns="환자번호"), fresh.drop(columns="환자번호")], ignore_index=True)
+        table.insert(0, "환자번호", 환자번호)
+        return table
+
+    @property
+    def rules(self):
+        return self._rules
+
+    @property
+    def fingerprints(self):
+        # 환자번호 → 일정 규칙 해시 (바뀐 환자를 찾을 때)
+        return self._fingerprints
+
+    @property
+    def cube(self):
+        # (월, 항목, 담당자, 환자번호) → 건수
+        return self._cube
+
+    def patient_schedule(self, 환자번호):
+        table = self._table
+        return table[table["환자번호"] == str(환자번호)]
+
+    def due_on(self, day, items=None):
+        # 날짜 D에 해야 하는 (환자번호, 날짜, 항목, 담당자) 목록 - 환자 수에 비례하는 비용
+        # items: 이 항목만 계산한다 (프로토콜에 없는 항목은 무시)
+        rules = self._rules
+        if items is not None:
+            items = [항목 for 항목 in 항목_목록 if 항목 in items]
+        if rules is None or items == []:
+            return pd.DataFrame(columns=["환자번호", "날짜", "항목", "담당자"])
+        return due_on(rules, day, self.horizon, 항목_목록 if items is None else items)
+
+    def staff_index(self):
+        # 담당자 → (환자, 항목) 색인. 규칙이 다시 만들어졌을 때만 새로 만든다
+        rules, index = self._rules, self._staff_index
+        if rules is None:
+            return None
+        if index is None or index.rules is not rules:
+            index = StaffIndex(rules)
+            self._staff_index = index
+        return index
+
+    def worklist(self, staff, start, end=None, items=None):
+        # 담당자 한 명이 start~end에 해야 하는 검사 - 담당 환자 수에 비례하는 비용
+        index = self.staff_index()
+        if index is None:
+            return empty_worklist()
+        return index.due(staff, start, end, items, self.horizon)
+
+    def window(self, ids, start, end):
+        # 환자 목록 × 날짜 구간만 계산한 일정 (점오표 페이지 단위 표시용)
+        rules = self._rules
+        if rules is None:
+            return empty_schedule()
+        pidx = pd.Index(rules["환자번호"]).get_indexer([str(i) for i in ids])
+        return window_schedule(rules, pidx[pidx >= 0], start, end, self.horizon)
+
+    def clear(self):
+        with self._lock:
+            self._fingerprints = pd.Series(dtype="uint64")
+            self._table = empty_schedule()
+            self._rules = None
+            self._cube = empty_cube()
+            self._staff_index = None
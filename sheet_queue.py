@@ -0,0 +1,203 @@
+# 구글 시트 쓰기 대기열 (write-behind)
+# 등록/수정/삭제는 로컬 저널(sheet_queue.jsonl)에 먼저 기록하고 바로 돌아온다.
+# 백그라운드 작업자가 모인 변경을 환자번호별로 합친 뒤 batch_update / append_rows 로 한 번에 시트에 반영한다.
+# 실패하면 지수 백오프로 재시도하고, 앱이 재시작되어도 저널에 남은 변경은 다시 반영된다.
+import json
+import os
+import tempfile
+import threading
+import time
+
+import pandas as pd
+
+from completion_store import truncate_torn_tail
+
+JOURNAL_PATH = "sheet_queue.jsonl"
+FLUSH_INTERVAL = 2      # 초: 변경을 모으는 시간
+MAX_BACKOFF = 60        # 초
+
+
+def column_letter(n):
+    letters = ""
+    while n:
+        n, rem = divmod(n - 1, 26)
+        letters = chr(65 + rem) + letters
+    return letters
+
+
+def coalesce(ops):
+    # 같은 환자에 대한 변경을 최종 상태 하나로 합친다 → {환자번호: op}
+    final = {}
+    for op in ops:
+        pid = op["환자번호"]
+        prev = final.get(pid)
+        kind = op["op"]
+        if prev is not None and prev["op"] == "insert":
+            if kind == "delete":
+                final.pop(pid)      # 시트에 올라가기 전에 지워짐
+                continue
+            kind = "insert"         # 아직 시트에 없으므로 수정 내용을 담아 추가
+        elif prev is not None and prev["op"] == "delete" and kind == "insert":
+            kind = "update"         # 시트에는 아직 예전 행이 남아 있음
+        final[pid] = {**op, "op": kind}
+    return final
+
+
+class SheetWriteQueue:
+    def __init__(self, worksheet, journal_path=JOURNAL_PATH, interval=FLUSH_INTERVAL, on_flush=None):
+        self.worksheet = worksheet
+        self.journal_path = journal_path
+        self.interval = interval
+        self.on_flush = on_flush
+        self.last_error = None
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._pending = self._read_journal()
+        self._seq = max((op["seq"] for op in self._pending), default=0)
+        self._thread = None
+
+    # ---- 저널 ----
+    def _read_journal(self):
+        if not os.path.exists(self.journal_path):
+            return []
+        # 쓰다 끊긴 마지막 줄을 잘라 둬야 다음 변경이 그 조각 뒤에 붙어 함께 버려지지 않는다
+        truncate_torn_tail(self.journal_path)
+        ops = []
+        with open(self.journal_path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    ops.append(json.loads(line))
+                except json.JSONDecodeError:
+                    continue
+        return ops
+
+    def _append_journal(self, ops):
+        with open(self.journal_path, "a", encoding="utf-8") as f:
+            f.writelines(json.dumps(op, ensure_ascii=False) + "\n" for op in ops)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _rewrite_journal(self, ops):
+        directory = os.path.dirname(os.path.abspath(self.journal_path))
+        fd, tmp_path = tempfile.mkstemp(prefix=".tmp_", suffix=".jsonl", dir=directory)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            for op in ops:
+                f.write(json.dumps(op, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.journal_path)
+
+    # ---- 변경 등록 ----
+    def _enqueue(self, kind, 환자번호, row=None):
+        self._enqueue_many([(kind, 환자번호, row)])
+
+    def _enqueue_many(self, changes):
+        # 여러 변경을 저널 한 번 쓰기(fsync 한 번)로 등록
+        with self._lock:
+            ops = []
+            for kind, 환자번호, row in changes:
+                self._seq += 1
+                ops.append({"seq": self._seq, "op": kind, "환자번호": str(환자번호), "row": row})
+            self._append_journal(ops)
+            self._pending.extend(ops)
+        self._wake.set()
+
+    def insert(self, row):
+        self._enqueue("insert", row["환자번호"], {k: str(v) for k, v in row.items()})
+
+    def insert_many(self, rows):
+        self._enqueue_many([("insert", row["환자번호"], {k: str(v) for k, v in row.items()}) for row in rows])
+
+    def update(self, 환자번호, row):
+        self._enqueue("update", 환자번호, {k: str(v) for k, v in row.items()})
+
+    def delete(self, 환자번호):
+        self._enqueue("delete", 환자번호)
+
+    def pending(self):
+        with self._lock:
+            return list(self._pending)
+
+    def apply(self, patient_db):
+        # 아직 시트에 반영되지 않은 변경을 시트에서 읽은 표 위에 덮어쓴다 (화면은 바로 최신 상태)
+        final = coalesce(self.pending())
+        if not final:
+            return patient_db
+        ids = patient_db["환자번호"].astype(str) if not patient_db.empty else pd.Series(dtype=str)
+        df = patient_db[~ids.isin(list(final))]
+        rows = [op["row"] for op in final.values() if op["op"] != "delete"]
+        if rows:
+            added = pd.DataFrame(rows)
+            df = pd.concat([df, added.reindex(columns=df.columns) if len(df.columns) else added], ignore_index=True)
+        return df.reset_index(drop=True)
+
+    # ---- 시트 반영 ----
+    def flush(self):
+        # 대기 중인 변경을 한 번에 반영. 성공하면 True
+        with self._lock:
+            batch = list(self._pending)
+        if not batch:
+            return True
+        final = coalesce(batch)
+
+        header = self.worksheet.row_values(1)
+        ids = self.worksheet.col_values(header.index("환자번호") + 1)
+        row_of = {}
+        for i, pid in enumerate(ids[1:], start=2):
+            row_of.setdefault(str(pid), []).append(i)
+
+        def values(row):
+            return [row.get(col, "") for col in header]
+
+        last_col = column_letter(len(header))
+        updates, deletes, inserts = [], [], []
+        for pid, op in final.items():
+            rows = row_of.get(pid, [])
+            if op["op"] == "delete":
+                deletes.extend(rows)
+            elif rows:
+                # 수정, 또는 지난번 반영이 append_rows 뒤에 실패해서 다시 보내는 추가 → 이미 있는 행을 덮어쓴다
+                for r in rows:
+                    updates.append({"range": f"A{r}:{last_col}{r}", "values": [values(op["row"])]})
+            else:
+                inserts.append(values(op["row"]))
+
+        if updates:
+            self.worksheet.batch_update(updates)
+        for r in sorted(deletes, reverse=True):
+            self.worksheet.delete_rows(r)
+        if inserts:
+            self.worksheet.append_rows(inserts)
+
+        # 캐시를 먼저 비워야 대기열에서 빠지는 순간에도 화면에 예전 값이 보이지 않는다
+        if self.on_flush is not None:
+            self.on_flush()
+        flushed = batch[-1]["seq"]
+        with self._lock:
+            self._pending = [op for op in self._pending if op["seq"] > flushed]
+            self._rewrite_journal(self._pending)
+        return True
+
+    def _run(self):
+        backoff = 1
+        while True:
+            self._wake.wait(timeout=self.interval)
+            self._wake.clear()
+            time.sleep(self.interval)  # 잠깐 더 모아서 한 번에 보낸다
+            try:
+                self.flush()
+                self.last_error = None
+                backoff = 1
+            except Exception as e:  # 네트워크 오류, 할당량 초과 등
+                self.last_error = e
+                time.sleep(backoff)
+                backoff = min(backoff * 2, MAX_BACKOFF)
+                self._wake.set()
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="sheet-write-queue", daemon=True)
+            self._thread.start()
+        if self._pending:
+            self._wake.set()
+        return self
@@ -0,0 +1,165 @@
+# 구글 시트 접근 계층
+# - 인증/클라이언트는 프로세스당 한 번만 만든다 (app.py에서 st.cache_resource로 공유)
+# - 시트 데이터는 TTL 동안 그대로 쓰고, TTL이 지나면 수정 시각(Drive modifiedTime)만 먼저 확인해서
+#   바뀐 경우에만 전체 범위를 다시 내려받는다.
+# - FakeWorksheet: 네트워크 없이 같은 인터페이스로 동작하는 로컬 시트 (오프라인 실행/테스트용)
+import os
+import threading
+import time
+from datetime import datetime, timezone
+
+import pandas as pd
+
+SCOPE = ["https://spreadsheets.google.com/feeds", "https://www.googleapis.com/auth/drive"]
+SHEET_URL = "https://docs.google.com/spreadsheets/d/1rDlVNsJrPHB5cjLsAJpqTRH_WEsUBVrqU61CtQVMZas"
+SHEET_TTL = 30  # 초
+
+
+def copy_on_write():
+    # pandas 3부터 Copy-on-Write가 기본. 2.x는 옵션을 켠 경우에만
+    return int(pd.__version__.split(".")[0]) >= 3 or pd.options.mode.copy_on_write is True
+
+
+def shared_copy(frame):
+    # 캐시해 둔 표를 세션에 넘길 때: Copy-on-Write면 얕은 복사(수정한 컬럼만 복사됨),
+    # 아니면 얕은 복사본을 고치는 순간 캐시까지 바뀌므로 깊은 복사
+    return frame.copy(deep=not copy_on_write())
+
+
+def open_worksheet(service_account_info, url=SHEET_URL):
+    import gspread
+    from google.oauth2.service_account import Credentials
+
+    creds = Credentials.from_service_account_info(service_account_info, scopes=SCOPE)
+    client = gspread.authorize(creds)
+    return client.open_by_url(url).sheet1
+
+
+def sheet_revision(worksheet):
+    # 시트 수정 시각 (Drive 메타데이터 요청 한 번). 지원하지 않으면 None
+    spreadsheet = getattr(worksheet, "spreadsheet", None)
+    if spreadsheet is None:
+        return None
+    if hasattr(spreadsheet, "get_lastUpdateTime"):  # gspread 6
+        return spreadsheet.get_lastUpdateTime()
+    return getattr(spreadsheet, "lastUpdateTime", None)  # gspread 5
+
+
+def values_to_frame(data):
+    data = [row for row in data if any(str(cell).strip() for cell in row)]
+    if not data:
+        return pd.DataFrame()
+    headers = data[0]
+    rows = data[1:]
+    return pd.DataFrame(rows, columns=headers)
+
+
+class SheetSource:
+    def __init__(self, worksheet, ttl=SHEET_TTL):
+        self.worksheet = worksheet
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._frame = None
+        self._revision = None
+        self._checked_at = 0.0
+
+    def _refresh(self):
+        now = time.monotonic()
+        if self._frame is not None and now - self._checked_at < self.ttl:
+            return
+        revision = sheet_revision(self.worksheet)
+        if self._frame is None or revision is None or revision != self._revision:
+            self._frame = values_to_frame(self.worksheet.get_all_values())
+            self._revision = revision
+        self._checked_at = now
+
+    def frame(self):
+        # 환자 표. 호출한 쪽에서 수정해도 캐시는 바뀌지 않는다 (shared_copy)
+        with self._lock:
+            self._refresh()
+            return shared_copy(self._frame)
+
+    def invalidate(self):
+        # 이 앱에서 시트에 쓴 직후 호출 → 다음 조회 때 바로 다시 읽는다
+        with self._lock:
+            self._frame = None
+            self._checked_at = 0.0
+
+
+class FakeSpreadsheet:
+    def __init__(self):
+        self.modified = datetime.now(timezone.utc).isoformat()
+
+    def touch(self):
+        self.modified = datetime.now(timezone.utc).isoformat()
+
+    def get_lastUpdateTime(self):
+        return self.modified
+
+
+class FakeWorksheet:
+    # gspread Worksheet 중 이 앱이 쓰는 메서드만 메모리 위에서 흉내낸다
+    def __init__(self, values=None):
+        self.rows = [list(map(str, row)) for row in (values or [])]
+        self.spreadsheet = FakeSpreadsheet()
+        self.calls = []  # 호출 기록 (네트워크 요청 수 확인용)
+
+    @classmethod
+    def from_csv(cls, path):
+        if not os.path.exists(path):
+            return cls()
+        df = pd.read_csv(path, dtype=str, keep_default_na=False)
+        return cls([df.columns.tolist()] + df.values.tolist())
+
+    def _changed(self):
+        self.spreadsheet.touch()
+
+    def get_all_values(self):
+        self.calls.append("get_all_values")
+        return [list(row) for row in self.rows]
+
+    def row_values(self, row):
+        self.calls.append("row_values")
+        return list(self.rows[row - 1]) if len(self.rows) >= row else []
+
+    def get(self, range_name):
+        # "A2:L100" 형태 범위 (gspread처럼 범위를 벗어난 행은 돌려주지 않는다)
+        self.calls.append("get")
+        start, end = range_name.split(":")
+        first = int("".join(ch for ch in start if ch.isdigit()))
+        last = int("".join(ch for ch in end if ch.isdigit()))
+        width = 0
+        for ch in "".join(ch for ch in end if ch.isalpha()):
+            width = width * 26 + ord(ch.upper()) - 64
+        return [list(row[:width]) for row in self.rows[first - 1:last]]
+
+    def col_values(self, col):
+        self.calls.append("col_values")
+        return [row[col - 1] if len(row) >= col else "" for row in self.rows]
+
+    def append_row(self, values, **kwargs):
+        self.append_rows([values])
+
+    def append_rows(self, values, **kwargs):
+        self.calls.append("append_rows")
+        self.rows.extend([list(map(str, row)) for row in values])
+        self._changed()
+
+    def batch_update(self, data, **kwargs):
+        # data: [{"range": "A5:L5", "values": [[...]]}] 형태 (행 단위 갱신만 지원)
+        self.calls.append("batch_update")
+        for item in data:
+            start = item["range"].split(":")[0]
+            row_no = int("".join(ch for ch in start if ch.isdigit()))
+            for offset, values in enumerate(item["values"]):
+                idx = row_no - 1 + offset
+                while len(self.rows) <= idx:
+                    self.rows.append([])
+                self.rows[idx] = list(map(str, values))
+        self._changed()
+
+    def delete_rows(self, start_index, end_index=None):
+        self.calls.append("delete_rows")
+        end_index = end_index or start_index
+        del self.rows[start_index - 1:end_index]
+        self._changed()
@@ -0,0 +1,137 @@
+# 검사 진행률 통계
+# 네 항목의 예정/완료/미완료/진행률/Drop률을 일정 표 한 번 훑기로 환자별로 계산하고,
+# 항목별·담당자별 합계는 그 환자별 표(환자 수 × 4행)에서 다시 묶는다.
+import numpy as np
+import pandas as pd
+
+from schedule_engine import HORIZON_DAYS, ITEM_BITS, evaluate, 항목_목록
+
+STAT_COLUMNS = ["예정건수", "완료건수", "미완료건수", "진행률(%)", "Drop률(%)"]
+
+
+def _scheduled_counts(table, today):
+    # 오늘까지 예정된 검사 수: (환자번호, 항목) → 건수
+    past = table["날짜"].to_numpy() <= np.datetime64(today, "D")
+    codes = table["환자번호"].cat.codes.to_numpy()[past]
+    bits = table["검사"].to_numpy()[past]
+    categories = table["환자번호"].cat.categories
+    counts = pd.DataFrame({
+        항목: np.bincount(codes, weights=(bits & ITEM_BITS[항목]) != 0, minlength=len(categories))
+        for 항목 in 항목_목록
+    }, index=pd.Index(categories.astype(str), name="환자번호"))
+    return counts.astype(np.int64)
+
+
+def _done_counts(rules, completions, today, horizon):
+    # 완료 기록 중 실제로 예정된 날(오늘까지)에 해당하는 것만 센다: (환자번호, 항목) → 건수
+    ids = pd.Index(rules["환자번호"], name="환자번호")
+    counts = pd.DataFrame(0, index=ids, columns=항목_목록, dtype=np.int64)
+    if completions.empty:
+        return counts
+
+    pidx = ids.get_indexer(completions["환자번호"].astype(str))
+    days = pd.to_datetime(completions["날짜"], errors="coerce").to_numpy().astype("datetime64[D]")
+    items = completions["항목"].to_numpy()
+    valid = (pidx >= 0) & ~np.isnat(days)
+    pidx, days, items = pidx[valid], days[valid], items[valid]
+
+    offset = (days - rules["baseline"][pidx]).astype(np.int64)
+    keep = (days <= np.datetime64(today, "D")) & (offset >= 0) & (offset < horizon)
+    pidx, days, items = pidx[keep], days[keep], items[keep]
+
+    masks = evaluate(rules, pidx, days)
+    for 항목 in 항목_목록:
+        hit = (items == 항목) & masks[항목]
+        counts[항목] = np.bincount(pidx[hit], minlength=len(ids))
+    return counts
+
+
+def _with_rates(df):
+    df["미완료건수"] = df["예정건수"] - df["완료건수"]
+    total = df["예정건수"].where(df["예정건수"] > 0)
+    df["진행률(%)"] = (df["완료건수"] / total * 100).fillna(0).round(1)
+    # 누락 건수(유예 기간이 지난 미완료)가 있으면 Drop률은 그것으로, 없으면 오늘까지의 미완료로
+    dropped = df["누락건수"] if "누락건수" in df.columns else df["미완료건수"]
+    df["Drop률(%)"] = (dropped / total * 100).fillna(0).round(1)
+    return df
+
+
+def progress_stats(table, rules, completions, patient_db, today, horizon=HORIZON_DAYS, missed=None):
+    # 반환: {"항목": 항목별, "환자": 환자×항목별, "담당자": 담당자×항목별} 표
+    # missed: (환자번호, 항목) → 누락 건수 (overdue.OverdueTracker.counts())
+    if rules is None or table.empty:
+        empty = pd.DataFrame(columns=STAT_COLUMNS)
+        return {"항목": empty, "환자": empty, "담당자": empty}
+
+    scheduled = _scheduled_counts(table, today).stack().rename("예정건수")
+    done = _done_counts(rules, completions, today, horizon).stack().rename("완료건수")
+    parts, sums = [scheduled, done], ["예정건수", "완료건수"]
+    if missed is not None:
+        parts.append(missed.rename("누락건수"))
+        sums.append("누락건수")
+    per_patient = pd.concat(parts, axis=1).fillna(0).astype(np.int64)
+    per_patient.index.names = ["환자번호", "항목"]
+
+    # 담당자: 환자 표의 "{항목}_담당자" 컬럼
+    staff = patient_db.drop_duplicates("환자번호", keep="last")
+    staff = staff.set_index(staff["환자번호"].astype(str).rename("환자번호"))[[f"{항목}_담당자" for 항목 in 항목_목록]]
+    staff.columns = pd.Index(항목_목록, name="항목")
+    per_patient = per_patient.join(staff.stack().rename("담당자"), how="left").reset_index()
+
+    by_item = per_patient.groupby("항목", sort=False)[sums].sum().reindex(항목_목록, fill_value=0)
+    by_staff = per_patient.groupby(["담당자", "항목"], sort=True)[sums].sum()
+    return {
+        "항목": _with_rates(by_item),
+        "환자": _with_rates(per_patient.set_index(["환자번호", "항목"])),
+        "담당자": _with_rates(by_staff),
+    }
+
+
+# ---- 월별 검사 건수 큐브: (월, 항목, 담당자, 환자번호) → 건수 ----
+CUBE_COLUMNS = ["월", "항목", "담당자", "환자번호", "건수"]
+
+
+def empty_cube():
+    return pd.DataFrame({col: pd.Series(dtype=np.int64 if col == "건수" else object) for col in CUBE_COLUMNS})
+
+
+def monthly_counts(schedule, patient_db):
+    # 일정 표(비트마스크)를 환자·월·항목별 건수로 줄인다. 환자 수 × 월 수 × 4행 정도의 작은 표
+    if schedule.empty:
+        return empty_cube()
+    staff = patient_db.drop_duplicates("환자번호", keep="last")
+    staff = staff.set_index(staff["환자번호"].astype(str))
+    codes = schedule["환자번호"].cat.codes.to_numpy()
+    categories = schedule["환자번호"].cat.categories.astype(str)
+    months = schedule["날짜"].to_numpy().astype("datetime64[M]")
+    bits = schedule["검사"].to_numpy()
+
+    frames = []
+    for 항목 in 항목_목록:
+        hit = (bits & ITEM_BITS[항목]) != 0
+        counts = pd.DataFrame({"code": codes[hit], "월": months[hit]}).value_counts().rename("건수").reset_index()
+        환자번호 = categories[counts["code"].to_numpy()]
+        frames.append(pd.DataFrame({
+            "월": counts["월"].to_numpy().astype("datetime64[M]").astype(str),
+            "항목": 항목,
+            "담당자": staff[f"{항목}_담당자"].reindex(환자번호).to_numpy(),
+            "환자번호": 환자번호,
+            "건수": counts["건수"].to_numpy(),
+        }))
+    return pd.concat(frames, ignore_index=True)
+
+
+def filter_by_user(df, user):
+    # "전체 관리자"는 전체, 그 외에는 본인이 담당자인 행만
+    if user is None or user == "전체 관리자":
+        return df
+    return df[df["담당자"] == user]
+
+
+def rollup(cube, freq="M", by="항목"):
+    # 월(M) 또는 분기(Q) × by(항목/담당자/환자번호) 건수 표
+    name = "월" if freq == "M" else "분기"
+    if cube.empty:
+        return pd.DataFrame(index=pd.Index([], name=name))
+    period = cube["월"] if freq == "M" else pd.PeriodIndex(cube["월"], freq="M").asfreq("Q").astype(str)
+    return cube.assign(**{name: period}).pivot_table(index=name, columns=by, values="건수", aggfunc="sum", fill_value=0)
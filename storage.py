@@ -0,0 +1,464 @@
+# 저장소 계층
+# 환자/완료 기록/외래 일정/음성 링크를 어디에 저장하든 화면 코드는 같은 방식으로 쓰도록 묶는다.
+#   - CsvStorage:    patients.csv + completed.csv(+로그) + audio_links.csv
+#   - SheetsStorage: 환자는 구글 시트(쓰기 대기열), 나머지는 CSV와 같음
+#   - SqliteStorage: 하나의 SQLite 파일에 색인된 표로 저장, 쓰기는 트랜잭션, 조회 조건은 SQL로 처리
+# 모든 저장소는 patients() / insert_patient / update_patient / delete_patient 와
+# completions(CompletionStore와 같은 메서드), visits(VisitIndex와 같은 메서드), audio(get/links_for)를 가진다.
+import os
+import sqlite3
+import threading
+
+import numpy as np
+import pandas as pd
+
+from audio_links import AudioLinkIndex
+from completion_store import COLUMNS, CompletionStore, atomic_write_csv, make_key, normalize_date, normalize_dates
+from outpatient import VisitIndex, parse_visits
+from schedule_engine import PROTOCOL, 담당자_컬럼
+from schedule_store import RULE_COLUMNS
+from sheets import shared_copy
+
+PATIENT_COLUMNS = [
+    "환자번호", "Baseline", "Start_date", "음성_주기", "증상_주기", "환경_사용", "웨어러블_사용", "외래일",
+    "음성_담당자", "증상_담당자", "환경_담당자", "웨어러블_담당자",
+]
+# 프로토콜(SCHEDULE_PROTOCOL)이 위 컬럼 밖에서 더 읽는 규칙 컬럼 (등록/수정 화면에서는 글자로 입력받는다)
+EXTRA_RULE_COLUMNS = [col for col in PROTOCOL.columns if col not in PATIENT_COLUMNS]
+# 기본 컬럼 + 추가 규칙 컬럼 + 새 검사의 "{검사}_담당자" 컬럼 (기본 프로토콜이면 기본 컬럼 그대로)
+PATIENT_COLUMNS = PATIENT_COLUMNS + EXTRA_RULE_COLUMNS + [col for col in 담당자_컬럼 if col not in PATIENT_COLUMNS]
+
+
+def read_patients_csv(path):
+    if not os.path.exists(path):
+        return pd.DataFrame(columns=PATIENT_COLUMNS)
+    return pd.read_csv(path, dtype=str, keep_default_na=False)
+
+
+class CsvStorage:
+    name = "csv"
+
+    def __init__(self, patients_path, done_path, done_log_path, audio_path):
+        self.patients_path = patients_path
+        self._lock = threading.Lock()
+        self._patients = read_patients_csv(patients_path)
+        self.completions = CompletionStore.open(done_path, done_log_path)
+        self.visits = VisitIndex()
+        self.audio = AudioLinkIndex(audio_path)
+
+    def patients(self):
+        df = shared_copy(self._patients)  # 화면에서 고쳐도 저장소의 표는 그대로
+        self.visits.sync(df)
+        return df
+
+    def _upsert(self, 환자번호, row):
+        with self._lock:
+            df = self._patients[self._patients["환자번호"].astype(str) != str(환자번호)]
+            self._patients = pd.concat([df, pd.DataFrame([row])], ignore_index=True)
+            atomic_write_csv(self._patients, self.patients_path)
+
+    def insert_patient(self, row):
+        self._upsert(row["환자번호"], row)
+
+    def insert_patients(self, rows):
+        # 여러 환자를 파일 한 번 쓰기로 저장
+        if not rows:
+            return
+        with self._lock:
+            added = pd.DataFrame(rows)
+            df = self._patients[~self._patients["환자번호"].astype(str).isin(added["환자번호"].astype(str))]
+            self._patients = pd.concat([df, added], ignore_index=True)
+            atomic_write_csv(self._patients, self.patients_path)
+
+    def update_patient(self, 환자번호, row):
+        self._upsert(환자번호, row)
+
+    def delete_patient(self, 환자번호):
+        with self._lock:
+            self._patients = self._patients[self._patients["환자번호"].astype(str) != str(환자번호)]
+            atomic_write_csv(self._patients, self.patients_path)
+
+
+class SheetsStorage(CsvStorage):
+    # 환자 표는 구글 시트가 원본. 변경은 쓰기 대기열로 보내고 patients.csv에도 사본을 남긴다
+    name = "sheets"
+
+    def __init__(self, source, queue, patients_path, done_path, done_log_path, audio_path):
+        super().__init__(patients_path, done_path, done_log_path, audio_path)
+        self.source = source
+        self.queue = queue
+
+    def patients(self):
+        df = self.queue.apply(self.source.frame())
+        self.visits.sync(df)
+        return df
+
+    def _mirror(self):
+        with self._lock:
+            atomic_write_csv(self.patients(), self.patients_path)
+
+    def insert_patient(self, row):
+        self.queue.insert(row)
+        self._mirror()
+
+    def insert_patients(self, rows):
+        if not rows:
+            return
+        self.queue.insert_many(rows)
+        self._mirror()
+
+    def update_patient(self, 환자번호, row):
+        self.queue.update(환자번호, row)
+        self._mirror()
+
+    def delete_patient(self, 환자번호):
+        self.queue.delete(환자번호)
+        self._mirror()
+
+
+# ---- SQLite ----
+def quote(name):
+    # SQL 식별자로 감싼다. 환자 컬럼 이름은 프로토콜 JSON에서 오므로 공백/따옴표/예약어가 있어도 그대로 쓸 수 있게
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def column_list(columns):
+    return ", ".join(quote(col) for col in columns)
+
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS patients (
+    환자번호 TEXT PRIMARY KEY,
+    {", ".join(f"{quote(col)} TEXT" for col in PATIENT_COLUMNS[1:])}
+);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS completions (
+    환자번호 TEXT NOT NULL, 날짜 TEXT NOT NULL, 항목 TEXT NOT NULL, 결과 TEXT NOT NULL DEFAULT '',
+    PRIMARY KEY (환자번호, 날짜, 항목)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS completions_by_date ON completions (날짜, 항목);
+CREATE TABLE IF NOT EXISTS outpatient_visits (
+    환자번호 TEXT NOT NULL REFERENCES patients(환자번호) ON DELETE CASCADE, 외래일 TEXT NOT NULL,
+    PRIMARY KEY (환자번호, 외래일)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS outpatient_visits_by_date ON outpatient_visits (외래일);
+CREATE TABLE IF NOT EXISTS audio_links (
+    환자번호 TEXT NOT NULL, 날짜 TEXT NOT NULL, 링크 TEXT NOT NULL,
+    PRIMARY KEY (환자번호, 날짜)
+) WITHOUT ROWID;
+"""
+
+
+# 환자별 일정 규칙 (프로토콜이 읽는 컬럼 + 담당자). 컬럼이 프로토콜마다 다르므로 프로토콜 버전이 바뀔 때 다시 만든다
+RULES_SCHEMA = f"""
+CREATE TABLE schedule_rules (
+    환자번호 TEXT PRIMARY KEY REFERENCES patients(환자번호) ON DELETE CASCADE,
+    {", ".join(f"{quote(col)} TEXT" for col in RULE_COLUMNS)}
+)
+"""
+
+# PRAGMA user_version: 이 값 이상이면 기존 CSV 데이터를 이미 옮겨 온 DB
+CSV_MIGRATED = 1
+
+
+class _Db:
+    # 스레드 간에 공유하는 연결 하나 + lock (Streamlit 세션은 각자 다른 스레드에서 돈다)
+    def __init__(self, path):
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA foreign_keys=ON")
+        self.conn.executescript(SCHEMA)
+        # 프로토콜이 바뀌어 새로 필요한 환자 컬럼은 기존 표에 덧붙인다
+        existing = {row[1] for row in self.conn.execute("PRAGMA table_info(patients)")}
+        for col in PATIENT_COLUMNS:
+            if col not in existing:
+                self.conn.execute(f"ALTER TABLE patients ADD COLUMN {quote(col)} TEXT")
+        self.lock = threading.RLock()
+        self._migrate_rules()
+
+    def _rules_version(self, conn):
+        row = conn.execute("SELECT value FROM meta WHERE key = 'schedule_rules'").fetchone()
+        return row[0] if row else None
+
+    def _migrate_rules(self):
+        # meta에 적힌 프로토콜 버전과 다를 때만 한 번 schedule_rules 표를 지금 프로토콜의 컬럼으로 다시 만들고
+        # 환자 표에서 채운다 (예전 고정 컬럼 표도 여기서 한 번 바뀐다)
+        if self._rules_version(self.conn) == PROTOCOL.version:
+            return
+        with self.transaction() as conn:
+            if self._rules_version(conn) == PROTOCOL.version:
+                return    # 다른 프로세스가 먼저 바꿈
+            conn.execute("DROP TABLE IF EXISTS schedule_rules")
+            conn.execute(RULES_SCHEMA)
+            columns = column_list(["환자번호"] + RULE_COLUMNS)
+            conn.execute(f"INSERT INTO schedule_rules ({columns}) SELECT {columns} FROM patients")
+            conn.execute(
+                "INSERT INTO meta (key, value) VALUES ('schedule_rules', ?) "
+                "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+                (PROTOCOL.version,),
+            )
+
+    def query(self, sql, params=()):
+        with self.lock:
+            cur = self.conn.execute(sql, params)
+            columns = [c[0] for c in cur.description]
+            return pd.DataFrame(cur.fetchall(), columns=columns)
+
+    def scalar(self, sql, params=()):
+        with self.lock:
+            row = self.conn.execute(sql, params).fetchone()
+        return row[0] if row else None
+
+    def transaction(self):
+        return _Transaction(self)
+
+
+class _Transaction:
+    def __init__(self, db):
+        self.db = db
+
+    def __enter__(self):
+        self.db.lock.acquire()
+        self.db.conn.execute("BEGIN IMMEDIATE")
+        return self.db.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            if exc_type is None:
+                self.db.conn.execute("COMMIT")
+            else:
+                self.db.conn.execute("ROLLBACK")
+        finally:
+            self.db.lock.release()
+        return False
+
+
+class SqliteCompletions:
+    # CompletionStore와 같은 메서드. 조회 조건(환자, 기간)은 SQL로 내려 보낸다
+    def __init__(self, db):
+        self.db = db
+        self.listeners = []
+
+    def __len__(self):
+        return self.db.scalar("SELECT COUNT(*) FROM completions")
+
+    def is_done(self, 환자번호, 날짜, 항목):
+        return self.db.scalar(
+            "SELECT 1 FROM completions WHERE 환자번호 = ? AND 날짜 = ? AND 항목 = ?", make_key(환자번호, 날짜, 항목)
+        ) is not None
+
+    def add(self, 환자번호, 날짜, 항목, 결과=""):
+        self.add_many([(환자번호, 날짜, 항목)], 결과)
+
+    def add_many(self, rows, 결과=""):
+        keys = [make_key(*row) for row in rows]
+        with self.db.transaction() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO completions (환자번호, 날짜, 항목, 결과) VALUES (?, ?, ?, ?)",
+                [(*key, 결과) for key in keys],
+            )
+        self._notify("add", keys)
+
+    def remove(self, 환자번호, 날짜, 항목):
+        key = make_key(환자번호, 날짜, 항목)
+        with self.db.transaction() as conn:
+            conn.execute("DELETE FROM completions WHERE 환자번호 = ? AND 날짜 = ? AND 항목 = ?", key)
+        self._notify("cancel", [key])
+
+    def _notify(self, op, keys):
+        for listener in list(self.listeners):  # 듣는 쪽이 도중에 빠져도 되도록 사본을 돈다
+            listener(op, keys)
+
+    def query(self, 환자번호=None, start=None, end=None, 항목=None):
+        where, params = [], []
+        if 환자번호 is not None:
+            where.append("환자번호 = ?")
+            params.append(str(환자번호))
+        if start is not None:
+            where.append("날짜 >= ?")
+            params.append(normalize_date(start))
+        if end is not None:
+            where.append("날짜 <= ?")
+            params.append(normalize_date(end))
+        if 항목 is not None:
+            where.append("항목 = ?")
+            params.append(항목)
+        sql = "SELECT 환자번호, 날짜, 항목, 결과 FROM completions"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        return self.db.query(sql, params)
+
+    def mark(self, frame):
+        if frame.empty:
+            return np.zeros(len(frame), dtype=bool)
+        ids = frame["환자번호"].astype(str).to_numpy()
+        dates = normalize_dates(frame["날짜"].to_numpy()).to_numpy()
+        items = frame["항목"].astype(str).to_numpy()
+        # 화면에 보이는 기간(과 환자가 한 명이면 그 환자)만 읽어 온다
+        unique_ids = pd.unique(ids)
+        done = self.query(
+            환자번호=unique_ids[0] if len(unique_ids) == 1 else None,
+            start=pd.Series(dates).dropna().min(), end=pd.Series(dates).dropna().max(),
+        )
+        keys = pd.MultiIndex.from_arrays([ids, dates, items])
+        return keys.isin(pd.MultiIndex.from_frame(done[COLUMNS]))
+
+    def to_frame(self):
+        df = self.query()
+        if not (df["결과"] != "").any():
+            df = df.drop(columns="결과")
+        return df
+
+
+class SqliteVisits:
+    # VisitIndex와 같은 메서드. outpatient_visits 표는 환자 저장과 같은 트랜잭션에서 갱신된다
+    def __init__(self, db):
+        self.db = db
+
+    def sync(self, patient_db):
+        return self
+
+    def between(self, start, end):
+        df = self.db.query(
+            "SELECT 환자번호, 외래일 FROM outpatient_visits WHERE 외래일 BETWEEN ? AND ? ORDER BY 외래일, 환자번호",
+            (normalize_date(start), normalize_date(end)),
+        )
+        df["외래일"] = pd.to_datetime(df["외래일"]).dt.date
+        return df
+
+    def on(self, day):
+        return self.between(day, day)
+
+    def for_patient(self, 환자번호):
+        df = self.db.query("SELECT 외래일 FROM outpatient_visits WHERE 환자번호 = ? ORDER BY 외래일", (str(환자번호),))
+        return pd.to_datetime(df["외래일"]).dt.date.tolist()
+
+
+class SqliteAudio:
+    # 링크의 원본은 audio_links.csv. 파일 수정 시각이 표를 채울 때(meta에 기록)와 다르면 표를 다시 채운다
+    # (AudioLinkIndex와 같은 갱신 규칙 → CSV에 나중에 더한 링크도 보인다)
+    def __init__(self, db, csv_path=None):
+        self.db = db
+        self.csv_path = csv_path
+        self._mtime = None
+
+    def _refresh(self):
+        if self.csv_path is None:
+            return
+        try:
+            mtime = str(os.stat(self.csv_path).st_mtime_ns)
+        except FileNotFoundError:
+            return
+        if mtime == self._mtime:
+            return
+        if self.db.scalar("SELECT value FROM meta WHERE key = 'audio_links_mtime'") != mtime:
+            rows = AudioLinkIndex(self.csv_path).rows()
+            with self.db.transaction() as conn:
+                conn.execute("DELETE FROM audio_links")
+                conn.executemany("INSERT INTO audio_links (환자번호, 날짜, 링크) VALUES (?, ?, ?)", rows)
+                conn.execute(
+                    "INSERT INTO meta (key, value) VALUES ('audio_links_mtime', ?) "
+                    "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+                    (mtime,),
+                )
+        self._mtime = mtime
+
+    def get(self, 환자번호, 날짜):
+        self._refresh()
+        return self.db.scalar("SELECT 링크 FROM audio_links WHERE 환자번호 = ? AND 날짜 = ?",
+                              (str(환자번호), normalize_date(날짜)))
+
+    def links_for(self, 환자번호):
+        self._refresh()
+        df = self.db.query("SELECT 날짜, 링크 FROM audio_links WHERE 환자번호 = ? ORDER BY 날짜", (str(환자번호),))
+        return dict(zip(df["날짜"], df["링크"]))
+
+
+class SqliteStorage:
+    name = "sqlite"
+
+    def __init__(self, path, audio_path=None):
+        self.db = _Db(path)
+        self.completions = SqliteCompletions(self.db)
+        self.visits = SqliteVisits(self.db)
+        self.audio = SqliteAudio(self.db, audio_path)
+
+    def patients(self):
+        return self.db.query(f"SELECT {column_list(PATIENT_COLUMNS)} FROM patients ORDER BY rowid")
+
+    def _write_patients(self, conn, rows):
+        rows = [{col: str(row.get(col, "")) for col in PATIENT_COLUMNS} for row in rows]
+        ids = [(row["환자번호"],) for row in rows]
+        conn.executemany("DELETE FROM outpatient_visits WHERE 환자번호 = ?", ids)
+        # INSERT OR REPLACE는 행을 지우고 다시 넣어 rowid(등록 순서)가 바뀌므로 있는 행은 제자리에서 고친다
+        conn.executemany(
+            f"INSERT INTO patients ({column_list(PATIENT_COLUMNS)}) VALUES ({', '.join('?' * len(PATIENT_COLUMNS))}) "
+            f"ON CONFLICT(환자번호) DO UPDATE SET "
+            f"{', '.join(f'{quote(col)} = excluded.{quote(col)}' for col in PATIENT_COLUMNS[1:])}",
+            [tuple(row[col] for col in PATIENT_COLUMNS) for row in rows],
+        )
+        columns = ["환자번호"] + RULE_COLUMNS
+        conn.executemany(
+            f"INSERT INTO schedule_rules ({column_list(columns)}) VALUES ({', '.join('?' * len(columns))}) "
+            f"ON CONFLICT(환자번호) DO UPDATE SET "
+            f"{', '.join(f'{quote(col)} = excluded.{quote(col)}' for col in RULE_COLUMNS)}",
+            [tuple(row[col] for col in columns) for row in rows],
+        )
+        visits = parse_visits(pd.DataFrame(rows))
+        conn.executemany(
+            "INSERT OR IGNORE INTO outpatient_visits (환자번호, 외래일) VALUES (?, ?)",
+            zip(visits["환자번호"], visits["외래일"].dt.strftime("%Y-%m-%d")),
+        )
+
+    def insert_patients(self, rows):
+        # 여러 환자를 한 트랜잭션으로 저장
+        with self.db.transaction() as conn:
+            self._write_patients(conn, rows)
+
+    def insert_patient(self, row):
+        self.insert_patients([row])
+
+    def update_patient(self, 환자번호, row):
+        with self.db.transaction() as conn:
+            if str(row["환자번호"]) != str(환자번호):
+                conn.execute("DELETE FROM patients WHERE 환자번호 = ?", (str(환자번호),))
+            self._write_patients(conn, [row])
+
+    def delete_patient(self, 환자번호):
+        with self.db.transaction() as conn:
+            conn.execute("DELETE FROM patients WHERE 환자번호 = ?", (str(환자번호),))
+
+    def migrate_csv(self, patients_path, done_path, done_log_path, audio_path):
+        # 처음 SQLite로 바꿀 때 한 번만 기존 CSV 데이터를 옮기고 user_version에 기록한다
+        # (나중에 환자를 모두 지워도 CSV를 다시 가져오지 않는다). 옮겼으면 True
+        if self.db.scalar("PRAGMA user_version") >= CSV_MIGRATED:
+            return False
+        data = self._read_csv(patients_path, done_path, done_log_path, audio_path)
+        with self.db.transaction() as conn:
+            if conn.execute("PRAGMA user_version").fetchone()[0] >= CSV_MIGRATED:
+                return False    # 다른 프로세스가 먼저 옮김
+            # 기록을 남기기 전부터 쓰던 DB는 이미 옮긴 데이터가 있으므로 기록만 남긴다
+            if conn.execute("SELECT COUNT(*) FROM patients").fetchone()[0] == 0:
+                self._import(conn, *data)
+            conn.execute(f"PRAGMA user_version = {CSV_MIGRATED}")
+        return True
+
+    def import_csv(self, patients_path, done_path, done_log_path, audio_path):
+        # 기존 CSV 데이터를 한 트랜잭션으로 옮긴다
+        data = self._read_csv(patients_path, done_path, done_log_path, audio_path)
+        with self.db.transaction() as conn:
+            self._import(conn, *data)
+
+    def _read_csv(self, patients_path, done_path, done_log_path, audio_path):
+        patients = read_patients_csv(patients_path)
+        completions = CompletionStore.open(done_path, done_log_path).to_frame()
+        return patients, completions, AudioLinkIndex(audio_path).rows()
+
+    def _import(self, conn, patients, completions, audio_rows):
+        results = completions["결과"] if "결과" in completions.columns else pd.Series("", index=completions.index)
+        self._write_patients(conn, patients.to_dict("records"))
+        conn.executemany(
+            "INSERT OR REPLACE INTO completions (환자번호, 날짜, 항목, 결과) VALUES (?, ?, ?, ?)",
+            zip(completions["환자번호"], completions["날짜"], completions["항목"], results),
+        )
+        conn.executemany("INSERT OR REPLACE INTO audio_links (환자번호, 날짜, 링크) VALUES (?, ?, ?)", audio_rows)
@@ -0,0 +1,60 @@
+import pandas as pd
+
+import bulk_import
+from bulk_import import validate
+from schedule_engine import PROTOCOL, 담당자_컬럼
+from storage import PATIENT_COLUMNS
+
+
+def chunk(*rows):
+    frame = pd.DataFrame([{col: "" for col in PATIENT_COLUMNS} | row for row in rows], columns=PATIENT_COLUMNS)
+    frame.index = frame.index + 2
+    return frame
+
+
+def row(환자번호, **values):
+    base = {
+        "환자번호": 환자번호, "Baseline": "2025-01-01", "Start_date": "2025-01-01", "음성_주기": "1w",
+        "증상_주기": "daily", "환경_사용": "착용", "웨어러블_사용": "착용",
+    }
+    return base | {col: "김" for col in 담당자_컬럼} | values
+
+
+def test_choices_come_from_protocol():
+    assert bulk_import.CHOICES == PROTOCOL.choices
+    assert set(bulk_import.CHOICES["음성_주기"]) == set(PROTOCOL.tests[0].every["values"])
+    assert bulk_import.DATE_COLUMNS == ["Baseline", "Start_date"]
+
+
+def test_validate_reports_bad_rows_and_keeps_good_ones():
+    seen = set()
+    accepted, errors = validate(
+        chunk(row("P1"), row("P2", 음성_주기="3주"), row("P3", Baseline="2025/01/01"), row("P1"), row("P4", 음성_담당자="박"),
+              row("OLD"), row("P5", 증상_주기="")),
+        staff={"김"}, existing={"OLD"}, seen=seen,
+    )
+    assert accepted["환자번호"].tolist() == ["P1"]
+    assert seen == {"P1"}
+    by_row = {e["행"]: e["오류"] for e in errors}
+    assert sorted(by_row) == [3, 4, 5, 6, 7, 8]
+    assert "음성_주기 값 오류" in by_row[3]
+    assert "Baseline 날짜 형식 오류" in by_row[4]
+    assert "중복된 환자번호" in by_row[5]
+    assert "미등록 담당자" in by_row[6]
+    assert "이미 등록된 환자번호" in by_row[7]
+    assert "증상_주기 없음" in by_row[8]
+
+    # 앞 조각에서 통과한 환자번호는 다음 조각에서 중복
+    accepted, errors = validate(chunk(row("P1")), staff={"김"}, existing=set(), seen=seen)
+    assert accepted.empty and "중복된 환자번호" in errors[0]["오류"]
+
+
+def test_rule_compile_errors_become_row_errors(monkeypatch):
+    def compile_rules(rows):
+        if (rows["환자번호"] == "BAD").any():
+            raise ValueError("규칙 없음")
+
+    monkeypatch.setattr(bulk_import, "compile_rules", compile_rules)
+    accepted, errors = validate(chunk(row("P1"), row("BAD"), row("P2")), staff={"김"}, existing=set(), seen=set())
+    assert accepted["환자번호"].tolist() == ["P1", "P2"]
+    assert errors == [{"행": 3, "환자번호": "BAD", "오류": "일정 규칙 오류: 규칙 없음"}]
@@ -0,0 +1,39 @@
+import pandas as pd
+
+from calendar_events import build_events
+from schedule_engine import compile_rules, 담당자_컬럼
+
+
+def rules():
+    # 2025-01-06은 월요일. P1: 증상 매일 + 환경 첫 4주, P2: 증상 weekly(월·수·금·토)
+    base = {"Baseline": "2025-01-06", "Start_date": "2025-01-06", "음성_주기": "1m", "웨어러블_사용": "비착용"}
+    base |= {col: "김" for col in 담당자_컬럼}
+    return compile_rules(pd.DataFrame([
+        base | {"환자번호": "P1", "증상_주기": "daily", "환경_사용": "착용"},
+        base | {"환자번호": "P2", "증상_주기": "weekly", "환경_사용": "비착용"},
+    ]))
+
+
+def spans(events):
+    return [(event["title"], event["start"], event["end"]) for event in events]
+
+
+def test_patient_events_collapse_consecutive_days_within_the_window():
+    compiled = rules()
+    # 창 밖(창 시작 전, 환경 구간 끝 이후)은 잘리고, 연속된 날은 하나의 기간으로 묶인다 (end는 다음 날)
+    assert spans(build_events(compiled, ["증상", "환경"], "2025-01-20", "2025-02-09", patient="P1")) == [
+        ("P1 - 증상", "2025-01-20", "2025-02-10"),
+        ("P1 - 환경", "2025-01-20", "2025-02-03"),
+    ]
+    assert spans(build_events(compiled, ["증상"], "2025-01-20", "2025-01-26", patient="P2")) == [
+        ("P2 - 증상", "2025-01-20", "2025-01-21"),
+        ("P2 - 증상", "2025-01-22", "2025-01-23"),
+        ("P2 - 증상", "2025-01-24", "2025-01-26"),
+    ]
+    assert build_events(compiled, ["증상"], "2024-12-01", "2024-12-31", patient="P1") == []
+    assert build_events(compiled, ["증상"], "2025-01-20", "2025-01-26", patient="없는 환자") == []
+
+
+def test_overview_counts_patients_per_day():
+    events = build_events(rules(), ["증상"], "2025-01-20", "2025-01-21")
+    assert spans(events) == [("2명 - 증상", "2025-01-20", "2025-01-20"), ("1명 - 증상", "2025-01-21", "2025-01-21")]
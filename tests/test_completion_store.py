@@ -0,0 +1,54 @@
+import threading
+
+from completion_store import CompletionStore
+
+
+def test_add_after_torn_log_tail_survives_replay(tmp_path):
+    snapshot, log = tmp_path / "completed.csv", tmp_path / "completed.log"
+    store = CompletionStore.open(str(snapshot), str(log))
+    store.add("S001", "2025-01-02", "음성")
+
+    # 다음 이벤트를 쓰다가 죽어서 마지막 줄이 줄바꿈 없이 끊긴 상태
+    with open(log, "a", encoding="utf-8", newline="") as f:
+        f.write("add,S00")
+
+    store = CompletionStore.open(str(snapshot), str(log))
+    store.add("S002", "2025-01-03", "증상")
+
+    replayed = CompletionStore.open(str(snapshot), str(log))
+    assert replayed.is_done("S001", "2025-01-02", "음성")
+    assert replayed.is_done("S002", "2025-01-03", "증상")
+    assert len(replayed) == 2
+
+
+def test_query_by_patient_and_period(tmp_path):
+    snapshot, log = tmp_path / "completed.csv", tmp_path / "completed.log"
+    store = CompletionStore.open(str(snapshot), str(log))
+    store.add_many([("S001", "2025-01-02", "음성"), ("S001", "2025-01-05", "증상"), ("S002", "2025-01-03", "음성")])
+    store.remove("S001", "2025-01-05", "증상")
+    store.compact()
+    store.add("S002", "2025-01-09", "환경")
+    store = CompletionStore.open(str(snapshot), str(log))
+
+    assert store.query(환자번호="S001")[["날짜", "항목"]].values.tolist() == [["2025-01-02", "음성"]]
+    period = store.query(start="2025-01-03", end="2025-01-09")
+    assert period[["환자번호", "날짜"]].values.tolist() == [["S002", "2025-01-03"], ["S002", "2025-01-09"]]
+    assert store.query(항목="음성")["환자번호"].tolist() == ["S001", "S002"]
+
+
+def test_to_frame_is_not_stale_after_concurrent_adds():
+    store = CompletionStore()
+    store.add_many([(f"S{i}", "2025-01-01", "음성") for i in range(2000)])
+
+    def read():
+        for _ in range(50):
+            store.to_frame()
+
+    readers = [threading.Thread(target=read) for _ in range(4)]
+    for thread in readers:
+        thread.start()
+    for i in range(200):
+        store.add(f"T{i}", "2025-01-02", "증상")
+    for thread in readers:
+        thread.join()
+    assert len(store.to_frame()) == len(store) == 2200
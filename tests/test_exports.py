@@ -0,0 +1,27 @@
+import pandas as pd
+import pytest
+
+from exports import STATS_COLUMNS, WORKLIST_COLUMNS, CsvWriter, ParquetWriter, empty_report
+
+
+def test_empty_csv_export_keeps_header(tmp_path):
+    path = tmp_path / "worklist.csv"
+    writer = CsvWriter(str(path), "업무 목록", empty_report("worklist", "2025-01-01", "2025-01-31"))
+    writer.close()
+    assert pd.read_csv(path, encoding="utf-8-sig").columns.tolist() == WORKLIST_COLUMNS
+
+
+def test_empty_parquet_export_has_schema(tmp_path):
+    pytest.importorskip("pyarrow")
+    path = tmp_path / "stats.parquet"
+    writer = ParquetWriter(str(path), "월별 통계", empty_report("stats", "2025-01-01", "2025-01-31"))
+    writer.close()
+    table = pd.read_parquet(path)
+    assert table.empty
+    assert table.columns.tolist() == list(STATS_COLUMNS)
+    assert table["건수"].dtype == "int64"
+
+
+def test_empty_grid_has_one_column_per_day():
+    grid = empty_report("grid", "2025-01-30", "2025-02-02")
+    assert grid.columns.tolist() == ["환자번호", "항목", "2025-01-30", "2025-01-31", "2025-02-01", "2025-02-02"]
@@ -0,0 +1,35 @@
+import datetime
+
+import pandas as pd
+
+from outpatient import VisitIndex
+
+
+def patients(**visits):
+    return pd.DataFrame({"환자번호": list(visits), "외래일": list(visits.values())})
+
+
+def test_visit_queries_use_parsed_dates():
+    index = VisitIndex().sync(patients(
+        P1="2025-03-01|2025-06-01",
+        P2=" 2025-03-01 | 날짜 아님 |",
+        P10="2025-06-10",
+        P3="",
+    ))
+    assert index.on("2025-03-01")["환자번호"].tolist() == ["P1", "P2"]
+    visits = index.between("2025-05-01", "2025-06-10")
+    assert list(zip(visits["환자번호"], visits["외래일"])) == [
+        ("P1", datetime.date(2025, 6, 1)), ("P10", datetime.date(2025, 6, 10)),
+    ]
+    # "P1"로 찾을 때 "P10"이 섞이지 않는다
+    assert index.for_patient("P1") == [datetime.date(2025, 3, 1), datetime.date(2025, 6, 1)]
+    assert index.for_patient("P3") == []
+    assert index.on("2025-04-01").empty
+
+
+def test_visit_index_rebuilds_when_visits_change():
+    index = VisitIndex().sync(patients(P1="2025-03-01"))
+    index.sync(patients(P1="2025-03-02"))
+    assert index.on("2025-03-01").empty
+    assert index.on("2025-03-02")["환자번호"].tolist() == ["P1"]
+    assert index.sync(pd.DataFrame()).between("2025-01-01", "2025-12-31").empty
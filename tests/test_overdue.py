@@ -0,0 +1,36 @@
+import gc
+
+from benchmarks.cohort import TODAY, make_patients
+from completion_store import CompletionStore
+from overdue import OverdueTracker
+from schedule_store import ScheduleStore
+
+
+def make_tracker(completions):
+    store = ScheduleStore()
+    store.sync(make_patients(20))
+    tracker = OverdueTracker(store, completions)
+    tracker.refresh(TODAY.astype(object))
+    return tracker
+
+
+def test_close_unregisters_listener():
+    completions = CompletionStore()
+    tracker = make_tracker(completions)
+    assert len(completions.listeners) == 1
+    tracker.close()
+    tracker.close()
+    assert completions.listeners == []
+
+
+def test_dropped_tracker_does_not_stay_subscribed():
+    completions = CompletionStore()
+    tracker = make_tracker(completions)
+    missed = tracker.missed().iloc[0]
+    completions.add(missed["환자번호"], missed["날짜"], missed["항목"])
+    assert tracker.total() == len(tracker.missed())
+
+    del tracker
+    gc.collect()
+    assert completions.listeners == []
+    completions.add("S1", "2025-01-01", "음성")
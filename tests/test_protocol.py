@@ -0,0 +1,47 @@
+import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from protocol import DEFAULT_PROTOCOL, Protocol, to_days
+
+
+def test_to_days_accepts_strings_dates_and_timestamps():
+    expected = np.array(["2025-01-31", "2025-02-01", "2025-03-01"], dtype="datetime64[D]")
+    assert (to_days([" 2025-01-31 ", "2025-02-01", "2025-03-01"]) == expected).all()
+    assert (to_days([pd.Timestamp("2025-01-31 13:00"), datetime.date(2025, 2, 1),
+                     datetime.datetime(2025, 3, 1, 5)]) == expected).all()
+    assert (to_days(expected.astype("datetime64[ns]")) == expected).all()
+
+
+def with_test(name, spec, **protocol):
+    return {"name": "t", "anchor": "Baseline", "horizon_days": 365, "tests": {name: spec}, **protocol}
+
+
+@pytest.mark.parametrize("definition", [
+    with_test("음성", {"every_days": 7, "weekdays": [0]}),                        # 규칙 두 개
+    with_test("음성", {"from": "Baseline"}),                                      # 규칙 없음
+    with_test("음성", {"every_days": 0}),                                         # 주기 0
+    with_test("음성", {"every_days": 7, "colour": "red"}),                         # 모르는 설정
+    with_test("음성", {"every_days": {"column": "음성_주기", "value": {"1w": 7}}}),  # values 오타
+    with_test("증상", {"weekdays": [0, 7]}),                                      # 없는 요일
+    with_test("환경", {"windows": {"days": 28, "from": "Baseline"}}),              # 구간 기준 없음
+    with_test("환경", {"windows": {"days": 0, "start_at_months": [0]}}),           # 길이 0
+    with_test("음성", {"every_days": 7, "horizon_days": 400}),                    # 프로토콜 horizon 초과
+    with_test("음성", {"every_days": 7, "when": {"column": "x"}}),                 # 조건 연산 없음
+    with_test("음성", {"every_days": 7, "when": {"column": "x", "equals": 1, "in": [1]}}),
+    with_test("음성", {"every_days": 7}, version=2),                               # 모르는 프로토콜 설정
+    {**DEFAULT_PROTOCOL, "tests": {}},                                              # 검사 없음
+    {**DEFAULT_PROTOCOL, "tests": {f"t{i}": {"every_days": 1} for i in range(9)}},  # uint8 비트 초과
+])
+def test_protocol_rejects_malformed_rules(definition):
+    with pytest.raises(ValueError):
+        Protocol(definition)
+
+
+def test_unknown_column_value_is_reported_with_patient():
+    patients = pd.DataFrame({"환자번호": ["S1"], "Baseline": ["2025-01-01"], "Start_date": ["2025-01-01"],
+                             "음성_주기": ["3w"], "증상_주기": ["daily"], "환경_사용": ["착용"], "웨어러블_사용": ["착용"]})
+    with pytest.raises(ValueError, match="S1"):
+        Protocol(DEFAULT_PROTOCOL).compile_rules(patients)
@@ -0,0 +1,97 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+from dateutil.relativedelta import relativedelta
+
+from benchmarks.cohort import make_patients
+from protocol import Protocol
+from schedule_engine import build_schedules, compile_rules, due_on, evaluate, has, 항목_목록
+
+
+def generate_schedule(patient):
+    # 벡터화 이전의 환자별 일정 계산 (app.py의 generate_schedule 그대로, ● 대신 bool)
+    baseline = datetime.strptime(patient["Baseline"], "%Y-%m-%d").date()
+    start_date = datetime.strptime(patient["Start_date"], "%Y-%m-%d").date()
+    gap = {"1w": 7, "2w": 14, "1m": 30}[patient["음성_주기"]]
+
+    def in_windows(date, days):
+        if baseline <= date <= baseline + timedelta(days=days - 1):
+            return True
+        for m in [3, 6, 9, 12]:
+            check_day = baseline + relativedelta(months=+m)
+            if check_day - timedelta(days=days - 1) <= date <= check_day:
+                return True
+        return False
+
+    rows = []
+    for i in range(365):
+        date = baseline + timedelta(days=i)
+        rows.append({
+            "음성": date == baseline or date == start_date or (date > start_date and (date - start_date).days % gap == 0),
+            "증상": patient["증상_주기"] == "daily" or date.weekday() in [0, 2, 4, 5],
+            "환경": patient["환경_사용"] != "비착용" and in_windows(date, 28),
+            "웨어러블": patient["웨어러블_사용"] != "비착용" and in_windows(date, 14),
+        })
+    return pd.DataFrame(rows)
+
+
+def edge_patients():
+    # 말일 기준일(3개월 뒤 달에 같은 날이 없음), 윤년 2/29, Start_date가 Baseline보다 앞선 환자
+    patients = make_patients(4, seed=3)
+    patients["Baseline"] = ["2024-11-30", "2025-01-31", "2024-02-29", "2025-03-10"]
+    patients["Start_date"] = ["2024-12-02", "2025-01-31", "2024-02-20", "2025-02-25"]
+    return patients
+
+
+def test_build_schedules_matches_per_patient_loop():
+    patients = pd.concat([make_patients(30), edge_patients()], ignore_index=True)
+    patients["환자번호"] = [f"P{i:03d}" for i in range(len(patients))]
+    table = build_schedules(patients)
+
+    assert len(table) == 365 * len(patients)
+    for i, patient in patients.iterrows():
+        rows = table.iloc[i * 365:(i + 1) * 365]
+        assert (rows["환자번호"].astype(str) == patient["환자번호"]).all()
+        expected = generate_schedule(patient)
+        for 항목 in 항목_목록:
+            assert (has(rows, 항목) == expected[항목].to_numpy()).all(), (patient["환자번호"], 항목)
+
+
+def test_end_every_months_windows_repeat_over_the_horizon():
+    protocol = Protocol({
+        "anchor": "Baseline", "horizon_days": 3 * 365,
+        "tests": {"환경": {"windows": {"days": 14, "from": "Baseline", "end_every_months": 6}}},
+    })
+    patients = pd.DataFrame({"환자번호": ["S1"], "Baseline": ["2025-08-31"], "환경_담당자": ["김"]})
+    rules = protocol.compile_rules(patients)
+    days = np.datetime64("2025-08-31") + np.arange(3 * 365)
+    got = protocol.evaluate(rules, np.zeros(len(days), dtype=int), days)["환경"]
+
+    baseline = datetime(2025, 8, 31).date()
+    ends = [baseline + relativedelta(months=+m) for m in range(6, 37, 6)]
+    expected = [any(end - timedelta(days=13) <= d.astype(object) <= end for end in ends) for d in days]
+    assert (got == np.array(expected)).all()
+
+
+def test_evaluate_only_requested_items():
+    rules = compile_rules(make_patients(5))
+    masks = evaluate(rules, np.arange(5), np.full(5, np.datetime64("2025-06-02")), ["음성"])
+    assert list(masks) == ["음성"]
+
+
+def test_due_on_matches_the_full_schedule_for_that_day():
+    patients = make_patients(40)
+    rules = compile_rules(patients)
+    table = build_schedules(patients)
+    staff = patients.set_index("환자번호")
+    for day in ["2024-12-31", "2025-01-06", "2025-03-15", "2025-07-01", "2026-06-30"]:
+        rows = table[table["날짜"] == pd.Timestamp(day)]
+        expected = sorted((str(pid), 항목) for 항목 in 항목_목록 for pid in rows["환자번호"][has(rows, 항목)])
+        due = due_on(rules, day)
+        assert sorted(zip(due["환자번호"], due["항목"])) == expected
+        assert (due["날짜"] == pd.Timestamp(day).date()).all()
+        assert all(staff.loc[pid, f"{항목}_담당자"] == 담당자 for pid, 항목, 담당자 in zip(due["환자번호"], due["항목"], due["담당자"]))
+
+    due = due_on(rules, "2025-03-15", items=["증상"])
+    assert set(due["항목"]) <= {"증상"}
@@ -0,0 +1,30 @@
+import threading
+
+import schedule_snapshot
+from benchmarks.cohort import make_patients
+from schedule_store import ScheduleStore
+
+
+def test_concurrent_writers_each_swap_a_complete_snapshot(tmp_path):
+    directory = str(tmp_path / "schedule_snapshot")
+    store = ScheduleStore()
+    table = store.sync(make_patients(50))
+    errors = []
+
+    def write():
+        try:
+            for _ in range(5):
+                schedule_snapshot.write_table(directory, table, store.fingerprints, store.cube, store.horizon)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=write) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    snapshot = schedule_snapshot.read_snapshot(directory)
+    assert (snapshot.table()["검사"].to_numpy() == table["검사"].to_numpy()).all()
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["schedule_snapshot", "schedule_snapshot.lock"]
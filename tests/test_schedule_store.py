@@ -0,0 +1,32 @@
+import pandas as pd
+
+from benchmarks.cohort import make_patients
+from schedule_store import ScheduleStore
+
+
+def ordered(table):
+    table = table.assign(환자번호=table["환자번호"].astype(str))
+    return table.sort_values(["환자번호", "날짜"], ignore_index=True)
+
+
+def test_incremental_sync_matches_full_rebuild():
+    patients = make_patients(30)
+    store = ScheduleStore()
+    store.sync(patients)
+
+    # 수정 2명, 삭제 1명, 신규 1명
+    changed = patients.copy()
+    changed.loc[0, "음성_주기"] = "1m" if changed.loc[0, "음성_주기"] != "1m" else "1w"
+    changed.loc[1, "Baseline"] = "2025-03-01"
+    changed = changed.drop(index=2)
+    changed = pd.concat([changed, make_patients(31).tail(1)], ignore_index=True)
+
+    incremental = store.sync(changed)
+    rebuilt = ScheduleStore()
+    full = rebuilt.sync(changed)
+    pd.testing.assert_frame_equal(ordered(incremental), ordered(full))
+
+    keys = ["월", "항목", "담당자", "환자번호"]
+    pd.testing.assert_frame_equal(
+        store.cube.sort_values(keys, ignore_index=True), rebuilt.cube.sort_values(keys, ignore_index=True)
+    )
@@ -0,0 +1,28 @@
+from sheet_queue import SheetWriteQueue
+from sheets import FakeWorksheet
+
+
+def test_enqueue_after_torn_journal_tail_survives_restart(tmp_path):
+    journal = tmp_path / "sheet_queue.jsonl"
+    queue = SheetWriteQueue(FakeWorksheet([["환자번호", "이름"]]), str(journal))
+    queue.insert({"환자번호": "S1", "이름": "가"})
+    with open(journal, "a", encoding="utf-8") as f:
+        f.write('{"seq": 2, "op": "ins')
+
+    queue = SheetWriteQueue(queue.worksheet, str(journal))
+    queue.insert({"환자번호": "S2", "이름": "나"})
+
+    restarted = SheetWriteQueue(queue.worksheet, str(journal))
+    assert [op["환자번호"] for op in restarted.pending()] == ["S1", "S2"]
+
+
+def test_retried_insert_updates_existing_row(tmp_path):
+    sheet = FakeWorksheet([["환자번호", "이름"]])
+    queue = SheetWriteQueue(sheet, str(tmp_path / "sheet_queue.jsonl"))
+    queue.insert({"환자번호": "S1", "이름": "가"})
+    # 지난번 반영에서 append_rows는 됐지만 저널을 비우기 전에 실패한 상태
+    sheet.append_rows([["S1", "가"]])
+
+    assert queue.flush()
+    assert sheet.rows == [["환자번호", "이름"], ["S1", "가"]]
+    assert queue.pending() == []
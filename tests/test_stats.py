@@ -0,0 +1,31 @@
+import pandas as pd
+
+from schedule_engine import build_schedules, compile_rules, 담당자_컬럼
+from stats import progress_stats
+
+
+def test_done_counts_only_completions_on_scheduled_days():
+    # 2025-01-06은 월요일: 음성 1w(6, 13, 20일), 증상 weekly(월·수·금·토), 환경 착용, 웨어러블 비착용
+    patients = pd.DataFrame([{
+        "환자번호": "P1", "Baseline": "2025-01-06", "Start_date": "2025-01-06", "음성_주기": "1w",
+        "증상_주기": "weekly", "환경_사용": "착용", "웨어러블_사용": "비착용",
+    } | {col: "김" for col in 담당자_컬럼}])
+    completions = pd.DataFrame([
+        ("P1", "2025-01-06", "음성"),   # 예정된 날
+        ("P1", "2025-01-07", "음성"),   # 예정 없는 날
+        ("P1", "2025-01-27", "음성"),   # 오늘 이후
+        ("P1", "2025-01-08", "증상"),   # 수요일
+        ("P1", "2025-01-10", "환경"),   # 첫 4주 안
+        ("P1", "2025-01-05", "환경"),   # Baseline 이전
+        ("P1", "2025-01-09", "웨어러블"),  # 비착용
+        ("P2", "2025-01-06", "음성"),   # 없는 환자
+        ("P1", "날짜 아님", "음성"),
+    ], columns=["환자번호", "날짜", "항목"])
+
+    stats = progress_stats(build_schedules(patients), compile_rules(patients), completions, patients, "2025-01-20")
+    by_item = stats["항목"]
+    assert by_item["완료건수"].to_dict() == {"음성": 1, "증상": 1, "환경": 1, "웨어러블": 0}
+    assert by_item.loc["음성", "예정건수"] == 3
+    assert by_item.loc["웨어러블", "예정건수"] == 0
+    assert stats["담당자"].loc[("김", "음성"), "완료건수"] == 1
+    assert stats["환자"].loc[("P1", "증상"), "미완료건수"] == by_item.loc["증상", "예정건수"] - 1
@@ -0,0 +1,120 @@
+import json
+import os
+import sqlite3
+import subprocess
+import sys
+
+import pandas as pd
+
+from schedule_store import RULE_COLUMNS
+from storage import PATIENT_COLUMNS, CsvStorage, SqliteStorage
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def patient(환자번호, 담당자="김"):
+    row = {col: "" for col in PATIENT_COLUMNS}
+    row.update({
+        "환자번호": 환자번호, "Baseline": "2025-01-01", "Start_date": "2025-01-01", "음성_주기": "4주",
+        "증상_주기": "daily", "환경_사용": "착용", "웨어러블_사용": "착용", "음성_담당자": 담당자,
+    })
+    return row
+
+
+def csv_paths(tmp_path):
+    pd.DataFrame([patient("S1"), patient("S2")]).to_csv(tmp_path / "patients.csv", index=False)
+    return [str(tmp_path / name) for name in ("patients.csv", "completed.csv", "completed.log", "audio_links.csv")]
+
+
+def test_csv_migration_runs_once(tmp_path):
+    paths = csv_paths(tmp_path)
+    storage = SqliteStorage(str(tmp_path / "app.db"))
+    assert storage.migrate_csv(*paths)
+    assert storage.patients()["환자번호"].tolist() == ["S1", "S2"]
+
+    storage.delete_patient("S1")
+    storage.delete_patient("S2")
+    reopened = SqliteStorage(str(tmp_path / "app.db"))
+    assert not reopened.migrate_csv(*paths)
+    assert reopened.patients().empty
+
+
+def test_update_keeps_registration_order(tmp_path):
+    storage = SqliteStorage(str(tmp_path / "app.db"))
+    storage.insert_patients([patient("S1"), patient("S2"), patient("S3")])
+    storage.update_patient("S1", patient("S1", 담당자="이"))
+
+    patients = storage.patients()
+    assert patients["환자번호"].tolist() == ["S1", "S2", "S3"]
+    assert patients["음성_담당자"].tolist() == ["이", "김", "김"]
+
+
+def test_protocol_column_names_are_quoted(tmp_path):
+    # 프로토콜 JSON의 컬럼 이름에 공백/따옴표/SQL이 있어도 그대로 저장되고 다른 표는 멀쩡해야 한다
+    column = 'sleep "use"); DROP TABLE completions; --'
+    protocol = {
+        "name": "quoted", "anchor": "Baseline", "horizon_days": 30,
+        "tests": {"수면": {"weekdays": [0], "when": {"column": column, "equals": "착용"}}},
+    }
+    (tmp_path / "protocol.json").write_text(json.dumps(protocol, ensure_ascii=False), encoding="utf-8")
+    script = (
+        "import sys; from storage import SqliteStorage; "
+        "s = SqliteStorage(sys.argv[1]); "
+        f"s.insert_patient({{'환자번호': 'S1', 'Baseline': '2025-01-01', {column!r}: '착용'}}); "
+        "s = SqliteStorage(sys.argv[1]); "
+        f"print(s.patients().loc[0, {column!r}], len(s.completions))"
+    )
+    env = {**os.environ, "SCHEDULE_PROTOCOL": str(tmp_path / "protocol.json")}
+    result = subprocess.run([sys.executable, "-c", script, str(tmp_path / "app.db")], env=env,
+                            cwd=ROOT, capture_output=True, text=True, check=True)
+    assert result.stdout.split() == ["착용", "0"]
+
+
+def test_schedule_rules_follow_patients_and_migrate_once(tmp_path):
+    path = str(tmp_path / "app.db")
+    conn = sqlite3.connect(path)
+    # 예전 버전의 고정 컬럼 schedule_rules 표
+    conn.executescript(
+        "CREATE TABLE schedule_rules (환자번호 TEXT PRIMARY KEY, baseline TEXT NOT NULL, voice_gap INTEGER);"
+        "INSERT INTO schedule_rules VALUES ('S0', '2025-01-01', 7);"
+    )
+    conn.close()
+
+    storage = SqliteStorage(path)
+    storage.insert_patients([patient("S1"), patient("S2")])
+    storage.update_patient("S1", patient("S1", 담당자="이"))
+    storage.delete_patient("S2")
+
+    rules = SqliteStorage(path).db.query("SELECT * FROM schedule_rules")
+    assert rules.columns.tolist() == ["환자번호"] + RULE_COLUMNS
+    assert rules[["환자번호", "음성_담당자"]].values.tolist() == [["S1", "이"]]
+
+
+def test_csv_patients_edits_do_not_leak_into_storage(tmp_path):
+    paths = csv_paths(tmp_path)
+    storage = CsvStorage(*paths)
+    df = storage.patients()
+    df.at[0, "음성_주기"] = "1m"
+    df.loc[df["환자번호"] == "S2", "외래일"] = "2025-03-01"
+    df.drop(df.index[0], inplace=True)
+
+    again = storage.patients()
+    assert again["환자번호"].tolist() == ["S1", "S2"]
+    assert again["음성_주기"].tolist() == ["4주", "4주"]
+    assert again["외래일"].tolist() == ["", ""]
+
+
+def test_sqlite_audio_links_follow_the_csv(tmp_path):
+    paths = csv_paths(tmp_path)
+    audio_path = paths[3]
+    pd.DataFrame({"환자번호": ["S1"], "검사 날짜": ["2025-01-02"], "파일 링크": ["a"]}).to_csv(audio_path, index=False)
+    storage = SqliteStorage(str(tmp_path / "app.db"), audio_path)
+    storage.migrate_csv(*paths)
+    assert storage.audio.get("S1", "2025-01-02") == "a"
+
+    # 옮긴 뒤에 CSV에 더한 링크
+    pd.DataFrame({"환자번호": ["S1", "S2"], "검사 날짜": ["2025-01-02", "2025-01-03"],
+                  "파일 링크": ["a", "b"]}).to_csv(audio_path, index=False)
+    os.utime(audio_path, ns=(0, os.stat(audio_path).st_mtime_ns + 1_000_000))
+    assert storage.audio.get("S2", "2025-01-03") == "b"
+    assert SqliteStorage(str(tmp_path / "app.db"), audio_path).audio.links_for("S2") == {"2025-01-03": "b"}
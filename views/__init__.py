@@ -0,0 +1 @@
+# 메뉴별 화면. app.py가 선택된 메뉴의 모듈만 불러와 render(current_user)를 호출한다.
@@ -0,0 +1,45 @@
+# 🗓️ 달력 뷰어
+from datetime import datetime, timedelta
+
+import pandas as pd
+import streamlit as st
+from streamlit_calendar import calendar
+
+from calendar_events import build_events, month_range
+from resources import get_schedule_store, load_data, load_schedules
+from schedule_engine import 항목_목록
+
+
+def render(current_user):
+    patient_db = load_data()
+
+    st.subheader("🗓️ 달력 형태로 검사 일정 보기")
+
+    검사_항목 = st.multiselect("검사 항목 선택", 항목_목록, default=항목_목록)
+    patient_ids = patient_db["환자번호"].unique().tolist()
+    selected_patient = st.selectbox("환자 선택", ["전체 보기"] + patient_ids)
+
+    # 달력에 보이는 기간만 이벤트로 만든다 (달력을 넘기면 datesSet 콜백으로 기간을 받아 다시 계산)
+    if "calendar_range" not in st.session_state:
+        st.session_state.calendar_range = month_range(datetime.today().date())
+    보기_시작, 보기_끝 = st.session_state.calendar_range
+
+    load_schedules(patient_db)
+    events = build_events(
+        get_schedule_store().rules, 검사_항목, 보기_시작, 보기_끝,
+        patient=None if selected_patient == "전체 보기" else selected_patient
+    )
+
+    calendar_options = {
+        "initialView": "dayGridMonth",  # 기본 달력 뷰
+        "initialDate": str(보기_시작 + (보기_끝 - 보기_시작) / 2),
+    }
+    state = calendar(events=events, options=calendar_options, callbacks=["datesSet"], key="schedule_calendar")
+
+    if state and state.get("callback") == "datesSet":
+        dates_set = state["datesSet"]
+        new_range = (pd.Timestamp(dates_set["start"][:10]).date(),
+                     pd.Timestamp(dates_set["end"][:10]).date() - timedelta(days=1))
+        if new_range != st.session_state.calendar_range:
+            st.session_state.calendar_range = new_range
+            st.rerun()
@@ -0,0 +1,92 @@
+# 📁 전체 환자 관리: 기본 통계, 진행률, 점오표
+from datetime import datetime, timedelta
+
+import streamlit as st
+
+from grid import grid_long, pivot_grid
+from profiling import stage
+from resources import get_schedule_store, get_storage, load_data, load_overdue, load_schedules
+from stats import progress_stats
+
+
+def render(current_user):
+    patient_db = load_data()
+    completion_store = get_storage().completions
+
+    st.subheader("📁 전체 환자 점오표 확인")
+
+    st.markdown("### 📊 등록 환자 기본 통계")
+    total_patients = patient_db["환자번호"].nunique()
+    st.write(f"**총 등록 환자 수:** {total_patients}명")
+
+    st.write("**각 항목별 검사 진행 환자 수**")
+    def count_active(dataframe, column_name):
+        return dataframe[dataframe[column_name] != "비착용"].shape[0]
+
+    voice_count = patient_db[patient_db["음성_주기"].notnull()].shape[0]
+    symptom_count = patient_db[patient_db["증상_주기"].notnull()].shape[0]
+    environment_count = count_active(patient_db, "환경_사용")
+    wearable_count = count_active(patient_db, "웨어러블_사용")
+
+    st.markdown("### 🕒 검사 진행률 (오늘 기준)")
+
+    # 네 항목의 진행률을 환자별·담당자별까지 한 번에 계산
+    # Drop률은 유예 기간이 지나도 완료되지 않은 누락 건수로 계산 (누락 추적기에서 바로 읽는다)
+    # 일정 저장소는 이 화면에서 한 번만 맞추고 아래에서는 그대로 읽는다
+    full_schedule = load_schedules(patient_db)
+    store = get_schedule_store()
+    overdue = load_overdue(datetime.today().date())
+    with stage("진행률 계산") as s:
+        progress = progress_stats(full_schedule, store.rules, completion_store.to_frame(),
+                                  patient_db, datetime.today().date(), missed=overdue.counts())
+        s.count(progress["환자"])
+
+    col1, col2 = st.columns(2)
+    with col1:
+        st.metric("음성 검사 시행 환자 수", voice_count)
+        st.metric("환경 착용 환자 수", environment_count)
+    with col2:
+        st.metric("증상 검사 시행 환자 수", symptom_count)
+        st.metric("웨어러블 착용 환자 수", wearable_count)
+    st.metric("누락 검사 (유예 기간 경과)", overdue.total())
+
+    if patient_db.empty:
+        st.warning("등록된 환자가 없습니다.")
+        st.stop()
+
+    # 점오표 (선택한 기간 × 환자 페이지만 계산해서 표시)
+    st.markdown("### 🗂️ 점오표")
+    today = datetime.today().date()
+    col_range, col_size, col_page = st.columns([3, 1, 1])
+    with col_range:
+        표시_기간 = st.date_input("표시 기간", [today - timedelta(days=7), today + timedelta(days=21)], key="grid_range")
+    if len(표시_기간) != 2:
+        st.stop()
+    환자_목록 = sorted(patient_db["환자번호"].astype(str).unique())
+    with col_size:
+        page_size = st.selectbox("페이지당 환자 수", [20, 50, 100], key="grid_page_size")
+    with col_page:
+        page_count = max(1, -(-len(환자_목록) // page_size))
+        page = st.number_input(f"페이지 (/{page_count})", min_value=1, max_value=page_count, value=1, key="grid_page")
+    page_ids = 환자_목록[(page - 1) * page_size:page * page_size]
+
+    # 완료된 검사 결과가 있으면 결과를, 없으면 ● 표시
+    with stage("점오표 구간 계산") as s:
+        merged = grid_long(store, completion_store, page_ids, 표시_기간[0], 표시_기간[1])
+        s.count(merged)
+
+    # 점오표 출력
+    with stage("점오표 피벗") as s:
+        점오표 = pivot_grid(merged)
+        s.count(점오표)
+
+    with stage("화면 출력"):
+        st.dataframe(점오표, use_container_width=True)
+
+        progress_df = progress["항목"].rename_axis("검사 항목").reset_index()
+        st.dataframe(progress_df, use_container_width=True)
+
+        with st.expander("담당자별 진행률"):
+            st.dataframe(progress["담당자"], use_container_width=True)
+        with st.expander("환자별 진행률"):
+            st.dataframe(progress["환자"], use_container_width=True)
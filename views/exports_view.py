@@ -0,0 +1,59 @@
+# 📤 보고서 내보내기: 점오표 / 담당자별 업무 목록 / 월별 통계 파일 만들기
+# 파일은 백그라운드에서 만들어지므로 요청 후 다른 화면을 써도 되고, 끝나면 여기서 내려받는다.
+import os
+from datetime import datetime, timedelta
+
+import pandas as pd
+import streamlit as st
+
+from exports import REPORTS, available_formats
+from resources import get_export_queue
+
+MIME = {
+    "csv": "text/csv",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "parquet": "application/octet-stream",
+}
+
+
+def render(current_user):
+    exports = get_export_queue()
+
+    st.subheader("📤 보고서 내보내기")
+
+    today = datetime.today().date()
+    col1, col2 = st.columns(2)
+    with col1:
+        report = st.selectbox("보고서", list(REPORTS), format_func=REPORTS.get, key="export_report")
+        fmt = st.selectbox("파일 형식", available_formats(), key="export_format")
+    with col2:
+        기간 = st.date_input("기간", [today - timedelta(days=30), today + timedelta(days=60)], key="export_range")
+    st.caption("전체 관리자는 전체 환자, 그 외 사용자는 본인이 담당하는 항목/환자만 내보냅니다.")
+
+    if st.button("내보내기 시작", key="export_submit"):
+        if len(기간) != 2:
+            st.warning("시작일과 종료일을 모두 선택해 주세요.")
+        else:
+            job = exports.submit(report, fmt, 기간[0], 기간[1], current_user)
+            st.success(f"{job.id}번 작업을 대기열에 넣었습니다. 다른 화면을 사용하셔도 됩니다.")
+
+    st.markdown("### 📄 내 작업")
+    jobs = exports.jobs(None if current_user == "전체 관리자" else current_user)
+    if not jobs:
+        st.info("요청한 내보내기 작업이 없습니다.")
+        return
+    if st.button("🔄 상태 새로고침", key="export_refresh"):
+        st.rerun()
+    st.dataframe(pd.DataFrame([job.to_record() for job in jobs]), use_container_width=True, hide_index=True)
+
+    for job in jobs:
+        if job.status != "완료" or not os.path.exists(job.path):
+            continue
+        with open(job.path, "rb") as f:
+            st.download_button(
+                f"⬇️ {job.id}번 {job.filename}",
+                data=f,
+                file_name=job.filename,
+                mime=MIME[job.format],
+                key=f"export_download_{job.id}"
+            )
@@ -0,0 +1,28 @@
+# 📊 월별 검사 통계
+import streamlit as st
+
+from resources import get_schedule_store, load_data, load_schedules
+from stats import filter_by_user, rollup
+
+
+def render(current_user):
+    patient_db = load_data()
+
+    st.subheader("📊 항목별 월별 검사 횟수")
+
+    # 미리 집계된 (월, 항목, 담당자, 환자번호) 건수 큐브에서 읽는다
+    load_schedules(patient_db)
+    cube = filter_by_user(get_schedule_store().cube, current_user)
+
+    col1, col2 = st.columns(2)
+    with col1:
+        단위 = st.radio("집계 단위", ["월", "분기"], horizontal=True, key="stats_freq")
+    with col2:
+        묶음 = st.radio("구분", ["항목", "담당자"], horizontal=True, key="stats_by")
+
+    pivot = rollup(cube, "M" if 단위 == "월" else "Q", 묶음)
+    pivot = pivot.reset_index()
+
+    st.dataframe(pivot, use_container_width=True)
+
+    st.bar_chart(pivot.set_index(단위))
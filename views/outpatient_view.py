@@ -0,0 +1,63 @@
+# 🗂️ 외래 일정 관리
+from datetime import datetime, timedelta
+
+import streamlit as st
+
+from resources import get_storage, load_data
+
+
+def render(current_user):
+    patient_db = load_data()
+    storage = get_storage()
+
+    st.subheader("📅 외래 일정 확인 및 수정")
+
+    today = datetime.today().date()
+    tomorrow = today + timedelta(days=1)
+
+    visits = storage.visits.sync(patient_db)
+    today_visits = visits.on(today)
+    tomorrow_visits = visits.on(tomorrow)
+
+    col1, col2 = st.columns(2)
+    with col1:
+        st.markdown("### 📍 오늘 외래 일정")
+        if not today_visits.empty:
+            st.dataframe(today_visits[["환자번호", "외래일"]])
+        else:
+            st.info("오늘 외래 일정 없음")
+
+    with col2:
+        st.markdown("### 📍 내일 외래 일정")
+        if not tomorrow_visits.empty:
+            st.dataframe(tomorrow_visits[["환자번호", "외래일"]])
+        else:
+            st.info("내일 외래 일정 없음")
+
+    st.markdown("### 🗓️ 이번 주 외래 일정")
+    week_start = today - timedelta(days=today.weekday())
+    week_visits = visits.between(week_start, week_start + timedelta(days=6))
+    if not week_visits.empty:
+        st.dataframe(week_visits, use_container_width=True)
+    else:
+        st.info("이번 주 외래 일정 없음")
+
+    st.markdown("### ✏️ 외래 일정 수정")
+    환자선택 = st.selectbox("수정할 환자 선택", patient_db["환자번호"].unique(), key="outpatient_patient")
+    외래_리스트 = [d.strftime("%Y-%m-%d") for d in visits.for_patient(환자선택)]
+    외래_리스트 = 외래_리스트[:4] + [""] * (4 - len(외래_리스트))  # 최대 4개까지만
+
+    cols = st.columns(4)
+    수정_리스트 = []
+    for i, col in enumerate(cols):
+        with col:
+            date = st.date_input(f"{3*(i+1)}개월차", value=datetime.strptime(외래_리스트[i], "%Y-%m-%d").date()
+                                 if 외래_리스트[i] else today, key=f"edit_out_{i}")
+            수정_리스트.append(date.strftime("%Y-%m-%d"))
+
+    if st.button("저장", key="save_outpatient"):
+        new_string = "|".join([d for d in 수정_리스트 if d])
+        patient_db.loc[patient_db["환자번호"] == 환자선택, "외래일"] = new_string
+        storage.update_patient(환자선택, patient_db[patient_db["환자번호"] == 환자선택].iloc[0].to_dict())
+        visits.sync(patient_db)
+        st.success(f"{환자선택} 외래 일정 저장 완료!")
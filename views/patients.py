@@ -0,0 +1,183 @@
+# 📂 환자 목록 보기: 기본 정보 조회/수정/삭제, 검사 타임라인, 완료 처리
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from profiling import stage
+from resources import (
+    get_audio_file_link, get_schedule_store, get_storage, load_data, load_overdue, load_schedules, user_list,
+)
+from schedule_engine import to_markers, 담당자_컬럼, 항목_목록
+from storage import EXTRA_RULE_COLUMNS
+
+
+def option_index(options, value):
+    # 저장된 값이 선택지에 없으면(시트에서 직접 고친 값 등) 첫 번째 선택지로
+    return options.index(value) if value in options else 0
+
+
+def render(current_user):
+    patient_db = load_data()
+    storage = get_storage()
+    completion_store = storage.completions
+
+    st.subheader("📂 환자 목록 보기")
+
+    if patient_db.empty:
+        st.warning("등록된 환자가 없습니다.")
+        st.stop()
+
+    선택 = st.selectbox("환자 선택", sorted(patient_db["환자번호"].unique()), key=f"patient_select_{len(patient_db)}")
+
+
+    if st.button("🗑️ 선택 환자 삭제", key=f"delete_{선택}"):
+        patient_db.drop(patient_db[patient_db["환자번호"] == 선택].index, inplace=True)
+        storage.delete_patient(선택)
+        st.success(f"{선택} 환자 정보가 삭제되었습니다.")
+        st.experimental_rerun()
+
+    if "edit_mode" not in st.session_state:
+        st.session_state.edit_mode = False
+
+    col_title, col_button = st.columns([6, 1])
+    with col_title:
+        st.markdown("### 📝 기본 정보")
+    with col_button:
+        if st.button("✏️ 수정", key=f"edit_toggle_{선택}"):
+            st.session_state.edit_mode = not st.session_state.edit_mode
+
+
+    patient = patient_db[patient_db["환자번호"] == 선택].iloc[0]
+    load_schedules(patient_db)
+    schedule = get_schedule_store().patient_schedule(선택)
+
+    if not st.session_state.edit_mode:
+        col1, col2 = st.columns(2)
+        with col1:
+            st.markdown(f"- **Baseline:** {patient['Baseline']}")
+            st.markdown(f"- **Start_date:** {patient['Start_date']}")
+            st.markdown(f"- **외래일:** {patient['외래일']}")
+        with col2:
+            st.markdown(f"- **음성 주기:** {patient['음성_주기']}")
+            st.markdown(f"- **증상 주기:** {patient['증상_주기']}")
+            st.markdown(f"- **환경 착용:** {patient['환경_사용']}")
+            st.markdown(f"- **웨어러블 착용:** {patient['웨어러블_사용']}")
+            for col in EXTRA_RULE_COLUMNS:
+                st.markdown(f"- **{col}:** {patient.get(col, '')}")
+
+        st.markdown("#### 담당자")
+        col3, col4 = st.columns(2)
+        for i, col in enumerate(담당자_컬럼):
+            with col3 if i % 2 == 0 else col4:
+                st.markdown(f"- {col.replace('_', ' ')}: {patient.get(col, '')}")
+
+    else:
+        col1, col2 = st.columns(2)
+        with col1:
+            edit_baseline = st.date_input("Baseline", value=pd.to_datetime(patient['Baseline']).date(), key="edit_baseline")
+            edit_start = st.date_input("Start_date", value=pd.to_datetime(patient['Start_date']).date(), key="edit_start")
+            edit_outpatient = st.text_input("외래일 (|로 구분)", value=patient["외래일"], key="edit_outpatient")
+        with col2:
+            edit_voice = st.selectbox("음성 주기", ["1w", "2w", "1m"], index=option_index(["1w", "2w", "1m"], patient["음성_주기"]))
+            edit_symptom = st.selectbox("증상 주기", ["daily", "weekly"], index=option_index(["daily", "weekly"], patient["증상_주기"]))
+            edit_env = st.radio("환경 착용", ["착용", "비착용"], index=option_index(["착용", "비착용"], patient["환경_사용"]))
+            edit_wear = st.radio("웨어러블 착용", ["착용", "비착용"], index=option_index(["착용", "비착용"], patient["웨어러블_사용"]))
+            edit_extra = {col: st.text_input(col, value=patient.get(col, ""), key=f"edit_{col}") for col in EXTRA_RULE_COLUMNS}
+
+        st.markdown("#### 담당자 수정")
+        col3, col4 = st.columns(2)
+        edit_staff = {}
+        for i, col in enumerate(담당자_컬럼):
+            with col3 if i % 2 == 0 else col4:
+                edit_staff[col] = st.selectbox(col.replace("_", " "), user_list[1:],
+                                               index=option_index(user_list[1:], patient.get(col, "")))
+
+        if st.button("💾 수정 내용 저장"):
+            idx = patient_db[patient_db["환자번호"] == 선택].index[0]
+
+            patient_db.at[idx, "Baseline"] = edit_baseline.strftime("%Y-%m-%d")
+            patient_db.at[idx, "Start_date"] = edit_start.strftime("%Y-%m-%d")
+            patient_db.at[idx, "외래일"] = edit_outpatient
+            patient_db.at[idx, "음성_주기"] = edit_voice
+            patient_db.at[idx, "증상_주기"] = edit_symptom
+            patient_db.at[idx, "환경_사용"] = edit_env
+            patient_db.at[idx, "웨어러블_사용"] = edit_wear
+            for col, value in {**edit_extra, **edit_staff}.items():
+                patient_db.loc[idx, col] = value
+
+            storage.update_patient(선택, patient_db.loc[idx].to_dict())  # 수정된 데이터를 저장
+            st.success("기본 정보가 수정되었습니다.")
+            st.session_state.edit_mode = False
+            st.experimental_rerun()  # 수정 후 페이지 새로고침
+
+
+    st.markdown("#### 🔍 검사 상태 필터링")
+    검사_기간 = st.date_input("날짜 범위 선택", [datetime.today() - timedelta(days=14), datetime.today()], key="filter_date")
+    항목_필터 = st.multiselect("항목 선택", 항목_목록, default=항목_목록, key="filter_item")
+
+    with stage("타임라인 계산") as s:
+        filtered_schedule = schedule[
+            (schedule["날짜"] >= pd.Timestamp(검사_기간[0])) &
+            (schedule["날짜"] <= pd.Timestamp(검사_기간[1]))
+        ].copy()
+        filtered_schedule["날짜"] = filtered_schedule["날짜"].dt.date
+
+        melted = to_markers(filtered_schedule, 항목_필터).melt(
+            id_vars=["날짜"],
+            value_vars=항목_필터,
+            var_name="항목",
+            value_name="표시"
+        )
+        s.count(melted)
+
+    with stage("완료 여부 결합") as s:
+        완료 = completion_store.mark(melted.assign(환자번호=선택))
+        melted["표시"] = np.where(완료, "🔴", np.where(melted["표시"] == "●", "⚫", ""))
+        s.count(melted)
+
+    st.markdown("#### 🗓️ 환자 검사 타임라인")
+    with stage("타임라인 피벗") as s:
+        pivot = melted.pivot(index="항목", columns="날짜", values="표시").fillna("")
+        s.count(pivot)
+    st.dataframe(pivot, use_container_width=True)
+
+    st.markdown("#### ⏳ 미완료 검사 이력 / 수동 처리")
+    검사필터 = st.selectbox("항목 필터", ["전체"] + 항목_필터, key="이력항목")
+    날짜필터 = st.date_input("날짜 선택 (필터용)", value=datetime.today(), key="이력날짜")
+
+    이력대상 = melted[
+        ((melted["표시"] == "⚫") | (melted["표시"] == "🔴")) &
+        ((melted["항목"] == 검사필터) if 검사필터 != "전체" else True) &
+        (melted["날짜"] == 날짜필터)
+    ]
+
+    for _, row in 이력대상.iterrows():
+        is_done = row["표시"] == "🔴"
+        cols = st.columns([3, 2, 3])
+        cols[0].write(row["날짜"])
+        cols[1].write(row["항목"])
+
+        if is_done:
+            if row["항목"] == "음성":
+                link = get_audio_file_link(선택, row["날짜"], patient_db)
+                if link:
+                    cols[2].markdown(f"[🎧 재생하기]({link})", unsafe_allow_html=True)
+                else:
+                    cols[2].write("🔇 음성 없음")
+            if cols[2].button("❌ 완료 취소", key=f"cancel_{row['날짜']}_{row['항목']}"):
+                completion_store.remove(선택, row["날짜"], row["항목"])
+                st.rerun()
+        else:
+            if cols[2].button("✅ 완료 처리", key=f"manual_done_{row['날짜']}_{row['항목']}"):
+                completion_store.add(선택, row["날짜"], row["항목"])
+                st.rerun()
+
+    # 유예 기간이 지나도 완료되지 않은 검사 (누락 추적기에서 이 환자 것만 읽는다)
+    누락 = load_overdue(datetime.today().date()).missed(선택)
+    if 누락.empty:
+        st.info("오늘 이전에 완료되지 않은 검사가 없습니다.")
+    else:
+        st.write(f"**누락 검사 {len(누락)}건**")
+        st.dataframe(누락[["날짜", "항목"]], use_container_width=True, hide_index=True)
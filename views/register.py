@@ -0,0 +1,98 @@
+# 📋 새 환자 등록 (한 명씩 / CSV·구글 시트 일괄 등록)
+import pandas as pd
+import streamlit as st
+
+from bulk_import import import_patients, iter_csv_chunks, iter_sheet_chunks
+from resources import get_schedule_store, get_service_account, get_storage, load_data, user_list
+from schedule_engine import 담당자_컬럼
+from storage import EXTRA_RULE_COLUMNS
+
+
+def render(current_user):
+    patient_db = load_data()
+    storage = get_storage()
+
+    st.subheader("📋 새 환자 등록")
+
+    with st.form("register_form"):  # 폼 시작
+        col1, col2 = st.columns(2)
+        with col1:
+            환자번호 = st.text_input("환자번호")
+            baseline = st.date_input("Baseline 날짜")
+            start_date = st.date_input("Start_date")
+            음성_주기 = st.selectbox("음성_주기", ["1w", "2w", "1m"], key="voice_cycle")
+            증상_주기 = st.selectbox("증상_주기", ["daily", "weekly"], key="symptom_cycle")
+        with col2:
+            환경_사용 = st.radio("환경 착용 여부", ["착용", "비착용"], horizontal=True, key="env_use")
+            웨어러블_사용 = st.radio("웨어러블 착용 여부", ["착용", "비착용"], horizontal=True, key="wear_use")
+            외래1차 = st.date_input("첫 외래 일정")
+
+        # 프로토콜이 더 읽는 규칙 컬럼은 글자 그대로 입력받는다
+        추가_규칙 = {}
+        if EXTRA_RULE_COLUMNS:
+            st.markdown("#### 추가 규칙")
+            for col in EXTRA_RULE_COLUMNS:
+                추가_규칙[col] = st.text_input(col, key=f"extra_{col}")
+
+        st.markdown("#### 담당자 지정")
+        col3, col4 = st.columns(2)
+        담당자 = {}
+        for i, col in enumerate(담당자_컬럼):  # 프로토콜의 검사마다 하나
+            with col3 if i % 2 == 0 else col4:
+                담당자[col] = st.selectbox(col.replace("_", " "), user_list[1:], key=f"staff_{col}")  # user_list 사용
+
+        제출 = st.form_submit_button("등록 완료")  # submit button 추가
+        if 제출:
+            new_data = {
+                "환자번호": 환자번호,
+                "Baseline": baseline.strftime("%Y-%m-%d"),
+                "Start_date": start_date.strftime("%Y-%m-%d"),
+                "음성_주기": 음성_주기,
+                "증상_주기": 증상_주기,
+                "환경_사용": 환경_사용,
+                "웨어러블_사용": 웨어러블_사용,
+                "외래일": 외래1차.strftime("%Y-%m-%d"),
+                **추가_규칙,
+                **담당자,
+            }
+
+            # ✅ 저장 (시트는 대기열, SQLite는 한 트랜잭션)
+            patient_db.loc[len(patient_db)] = new_data
+            storage.insert_patient(new_data)
+
+            st.success(f"{환자번호} 등록 완료")
+
+    st.markdown("### 📥 일괄 등록")
+    st.caption("patients.csv와 같은 컬럼. 잘못된 행은 건너뛰고 오류 목록으로 보여줍니다.")
+    출처 = st.radio("가져올 곳", ["CSV 파일", "구글 시트"], horizontal=True, key="bulk_source")
+    chunks = None
+    if 출처 == "CSV 파일":
+        업로드 = st.file_uploader("환자 CSV 파일", type="csv", key="bulk_upload")
+        if 업로드 is not None and st.button("일괄 등록 시작", key="bulk_start_csv"):
+            chunks = iter_csv_chunks(업로드)
+    else:
+        service_account = get_service_account()
+        if service_account is None:
+            st.info("구글 시트 인증 정보가 없습니다.")
+        else:
+            시트_주소 = st.text_input("시트 주소", key="bulk_sheet_url")
+            col1, col2 = st.columns(2)
+            with col1:
+                시작_행 = st.number_input("시작 행", min_value=2, value=2, key="bulk_start_row")
+            with col2:
+                끝_행 = st.number_input("끝 행 (0이면 끝까지)", min_value=0, value=0, key="bulk_end_row")
+            if 시트_주소 and st.button("일괄 등록 시작", key="bulk_start_sheet"):
+                from sheets import open_worksheet
+
+                worksheet = open_worksheet(service_account, 시트_주소)
+                chunks = iter_sheet_chunks(worksheet, int(시작_행), int(끝_행) or None)
+
+    if chunks is not None:
+        기존 = patient_db["환자번호"].astype(str) if "환자번호" in patient_db.columns else []
+        with st.spinner("검증 및 저장 중..."):
+            report = import_patients(chunks, storage, user_list[1:], 기존, get_schedule_store())
+        st.success(f"{report['accepted']:,} / {report['rows']:,}행 등록 "
+                   f"({report['seconds']:.1f}초, {report['rows_per_second']:,.0f}행/초)")
+        if report["errors"]:
+            st.warning(f"{len(report['errors']):,}행은 등록하지 않았습니다.")
+            st.dataframe(pd.DataFrame(report["errors"]), use_container_width=True)
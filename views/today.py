@@ -0,0 +1,46 @@
+# ✅ 오늘 해야 할 검사
+from datetime import datetime
+
+import numpy as np
+import streamlit as st
+
+from resources import due_on, get_storage, load_data
+from schedule_engine import 항목_목록
+
+# 이 화면에서 고를 수 있는 항목 (현재 프로토콜에 있는 것만)
+항목_선택지 = [항목 for 항목 in 항목_목록 if 항목 in ("음성", "환경", "웨어러블")]
+
+
+def render(current_user):
+    patient_db = load_data()
+    completion_store = get_storage().completions
+
+    st.subheader("✅ 오늘 해야 할 검사")
+    today = datetime.today().date()
+
+    항목_필터 = st.multiselect("검사 항목 선택", 항목_선택지, default=항목_선택지, key="test_filter")
+    환자_필터 = st.selectbox("환자 선택", ["전체 보기"] + patient_db["환자번호"].unique().tolist(), key="patient_filter")
+
+    검사_필요 = due_on(patient_db, today, 항목_필터)
+    if 환자_필터 != "전체 보기":
+        검사_필요 = 검사_필요[검사_필요["환자번호"] == 환자_필터]
+    검사_필요 = 검사_필요.copy()
+    검사_필요["완료여부"] = np.where(completion_store.mark(검사_필요), "✅ 완료됨", "")
+
+    if 검사_필요.empty:
+        st.info("오늘 해야 할 검사 항목이 없습니다.")
+    else:
+        for idx, row in 검사_필요.iterrows():
+            cols = st.columns([2, 2, 2, 2])
+            cols[0].write(f"{row['환자번호']}")
+            cols[1].write(f"{row['항목']}")
+            cols[2].write(f"{row['완료여부']}")
+
+            if row["완료여부"]:
+                if cols[3].button("❌ 취소", key=f"today_cancel_{idx}"):
+                    completion_store.remove(row["환자번호"], row["날짜"], row["항목"])
+                    st.rerun()
+            else:
+                if cols[3].button("✅ 완료", key=f"today_done_{idx}"):
+                    completion_store.add(row["환자번호"], row["날짜"], row["항목"])
+                    st.rerun()
@@ -0,0 +1,29 @@
+# 📌 내일 예정된 검사
+from datetime import datetime, timedelta
+
+import streamlit as st
+
+from resources import due_on, load_data
+from schedule_engine import 항목_목록
+
+# 이 화면에서 고를 수 있는 항목 (현재 프로토콜에 있는 것만)
+항목_선택지 = [항목 for 항목 in 항목_목록 if 항목 in ("음성", "환경", "웨어러블")]
+
+
+def render(current_user):
+    patient_db = load_data()
+
+    st.subheader("📌 내일 예정된 검사")
+    tomorrow = datetime.today().date() + timedelta(days=1)
+
+    항목_필터 = st.multiselect("검사 항목 선택", 항목_선택지, default=항목_선택지, key="test_filter_tomorrow")
+    환자_필터 = st.selectbox("환자 선택", ["전체 보기"] + patient_db["환자번호"].unique().tolist(), key="patient_filter_tomorrow")
+
+    검사예정 = due_on(patient_db, tomorrow, 항목_필터)
+    if 환자_필터 != "전체 보기":
+        검사예정 = 검사예정[검사예정["환자번호"] == 환자_필터]
+
+    if 검사예정.empty:
+        st.info("내일 예정된 검사가 없습니다.")
+    else:
+        st.dataframe(검사예정[["환자번호", "항목", "날짜"]], use_container_width=True)
@@ -0,0 +1,61 @@
+# 🧑‍⚕️ 내 업무 목록: 담당자별 오늘 / 이번 주 / 유예 기간이 지난 미완료 검사
+# 담당자 색인으로 본인이 맡은 (환자, 항목)만 계산하므로 전체 환자 수와 관계없이 빨리 뜬다.
+from datetime import datetime, timedelta
+
+import streamlit as st
+
+from resources import get_schedule_store, get_storage, load_data, load_overdue, load_schedules, staff_worklist, user_list
+
+
+def show_worklist(df, completion_store, key):
+    if df.empty:
+        st.info("해당 기간에 해야 할 검사가 없습니다.")
+        return
+    for idx, row in df.iterrows():
+        cols = st.columns([2, 2, 2, 2])
+        cols[0].write(f"{row['날짜']}")
+        cols[1].write(f"{row['환자번호']}")
+        cols[2].write(f"{row['항목']}")
+        if row["완료여부"]:
+            if cols[3].button("❌ 취소", key=f"{key}_cancel_{idx}"):
+                completion_store.remove(row["환자번호"], row["날짜"], row["항목"])
+                st.rerun()
+        else:
+            if cols[3].button("✅ 완료", key=f"{key}_done_{idx}"):
+                completion_store.add(row["환자번호"], row["날짜"], row["항목"])
+                st.rerun()
+
+
+def render(current_user):
+    patient_db = load_data()
+    completion_store = get_storage().completions
+
+    st.subheader("🧑‍⚕️ 내 업무 목록")
+    staff = current_user
+    if current_user == "전체 관리자":
+        staff = st.selectbox("담당자", user_list[1:], key="worklist_staff")
+
+    # 일정 저장소는 이 화면에서 한 번만 맞추고 아래 탭들은 그대로 읽는다
+    load_schedules(patient_db)
+    index = get_schedule_store().staff_index()
+    if index is not None:
+        st.caption(" · ".join(f"{항목} {count}명" for 항목, count in index.caseload(staff).items()))
+
+    today = datetime.today().date()
+    week_end = today + timedelta(days=6 - today.weekday())
+    오늘, 이번_주, 미완료 = st.tabs(["오늘", "이번 주", "미완료 (유예 기간 경과)"])
+
+    for i, (tab, (start, end)) in enumerate(zip([오늘, 이번_주], [(today, today), (today, week_end)])):
+        with tab:
+            df = staff_worklist(staff, start, end).copy()
+            df["완료여부"] = completion_store.mark(df)
+            st.write(f"**{len(df)}건**")
+            show_worklist(df, completion_store, f"worklist_{i}")
+
+    with 미완료:
+        # 누락 추적기(항목별 유예 일수 반영)에서 이 담당자가 맡은 (환자, 항목)만 읽는다
+        assigned = index.assigned(staff) if index is not None else []
+        df = load_overdue(today).missed_for(assigned).sort_values(["날짜", "환자번호", "항목"], ignore_index=True)
+        df["완료여부"] = False
+        st.write(f"**{len(df)}건**")
+        show_worklist(df, completion_store, "worklist_overdue")
@@ -0,0 +1,67 @@
+# 담당자별 업무 목록
+# 환자 표의 "{항목}_담당자" 컬럼을 뒤집어 담당자 → {항목: 환자 인덱스 배열} 색인을 만들어 두고,
+# 담당자 한 명의 업무는 그 담당자가 맡은 (환자, 항목)만 계산한다 → 전체 일정 표를 훑거나 거르지 않는다.
+# 색인은 compile_rules 결과(rules)가 바뀔 때만 다시 만든다 (ScheduleStore.staff_index).
+import numpy as np
+import pandas as pd
+
+from schedule_engine import HORIZON_DAYS, evaluate, 항목_목록
+
+WORKLIST_COLUMNS = ["환자번호", "날짜", "항목", "담당자"]
+
+
+def empty_worklist():
+    return pd.DataFrame(columns=WORKLIST_COLUMNS)
+
+
+class StaffIndex:
+    def __init__(self, rules):
+        self.rules = rules
+        self._by_staff = {}
+        for 항목 in 항목_목록:
+            staff = pd.Series(rules["staff"][f"{항목}_담당자"])
+            for name, pidx in staff.groupby(staff, sort=False).indices.items():
+                self._by_staff.setdefault(name, {})[항목] = pidx
+
+    @property
+    def staff(self):
+        return sorted(self._by_staff)
+
+    def caseload(self, staff):
+        # 항목별 담당 환자 수
+        assigned = self._by_staff.get(staff, {})
+        return {항목: len(assigned.get(항목, ())) for 항목 in 항목_목록}
+
+    def assigned(self, staff):
+        # staff가 맡은 (환자번호, 항목) 목록
+        rules = self.rules
+        return [(str(환자번호), 항목) for 항목, pidx in self._by_staff.get(staff, {}).items()
+                for 환자번호 in rules["환자번호"][pidx]]
+
+    def due(self, staff, start, end=None, items=None, horizon=HORIZON_DAYS):
+        # staff가 start~end(포함)에 해야 하는 (환자번호, 날짜, 항목, 담당자). 비용은 담당 환자 수 × 일수
+        assigned = self._by_staff.get(staff)
+        if not assigned:
+            return empty_worklist()
+        rules = self.rules
+        days = np.arange(np.datetime64(start, "D"), np.datetime64(end if end is not None else start, "D") + 1)
+        frames = []
+        for 항목 in items or 항목_목록:
+            pidx = assigned.get(항목)
+            if pidx is None or len(days) == 0:
+                continue
+            p = np.repeat(pidx, len(days))
+            d = np.tile(days, len(pidx))
+            offset = (d - rules["baseline"][p]).astype(np.int64)
+            keep = (offset >= 0) & (offset < horizon)
+            p, d = p[keep], d[keep]
+            hit = evaluate(rules, p, d, [항목])[항목]
+            frames.append(pd.DataFrame({
+                "환자번호": rules["환자번호"][p[hit]],
+                "날짜": d[hit].astype(object),
+                "항목": 항목,
+                "담당자": staff,
+            }))
+        if not frames:
+            return empty_worklist()
+        return pd.concat(frames, ignore_index=True).sort_values(["날짜", "환자번호", "항목"], ignore_index=True)